@@ -0,0 +1,75 @@
+"""Commandes de maintenance
+
+Usage (depuis backend/) :
+    python -m app.cli rebuild-tag-stats
+    python -m app.cli rebuild-related-posts
+    python -m app.cli backfill-derived-fields [--batch-size 500] [--after <id>]
+"""
+import asyncio
+import argparse
+import logging
+
+from bson import ObjectId
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from .config.logging_config import setup_logging
+from .services.database import db_service
+from .services.tag_stats import tag_stats_service
+from .services.related_posts import related_posts_service
+from .services.post_service import post_service
+
+logger = logging.getLogger(__name__)
+
+
+async def rebuild_tag_stats(args: argparse.Namespace) -> None:
+    """Recalcule la collection tag_stats depuis posts"""
+    result = await tag_stats_service.rebuild()
+    logger.info(f"🏷️ tag_stats: {result}")
+
+
+async def rebuild_related_posts(args: argparse.Namespace) -> None:
+    """Recalcule toutes les listes de posts similaires"""
+    result = await related_posts_service.rebuild()
+    logger.info(f"🔗 related_posts: {result}")
+
+
+async def backfill_derived_fields(args: argparse.Namespace) -> None:
+    """Calcule content_html, extrait automatique et temps de lecture des posts existants"""
+    after = ObjectId(args.after) if args.after else None
+    result = await post_service.backfill_derived_fields(batch_size=args.batch_size, after=after)
+    logger.info(f"🧮 Champs dérivés: {result}")
+
+
+COMMANDS = {
+    "rebuild-tag-stats": rebuild_tag_stats,
+    "rebuild-related-posts": rebuild_related_posts,
+    "backfill-derived-fields": backfill_derived_fields,
+}
+
+
+async def run(args: argparse.Namespace) -> None:
+    await db_service.connect()
+    try:
+        await COMMANDS[args.command](args)
+    finally:
+        await db_service.disconnect()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Commandes de maintenance du blog")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("rebuild-tag-stats", help="Recalcule les compteurs de tags et corrige la dérive")
+    subparsers.add_parser("rebuild-related-posts", help="Recalcule les posts similaires de tous les posts")
+    backfill = subparsers.add_parser("backfill-derived-fields", help="Calcule les champs dérivés des posts existants")
+    backfill.add_argument("--batch-size", type=int, default=500, help="Posts par lot")
+    backfill.add_argument("--after", help="Reprendre après cet _id (dernier lot journalisé)")
+
+    args = parser.parse_args()
+    setup_logging()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import os
+import sys
+import queue
+import atexit
+import logging
+import logging.handlers
+from typing import Optional
+
+import structlog
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class _InProcessQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler qui laisse le formatage au thread d'écriture
+
+    La file reste dans le processus : inutile de pré-formater l'enregistrement
+    (ce qui casserait aussi les événements structlog, transmis sous forme de dict).
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def setup_logging() -> None:
+    """Configure le logging : écriture différée via une file et un thread dédié
+
+    Les handlers (console, fichier) sont appelés par un QueueListener en arrière-plan ;
+    les requêtes ne font qu'empiler l'enregistrement dans la file. structlog est branché
+    sur la bibliothèque standard pour partager la même sortie.
+    """
+    global _listener
+
+    if _listener is not None:
+        return
+
+    level = getattr(logging, os.getenv("LOG_LEVEL", "INFO").upper(), logging.INFO)
+    log_format = os.getenv("LOG_FORMAT", "text").lower()
+
+    # Rendu final : formatter structlog partagé entre logs stdlib et structlog
+    renderer = (
+        structlog.processors.JSONRenderer()
+        if log_format == "json"
+        else structlog.dev.ConsoleRenderer(colors=False)
+    )
+    shared_processors = [
+        structlog.stdlib.add_log_level,
+        structlog.stdlib.add_logger_name,
+        structlog.processors.TimeStamper(fmt="iso"),
+    ]
+    formatter = structlog.stdlib.ProcessorFormatter(
+        foreign_pre_chain=shared_processors,
+        processors=[
+            structlog.stdlib.ProcessorFormatter.remove_processors_meta,
+            renderer,
+        ],
+    )
+
+    handlers = [logging.StreamHandler(sys.stdout)]
+    log_file = os.getenv("LOG_FILE")
+    if log_file:
+        handlers.append(logging.FileHandler(log_file, encoding="utf-8"))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    # File non bornée : la journalisation ne bloque jamais la boucle d'événements
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+    root = logging.getLogger()
+    root.handlers = [_InProcessQueueHandler(log_queue)]
+    root.setLevel(level)
+
+    # Le log d'accès uvicorn (synchrone, non échantillonné) est remplacé par AccessLogMiddleware
+    logging.getLogger("uvicorn.access").disabled = True
+    for name in ("uvicorn", "uvicorn.error"):
+        logging.getLogger(name).handlers = []
+        logging.getLogger(name).propagate = True
+
+    structlog.configure(
+        processors=[
+            structlog.stdlib.filter_by_level,
+            *shared_processors,
+            structlog.stdlib.PositionalArgumentsFormatter(),
+            structlog.processors.StackInfoRenderer(),
+            structlog.processors.format_exc_info,
+            structlog.stdlib.ProcessorFormatter.wrap_for_formatter,
+        ],
+        logger_factory=structlog.stdlib.LoggerFactory(),
+        wrapper_class=structlog.stdlib.BoundLogger,
+        cache_logger_on_first_use=True,
+    )
+
+
+def shutdown_logging() -> None:
+    """Vide la file et arrête le thread d'écriture"""
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
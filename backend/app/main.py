@@ -9,16 +9,21 @@ from dotenv import load_dotenv
 # ✅ CHARGER L'ENV EN PREMIER
 load_dotenv()
 
-# Configuration des logs
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
+# Configuration des logs (écriture en arrière-plan via une file)
+from .config.logging_config import setup_logging
+setup_logging()
 logger = logging.getLogger(__name__)
 
 # ✅ IMPORT APRÈS CHARGEMENT ENV
 from .services.database import db_service
-from .routes import post_routes, user_routes, image_routes, webhook_routes
+from .services.http_client import http_client
+from .services.cache_backend import cache_manager
+from .services.change_streams import change_stream_watcher
+from .services.known_posts import known_posts
+from .services.related_posts import related_posts_service
+from .routes import post_routes, user_routes, image_routes, webhook_routes, admin_routes, feed_routes
+from .middleware.access_log import AccessLogMiddleware
+from .middleware.compression import CompressionMiddleware
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -34,9 +39,27 @@ async def lifespan(app: FastAPI):
         logger.info(f"  - CLERK_SECRET_KEY: {'✓' if os.getenv('CLERK_SECRET_KEY') else '✗'}")
         logger.info(f"  - CLOUDINARY_CLOUD_NAME: {'✓' if os.getenv('CLOUDINARY_CLOUD_NAME') else '✗'}")
         
+        # Pool HTTP partagé (API Clerk, JWKS)
+        await http_client.start()
+
+        # Écoute des invalidations de cache diffusées par les autres workers
+        try:
+            await cache_manager.start()
+        except Exception as cache_error:
+            logger.error(f"❌ Diffusion des invalidations de cache indisponible: {str(cache_error)}")
+
         # ✅ CONNEXION AVEC GESTION D'ERREUR AMÉLIORÉE
         try:
             await db_service.connect()
+
+            # Invalidation des caches sur les écritures externes (optionnel)
+            await change_stream_watcher.start()
+
+            # Filtre des ids/slugs existants (404 sans requête), construit en tâche de fond
+            await known_posts.start()
+
+            # Posts similaires mis à jour en tâche de fond après les écritures
+            await related_posts_service.start()
             logger.info("✅ Application startup complete")
         except Exception as db_error:
             logger.error(f"❌ Database connection failed: {str(db_error)}")
@@ -52,7 +75,12 @@ async def lifespan(app: FastAPI):
     # 🛑 SHUTDOWN
     try:
         logger.info("🛑 Shutting down application")
+        await change_stream_watcher.stop()
+        await known_posts.stop()
+        await related_posts_service.stop()
         await db_service.disconnect()
+        await http_client.close()
+        await cache_manager.close()
         logger.info("✅ Application shutdown complete")
     except Exception as e:
         logger.error(f"❌ Shutdown error: {str(e)}")
@@ -66,7 +94,7 @@ app = FastAPI(
     ### 🔐 Authentification
     Pour tester les endpoints protégés :
     1. Cliquez sur **"Authorize"** 🔓
-    2. Entrez : `Bearer test_postman_token`
+    2. Entrez : `Bearer <jeton de session Clerk>`
     3. Cliquez sur **"Authorize"**
     
     ### 📝 Fonctionnalités
@@ -75,7 +103,8 @@ app = FastAPI(
     - **Images** : Upload et gestion via Cloudinary
     
     ### 🧪 Mode Test
-    Utilisez le token `test_postman_token` pour vos tests en développement.
+    Les jetons sont toujours vérifiés. Hors ligne, `CLERK_JWKS_PATH` pointe vers
+    un JWKS local dont la clé privée signe les jetons de test.
     
     ### 📚 Collections disponibles
     - **Users** : Création, lecture, mise à jour
@@ -103,13 +132,22 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Last-Modified"],
 )
 
+# Compression gzip / brotli négociée (corps compressés des lectures en cache réutilisés)
+app.add_middleware(CompressionMiddleware)
+
+# Log d'accès échantillonné (remplace uvicorn.access)
+app.add_middleware(AccessLogMiddleware)
+
 # Routes
 app.include_router(post_routes.router)
 app.include_router(user_routes.router)
 app.include_router(image_routes.router)
 app.include_router(webhook_routes.router)
+app.include_router(admin_routes.router)
+app.include_router(feed_routes.router)
 
 # Routes de base
 @app.get("/")
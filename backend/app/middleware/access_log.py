@@ -0,0 +1,64 @@
+import os
+import time
+import random
+from typing import Dict
+
+import structlog
+
+logger = structlog.get_logger("access")
+
+# Clé de comptage des requêtes qui n'ont atteint aucune route
+UNMATCHED = "<unmatched>"
+
+
+class AccessLogMiddleware:
+    """Log d'accès échantillonné par route (middleware ASGI pur)
+
+    Toutes les requêtes sont comptées par route, mais seule une fraction est
+    journalisée (`ACCESS_LOG_SAMPLE_RATE`). Les erreurs serveur et les requêtes
+    lentes sont toujours journalisées.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.sample_rate = float(os.getenv("ACCESS_LOG_SAMPLE_RATE", 0.1))
+        self.slow_ms = float(os.getenv("ACCESS_LOG_SLOW_MS", 500))
+        self.counts: Dict[str, int] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+
+            # Gabarit de route (/posts/{post_id}) plutôt que le chemin brut ; les requêtes
+            # sans route (404, scanners) partagent une seule clé pour borner `counts`
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or UNMATCHED
+            key = f"{scope['method']} {route_path}" if route_path != UNMATCHED else UNMATCHED
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+            if status_code >= 500 or duration_ms >= self.slow_ms or random.random() < self.sample_rate:
+                log = logger.warning if status_code >= 500 or duration_ms >= self.slow_ms else logger.info
+                log(
+                    "request",
+                    method=scope["method"],
+                    route=route_path,
+                    path=scope["path"],
+                    status=status_code,
+                    duration_ms=round(duration_ms, 2),
+                    sampled=self.sample_rate,
+                )
@@ -1,4 +1,4 @@
-from fastapi import HTTPException, Depends, status
+from fastapi import HTTPException, Depends, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional, Dict, Any
 import logging
@@ -8,7 +8,18 @@ logger = logging.getLogger(__name__)
 
 security = HTTPBearer()
 
+async def _resolve_user(request: Request, token: str) -> Dict[str, Any]:
+    """Résout le token une seule fois par requête (partagé entre les dépendances)"""
+    cached = getattr(request.state, "auth_identity", None)
+    if cached is not None and cached[0] == token:
+        return cached[1]
+
+    user_info = await clerk_service.verify_token(token)
+    request.state.auth_identity = (token, user_info)
+    return user_info
+
 async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ) -> Dict[str, Any]:
     """
@@ -18,11 +29,11 @@ async def get_current_user(
     """
     try:
         token = credentials.credentials
-        logger.info(f"🔐 Validation token: {token[:20]}...")
+        logger.debug("🔐 Validation token")
 
-        user_info = await clerk_service.verify_token(token)
+        user_info = await _resolve_user(request, token)
 
-        logger.info(f"✅ Utilisateur authentifié: {user_info.get('email', 'unknown')}")
+        logger.debug(f"✅ Utilisateur authentifié: {user_info.get('email', 'unknown')}")
         return user_info
         
     except HTTPException:
@@ -42,12 +53,13 @@ async def get_admin_user(
     if current_user.get("role") != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            deyail="Accès administrateur requis"
+            detail="Accès administrateur requis"
         )
 
     return current_user
 
 async def get_optional_user(
+    request: Request,
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False))
 ) -> Optional[Dict[str, Any]]:
     """🔓 Middleware optionnel - peut être None"""
@@ -56,7 +68,7 @@ async def get_optional_user(
     
     try:
         token = credentials.credentials
-        user_info = await clerk_service.verify_token(token)
+        user_info = await _resolve_user(request, token)
         return user_info
     except HTTPException:
         return None
@@ -0,0 +1,217 @@
+import os
+import zlib
+import hashlib
+from typing import Dict, Optional
+
+from starlette.datastructures import MutableHeaders
+
+from ..services.cache import TTLCache
+
+try:
+    import brotli
+except ImportError:  # dépendance optionnelle
+    brotli = None
+
+# Types dont la compression vaut la peine (les images Cloudinary sont déjà compressées)
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/xml",
+    "application/rss+xml",
+    "application/atom+xml",
+    "application/x-ndjson",
+    "application/javascript",
+)
+
+# Corps compressés des réponses avec ETag : (encodage, empreinte du corps) -> octets
+compressed_cache = TTLCache(
+    maxsize=int(os.getenv("COMPRESSION_CACHE_MAXSIZE", 1000)),
+    ttl=float(os.getenv("COMPRESSION_CACHE_TTL", 600)),
+    max_bytes=int(os.getenv("COMPRESSION_CACHE_MAX_BYTES", 16 * 1024 * 1024)),
+)
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Encodages acceptés par le client avec leur poids q (RFC 9110)"""
+    accepted: Dict[str, float] = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+class CompressionMiddleware:
+    """Compression gzip / brotli des réponses (middleware ASGI pur)
+
+    L'encodage est négocié avec `Accept-Encoding` (brotli préféré s'il est
+    installé et activé). Les corps plus petits que `COMPRESSION_MIN_SIZE` sont
+    envoyés tels quels. Pour les réponses portant un ETag (lectures mises en
+    cache), le corps compressé est conservé dans un cache borné, indexé par
+    l'empreinte du corps : un post servi depuis le cache n'est pas recompressé
+    à chaque requête. Les réponses en flux sont compressées au fil de l'eau.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.enabled = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+        self.min_size = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+        self.gzip_level = int(os.getenv("COMPRESSION_GZIP_LEVEL", 6))
+        self.brotli_quality = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 5))
+        self.brotli_enabled = (
+            brotli is not None and os.getenv("COMPRESSION_BROTLI", "true").lower() == "true"
+        )
+
+        self.cache = compressed_cache
+
+    async def __call__(self, scope, receive, send):
+        # HEAD : aucun corps à compresser, les en-têtes restent ceux de la réponse
+        if scope["type"] != "http" or not self.enabled or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        encoding = self.negotiate(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        await _CompressedResponder(self, encoding)(self.app, scope, receive, send)
+
+    def negotiate(self, accept_encoding: str) -> Optional[str]:
+        if not accept_encoding:
+            return None
+        accepted = parse_accept_encoding(accept_encoding)
+        wildcard = accepted.get("*", 0.0)
+        candidates = ["br", "gzip"] if self.brotli_enabled else ["gzip"]
+        best, best_quality = None, 0.0
+        for coding in candidates:
+            quality = accepted.get(coding, wildcard)
+            # À poids égal, l'ordre des candidats (brotli d'abord) départage
+            if quality > best_quality:
+                best, best_quality = coding, quality
+        return best
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip_compress(body, self.gzip_level)
+
+    def compress_cached(self, body: bytes, encoding: str) -> bytes:
+        # Empreinte du corps plutôt que l'ETag seul : une écriture directe en base
+        # sans mise à jour de updated_at ne doit pas servir d'anciens octets
+        key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+        compressed = self.cache.get(key)
+        if compressed is None:
+            compressed = self.compress(body, encoding)
+            self.cache.set(key, compressed, size=len(compressed))
+        return compressed
+
+    def compressor(self, encoding: str):
+        if encoding == "br":
+            return _BrotliStream(self.brotli_quality)
+        return zlib.compressobj(self.gzip_level, zlib.DEFLATED, 31)
+
+def gzip_compress(body: bytes, level: int) -> bytes:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return compressor.compress(body) + compressor.flush()
+
+
+class _BrotliStream:
+    """Adapte brotli.Compressor à l'interface compress/flush de zlib"""
+
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self, mode: int = zlib.Z_FINISH) -> bytes:
+        if mode == zlib.Z_FINISH:
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+class _CompressedResponder:
+    """Réécrit une réponse pour un encodage donné"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.start_message: Optional[dict] = None
+        self.compressor = None
+        self.passthrough = False
+
+    async def __call__(self, app, scope, receive, send):
+        self.send = send
+        await app(scope, receive, self.send_wrapper)
+
+    async def send_wrapper(self, message):
+        if message["type"] == "http.response.start":
+            # Retenu jusqu'au premier morceau de corps pour connaître sa taille
+            self.start_message = message
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        if self.compressor is not None:
+            await self._send_chunk(message)
+            return
+
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        if not self._compressible(headers):
+            self.passthrough = True
+            await self.send(self.start_message)
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        headers.add_vary_header("Accept-Encoding")
+
+        if not message.get("more_body", False):
+            # Corps complet : seuil de taille, puis cache des octets compressés
+            if len(body) < self.middleware.min_size:
+                await self.send(self.start_message)
+                await self.send(message)
+                return
+            if "etag" in headers:
+                compressed = self.middleware.compress_cached(body, self.encoding)
+            else:
+                compressed = self.middleware.compress(body, self.encoding)
+            headers["Content-Encoding"] = self.encoding
+            headers["Content-Length"] = str(len(compressed))
+            await self.send(self.start_message)
+            await self.send({"type": "http.response.body", "body": compressed})
+            return
+
+        # Réponse en flux : taille inconnue, compression au fil de l'eau
+        headers["Content-Encoding"] = self.encoding
+        del headers["Content-Length"]
+        self.compressor = self.middleware.compressor(self.encoding)
+        await self.send(self.start_message)
+        await self._send_chunk(message)
+
+    async def _send_chunk(self, message):
+        more_body = message.get("more_body", False)
+        data = self.compressor.compress(message.get("body", b""))
+        # Flush partiel pour que chaque morceau parte sans attendre la fin du flux
+        data += self.compressor.flush(zlib.Z_SYNC_FLUSH if more_body else zlib.Z_FINISH)
+        await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+    def _compressible(self, headers: MutableHeaders) -> bool:
+        if self.start_message["status"] in (204, 304) or "content-encoding" in headers:
+            return False
+        if "no-transform" in headers.get("cache-control", ""):
+            return False
+        return headers.get("content-type", "").lower().startswith(COMPRESSIBLE_TYPES)
@@ -1,6 +1,7 @@
-from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional, List
+from pydantic import BaseModel, Field, ConfigDict, field_validator, model_validator
+from typing import Optional, List, Literal
 from datetime import datetime
+from bson import ObjectId
 
 class PostBase(BaseModel):
     """Modèle de base pour les posts"""
@@ -38,11 +39,10 @@ class PostUpdate(BaseModel):
     is_published: Optional[bool] = None
     featured_image: Optional[str] = None
 
-class PostResponse(BaseModel):
-    """Modèle de réponse pour les posts"""
+class PostSummary(BaseModel):
+    """Modèle de réponse allégé pour les listes (sans le contenu)"""
     id: str
     title: str
-    content: str
     slug: str
     excerpt: Optional[str] = None
     tags: List[str] = Field(default_factory=list)
@@ -50,12 +50,105 @@ class PostResponse(BaseModel):
     author_id: str
     author_email: Optional[str] = None
     featured_image: Optional[str] = None
+    word_count: Optional[int] = None
+    reading_time: Optional[int] = Field(None, description="Temps de lecture estimé, en minutes")
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
+    # Dates sérialisées en ISO 8601 par pydantic-core (plus de json_encoders)
+    model_config = ConfigDict(from_attributes=True)
+
+class PostResponse(PostSummary):
+    """Modèle de réponse pour les posts"""
+    content: str
+    content_html: Optional[str] = None
+
+class PostSearchResult(PostSummary):
+    """Résultat de recherche : résumé, pertinence et extrait surligné (<mark>)"""
+    score: float
+    title_highlight: str
+    snippet: Optional[str] = None
+
+class RelatedPost(PostSummary):
+    """Post similaire (tags communs, fraîcheur)"""
+    score: float
+
+class TagStat(BaseModel):
+    """Nombre de posts publiés portant un tag"""
+    tag: str
+    count: int
+
+class BulkPostOperation(BaseModel):
+    """Opération unitaire d'un lot (création, modification, suppression, publication)"""
+    op: Literal["create", "update", "delete", "publish", "unpublish"]
+    post_id: Optional[str] = None
+    post: Optional[PostCreate] = None
+    changes: Optional[PostUpdate] = None
+
+    @field_validator("post_id")
+    @classmethod
+    def normalize_post_id(cls, v: Optional[str]) -> Optional[str]:
+        """Forme canonique (hexadécimal minuscule) ; un id invalide est refusé plus tard (400)"""
+        if v is not None and ObjectId.is_valid(v):
+            return str(ObjectId(v))
+        return v
+
+    @model_validator(mode="after")
+    def check_payload(self) -> "BulkPostOperation":
+        """Vérifie la présence des champs requis selon l'opération"""
+        if self.op == "create":
+            if self.post is None:
+                raise ValueError("'post' est requis pour l'opération create")
+        elif not self.post_id:
+            raise ValueError(f"'post_id' est requis pour l'opération {self.op}")
+        if self.op == "update" and self.changes is None:
+            raise ValueError("'changes' est requis pour l'opération update")
+        return self
+
+class BulkPostRequest(BaseModel):
+    """Lot d'opérations sur les posts"""
+    operations: List[BulkPostOperation] = Field(..., min_length=1, max_length=500)
+    ordered: bool = Field(default=True, description="Arrêter le lot à la première erreur")
+
+    @model_validator(mode="after")
+    def check_unique_posts(self) -> "BulkPostRequest":
+        """Un post n'est visé qu'une fois par lot (chaque écriture part de l'état lu avant le lot)"""
+        seen = set()
+        for operation in self.operations:
+            if operation.op == "create":
+                continue
+            if operation.post_id in seen:
+                raise ValueError(f"Post visé par plusieurs opérations du lot: {operation.post_id}")
+            seen.add(operation.post_id)
+        return self
+
     model_config = ConfigDict(
-        from_attributes = True,
-        json_encoders = {
-            datetime: lambda v: v.isoformat() if v else None
+        json_schema_extra={
+            "example": {
+                "ordered": False,
+                "operations": [
+                    {"op": "publish", "post_id": "64f1c2a9e4b0a1b2c3d4e5f6"},
+                    {"op": "update", "post_id": "64f1c2a9e4b0a1b2c3d4e5f7", "changes": {"tags": ["tech"]}},
+                    {"op": "delete", "post_id": "64f1c2a9e4b0a1b2c3d4e5f8"}
+                ]
+            }
         }
     )
+
+class BulkPostItemResult(BaseModel):
+    """Résultat d'une opération du lot"""
+    index: int
+    op: str
+    post_id: Optional[str] = None
+    success: bool
+    status: int
+    error: Optional[str] = None
+
+class BulkPostResponse(BaseModel):
+    """Résultat d'un lot d'opérations"""
+    success: bool
+    ordered: bool
+    inserted: int = 0
+    modified: int = 0
+    deleted: int = 0
+    results: List[BulkPostItemResult]
@@ -101,15 +101,13 @@ class UserCreate(BaseModel):
             raise ValueError('Clerk ID must start with user_')
         return v
 
-class UserUpdate(BaseModel):
-    """Modèle pour la mise à jour d'utilisateur"""
+class UserProfileUpdate(BaseModel):
+    """Modèle pour la mise à jour de son propre profil (ni rôle ni statut)"""
     model_config = ConfigDict(
         json_schema_extra={
             "example": {
                 "username": "nouveau_username",
-                "first_name": "Prénom Modifié",
-                "role": "author",
-                "is_active": True
+                "first_name": "Prénom Modifié"
             }
         }
     )
@@ -118,8 +116,6 @@ class UserUpdate(BaseModel):
     first_name: Optional[str] = Field(None, max_length=100)
     last_name: Optional[str] = Field(None, max_length=100)
     profile_image: Optional[str] = Field(None, pattern=r'^https?://')
-    role: Optional[str] = Field(None, pattern=r'^(admin|author|user)$')
-    is_active: Optional[bool] = None
 
     @field_validator('username')
     @classmethod
@@ -129,6 +125,22 @@ class UserUpdate(BaseModel):
                 raise ValueError('Username must contain only letters, numbers, hyphens and underscores')
         return v
 
+class UserUpdate(UserProfileUpdate):
+    """Modèle pour la mise à jour d'utilisateur par un admin (rôle et statut compris)"""
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "username": "nouveau_username",
+                "first_name": "Prénom Modifié",
+                "role": "author",
+                "is_active": True
+            }
+        }
+    )
+    
+    role: Optional[str] = Field(None, pattern=r'^(admin|author|user)$')
+    is_active: Optional[bool] = None
+
 class UserResponse(BaseModel):
     """Modèle de réponse pour les utilisateurs"""
     model_config = ConfigDict(populate_by_name=True)
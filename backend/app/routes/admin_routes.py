@@ -0,0 +1,120 @@
+from fastapi import APIRouter, HTTPException, Depends, Query
+import logging
+
+from ..services.database import get_database
+from ..services.indexes import check_indexes, ensure_indexes
+from ..services.query_profiler import query_profiler
+from ..services.post_service import post_service
+from ..services.clerk_service import clerk_service
+from ..services.cache_backend import cache_manager
+from ..services.change_streams import change_stream_watcher
+from ..services.tag_stats import tag_stats_service
+from ..services.related_posts import related_posts_service
+from ..middleware.auth import get_admin_user
+from ..middleware.compression import compressed_cache
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/admin", tags=["👑 Admin"])
+
+@router.get("/indexes")
+async def get_indexes_report(
+    current_user: dict = Depends(get_admin_user)
+):
+    """👑 Rapport des index MongoDB : manquants, non déclarés, inutilisés (admin uniquement)"""
+    try:
+        db = await get_database()
+        report = await check_indexes(db)
+
+        logger.info(f"✅ Rapport index demandé par: {current_user.get('clerk_id')}")
+        return {"success": True, "collections": report}
+
+    except Exception as e:
+        logger.error(f"❌ Erreur rapport index: {str(e)}")
+        raise HTTPException(status_code=500, detail="Erreur serveur")
+
+@router.post("/indexes")
+async def apply_indexes(
+    current_user: dict = Depends(get_admin_user)
+):
+    """👑 (Re)applique les index déclarés (admin uniquement)"""
+    try:
+        db = await get_database()
+        applied = await ensure_indexes(db)
+
+        logger.info(f"✅ Index appliqués par: {current_user.get('clerk_id')}")
+        return {"success": True, "applied": applied}
+
+    except Exception as e:
+        logger.error(f"❌ Erreur application index: {str(e)}")
+        raise HTTPException(status_code=500, detail="Erreur serveur")
+
+@router.get("/queries")
+async def get_query_profile(
+    limit: int = Query(50, ge=1, le=200, description="Nombre maximum de requêtes lentes retournées"),
+    current_user: dict = Depends(get_admin_user)
+):
+    """👑 Durées des commandes MongoDB et requêtes lentes (admin uniquement)"""
+    return {"success": True, "enabled": query_profiler.enabled, **query_profiler.report(limit=limit)}
+
+@router.delete("/queries")
+async def reset_query_profile(
+    current_user: dict = Depends(get_admin_user)
+):
+    """👑 Remet à zéro les statistiques de requêtes (admin uniquement)"""
+    query_profiler.reset()
+    logger.info(f"🧹 Statistiques requêtes remises à zéro par: {current_user.get('clerk_id')}")
+    return {"success": True}
+
+@router.post("/tag-stats/rebuild")
+async def rebuild_tag_stats(
+    current_user: dict = Depends(get_admin_user)
+):
+    """👑 Recalcule les compteurs de tags depuis les posts et corrige la dérive (admin uniquement)"""
+    try:
+        result = await tag_stats_service.rebuild()
+
+        logger.info(f"✅ Statistiques tags reconstruites par: {current_user.get('clerk_id')}")
+        return {"success": True, **result}
+
+    except Exception as e:
+        logger.error(f"❌ Erreur reconstruction statistiques tags: {str(e)}")
+        raise HTTPException(status_code=500, detail="Erreur serveur")
+
+@router.post("/related-posts/rebuild")
+async def rebuild_related_posts(
+    current_user: dict = Depends(get_admin_user)
+):
+    """👑 Recalcule toutes les listes de posts similaires (admin uniquement)"""
+    try:
+        result = await related_posts_service.rebuild()
+
+        logger.info(f"✅ Posts similaires recalculés par: {current_user.get('clerk_id')}")
+        return {"success": True, **result}
+
+    except Exception as e:
+        logger.error(f"❌ Erreur recalcul posts similaires: {str(e)}")
+        raise HTTPException(status_code=500, detail="Erreur serveur")
+
+@router.get("/cache")
+async def get_cache_stats(
+    current_user: dict = Depends(get_admin_user)
+):
+    """👑 Statistiques des caches vus par ce worker : backend, taille, hit ratio (admin uniquement)"""
+    return {
+        "success": True,
+        "post_cache_enabled": post_service.cache_enabled,
+        **cache_manager.stats(),
+        "single_flight": clerk_service.cache_stats()["single_flight"],
+        "compression": compressed_cache.stats(),
+        "change_streams": change_stream_watcher.stats(),
+    }
+
+@router.delete("/cache")
+async def clear_post_cache(
+    current_user: dict = Depends(get_admin_user)
+):
+    """👑 Vide le cache des lectures publiques de posts, sur tous les workers (admin uniquement)"""
+    await post_service.cache.clear()
+    logger.info(f"🧹 Cache posts vidé par: {current_user.get('clerk_id')}")
+    return {"success": True}
@@ -0,0 +1,63 @@
+from fastapi import APIRouter, HTTPException, Request, Response
+from typing import Any, Dict
+import logging
+
+from ..services.feed_service import feed_service
+from ..services.conditional import is_not_modified, set_validators, not_modified_response
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["📡 Flux"])
+
+RSS_MEDIA_TYPE = "application/rss+xml; charset=utf-8"
+ATOM_MEDIA_TYPE = "application/atom+xml; charset=utf-8"
+XML_MEDIA_TYPE = "application/xml; charset=utf-8"
+
+
+def _xml_response(request: Request, entry: Dict[str, Any], media_type: str) -> Response:
+    """Rendu mis en cache, ou 304 si le lecteur de flux a déjà cette version"""
+    if is_not_modified(request, entry["etag"], entry["modified"]):
+        return not_modified_response(entry["etag"], entry["modified"])
+    response = Response(content=entry["body"], media_type=media_type)
+    set_validators(response, entry["etag"], entry["modified"])
+    return response
+
+@router.get("/feed.xml", response_class=Response)
+async def rss_feed(request: Request):
+    """📡 Flux RSS 2.0 des derniers posts publiés"""
+    try:
+        return _xml_response(request, await feed_service.get_rss(), RSS_MEDIA_TYPE)
+    except Exception as e:
+        logger.error(f"❌ Erreur flux RSS: {str(e)}")
+        raise HTTPException(status_code=500, detail="Erreur interne du serveur")
+
+@router.get("/atom.xml", response_class=Response)
+async def atom_feed(request: Request):
+    """📡 Flux Atom des derniers posts publiés"""
+    try:
+        return _xml_response(request, await feed_service.get_atom(), ATOM_MEDIA_TYPE)
+    except Exception as e:
+        logger.error(f"❌ Erreur flux Atom: {str(e)}")
+        raise HTTPException(status_code=500, detail="Erreur interne du serveur")
+
+@router.get("/sitemap.xml", response_class=Response)
+async def sitemap(request: Request):
+    """🗺️ Sitemap des posts publiés (index de /sitemap-<n>.xml au-delà de 50 000 URLs)"""
+    try:
+        return _xml_response(request, await feed_service.get_sitemap(), XML_MEDIA_TYPE)
+    except Exception as e:
+        logger.error(f"❌ Erreur sitemap: {str(e)}")
+        raise HTTPException(status_code=500, detail="Erreur interne du serveur")
+
+@router.get("/sitemap-{page}.xml", response_class=Response)
+async def sitemap_page(page: int, request: Request):
+    """🗺️ Fichier n°`page` d'un sitemap découpé"""
+    try:
+        entry = await feed_service.get_sitemap_page(page)
+    except Exception as e:
+        logger.error(f"❌ Erreur sitemap {page}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Erreur interne du serveur")
+
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Sitemap non trouvé")
+    return _xml_response(request, entry, XML_MEDIA_TYPE)
@@ -149,7 +149,7 @@ async def list_user_images(
     """📋 Liste les images de l'utilisateur connecté"""
     try:
         user_id = current_user.get('clerk_id')
-        logger.info(f"🔍 Recherche images pour user_id: {user_id}")
+        logger.debug(f"🔍 Recherche images pour user_id: {user_id}")
         
         # Vérification que user_id existe
         if not user_id:
@@ -162,7 +162,7 @@ async def list_user_images(
         try:
             # Le dosiier basé sur la structure d'upload
             folder_prefix = f"blog/{user_id}"
-            logger.info(f"🔍 Recherche dans le dossier: {folder_prefix}")
+            logger.debug(f"🔍 Recherche dans le dossier: {folder_prefix}")
 
             result = cloudinary.api.resources(
                 type="upload",
@@ -171,7 +171,7 @@ async def list_user_images(
                 resource_type="image"
             )
 
-            logger.info(f"🔍 API resources: {len(result.get('resources', []))} images trouvées")
+            logger.debug(f"🔍 API resources: {len(result.get('resources', []))} images trouvées")
             
         except Exception as api_error:
             logger.error(f"❌ Erreur API Cloudinary: {str(api_error)}")
@@ -195,12 +195,12 @@ async def list_user_images(
                     "bytes": resource.get("bytes", 0),
                     "created_at": resource.get("created_at", "")
                 })
-                logger.info(f"✅ Image ajoutée: {resource.get('public_id', '')}")
+                logger.debug(f"✅ Image ajoutée: {resource.get('public_id', '')}")
             except Exception as format_error:
                 logger.warning(f"⚠️ Erreur formatage resource: {format_error}")
                 continue
         
-        logger.info(f"✅ {len(images)} images formatées avec succès")
+        logger.debug(f"✅ {len(images)} images formatées avec succès")
         
         return {
             "success": True,
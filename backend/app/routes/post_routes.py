@@ -1,10 +1,18 @@
-from fastapi import APIRouter, HTTPException, Depends, Query, status
-from typing import List, Optional
-from bson import ObjectId
-from datetime import datetime
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, status
+from fastapi.responses import StreamingResponse
+from typing import List, Optional, Union
+from pymongo.errors import DuplicateKeyError
 from ..services.post_service import post_service
-from ..services.database import get_database
-from ..models.post import PostCreate, PostUpdate, PostResponse
+from ..services.tag_stats import tag_stats_service
+from ..services.related_posts import related_posts_service
+from ..services.pagination import Cursor, decode_cursor, next_cursor
+from ..services.serialization import ModelJSONResponse
+from ..services.export import ndjson_response, parse_after
+from ..services.conditional import (
+    post_etag, list_etag, last_modified, has_conditions, is_not_modified,
+    set_validators, not_modified_response
+)
+from ..models.post import PostCreate, PostUpdate, PostResponse, PostSummary, PostSearchResult, RelatedPost, TagStat, BulkPostRequest, BulkPostResponse
 from ..middleware.auth import get_current_user, get_admin_user, get_optional_user
 import logging
 
@@ -12,6 +20,29 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/posts", tags=["📝 Posts"])
 
+# En-tête portant le curseur de la page suivante (le corps reste une liste)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def _parse_cursor(cursor: Optional[str]) -> Optional[Cursor]:
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Curseur invalide")
+
+# Champs optionnels activables via ?include=
+INCLUDABLE_FIELDS = {"content"}
+
+def _parse_include(include: Optional[str]) -> set:
+    if not include:
+        return set()
+    fields = {field.strip() for field in include.split(",") if field.strip()}
+    unknown = fields - INCLUDABLE_FIELDS
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Valeur include invalide: {', '.join(sorted(unknown))}")
+    return fields
+
 # =====================================
 # 🔐 ROUTES PROTÉGÉES (CRUD)
 # =====================================
@@ -23,67 +54,79 @@ async def create_post(
 ):
     """✅ Créer un nouveau post - AUTHENTIFICATION REQUISE"""
     try:
-        # Ajouter l'auteur automatiquement
-        post_data = post.model_dump()
-        post_data["author_id"] = current_user.get("clerk_id")
-        post_data["author_email"] = current_user.get("email")
-        post_data["created_at"] = datetime.now()
-        post_data["updated_at"] = datetime.now()
-
-        db = await get_database()
-
-        if db is None:
-            raise HTTPException(status_code=503, detail="Base de données non disponible")
-        
-        posts_collection = db["posts"]
-
-        result = await posts_collection.insert_one(post_data)
+        # L'auteur est ajouté automatiquement par le service
+        created_post = await post_service.create_post(post, author=current_user)
 
         return {
             "success": True,
             "message": "Post créé avec succès",
-            "post_id": str(result.inserted_id),
+            "post_id": created_post.id,
             "author": current_user.get("email")
         }
 
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="Slug déjà utilisé")
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"❌ Erreur création post: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/bulk", response_model=BulkPostResponse)
+async def bulk_posts(
+    bulk_request: BulkPostRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """📦 Applique un lot d'opérations (create, update, delete, publish, unpublish) - AUTHENTIFICATION REQUISE
+
+    La propriété est vérifiée pour tout le lot en une requête, puis les écritures
+    sont appliquées en un seul `bulk_write`. Le résultat est détaillé par opération.
+    """
+    try:
+        result = await post_service.bulk_write_posts(
+            bulk_request.operations,
+            author=current_user,
+            ordered=bulk_request.ordered
+        )
+
+        logger.info(f"📦 Lot appliqué par {current_user.get('clerk_id')}: {len(result.results)} opération(s)")
+        return result
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"❌ Erreur lot de posts: {str(e)}")
+        raise HTTPException(status_code=500, detail="Erreur interne du serveur")
+
 @router.put("/{post_id}")
 async def update_post(
     post_id: str, 
     post_update: PostUpdate,
     current_user: dict = Depends(get_current_user)
 ):
-    """🔄 Mettre à jour un post - AUTHENTIFICATION REQUISE"""
-    try:
-        db = await get_database()
-        posts_collection = db["posts"]
-        
-        # Vérifier que le post existe et que l'utilisateur est propriétaire
-        existing_post = await posts_collection.find_one({"_id": ObjectId(post_id)})
-        
-        if not existing_post:
-            raise HTTPException(status_code=404, detail="Post non trouvé")
-        
-        # Vérifier les permissions (auteur ou admin)
-        if existing_post.get("author_id") != current_user.get("clerk_id"):
-            raise HTTPException(status_code=403, detail="Vous ne pouvez modifier que vos propres posts")
+    """🔄 Mettre à jour un post - AUTHENTIFICATION REQUISE
 
-        update_data = {k: v for k, v in post_update.model_dump().items() if v is not None}
-        update_data["updated_at"] = datetime.now()
+    La propriété est vérifiée dans le filtre de la mise à jour : vérification
+    et écriture se font en un seul aller-retour, sans fenêtre de concurrence.
+    """
+    try:
+        updated_post = await post_service.update_post(
+            post_id,
+            post_update,
+            author_id=current_user.get("clerk_id")
+        )
 
-        await posts_collection.update_one(
-            {"_id": ObjectId(post_id)},
-            {"$set": update_data}
-        )      
+        if not updated_post:
+            # Aucun document modifié : post absent ou appartenant à un autre auteur
+            if await post_service.post_exists(post_id):
+                raise HTTPException(status_code=403, detail="Vous ne pouvez modifier que vos propres posts")
+            raise HTTPException(status_code=404, detail="Post non trouvé")
         
         logger.info(f"✅ Post mis à jour: {post_id}")
         return {"success": True, "message": "Post mis à jour"}
         
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="Slug déjà utilisé")
     except HTTPException:
         raise
     except Exception as e:
@@ -97,21 +140,14 @@ async def delete_post(
 ):
     """🗑️ Supprimer un post - AUTHENTIFICATION REQUISE"""
     try:
-        db = await get_database()
-        posts_collection = db["posts"]
-        
-        # Vérifier propriétaire
-        existing_post = await posts_collection.find_one({"_id": ObjectId(post_id)})
-        
-        if not existing_post:
+        # Suppression conditionnée au propriétaire (un seul aller-retour)
+        deleted = await post_service.delete_post(post_id, author_id=current_user.get("clerk_id"))
+
+        if not deleted:
+            if await post_service.post_exists(post_id):
+                raise HTTPException(status_code=403, detail="Vous ne pouvez supprimer que vos propres posts")
             raise HTTPException(status_code=404, detail="Post non trouvé")
         
-        if existing_post.get("author_id") != current_user.get("clerk_id"):
-            raise HTTPException(status_code=403, detail="Vous ne pouvez supprimer que vos propres posts")
-        
-        await posts_collection.delete_one({"_id": ObjectId(post_id)})
-        
-        logger.info(f"✅ Post supprimé: {post_id}")
         return {"success": True, "message": "Post supprimé"}
         
     except HTTPException:
@@ -124,47 +160,157 @@ async def delete_post(
 # 📖 ROUTES PUBLIQUES (LECTURE)
 # =====================================
 
-@router.get("/", response_model=List[PostResponse])
+def _list_response(posts: List[Union[PostSummary, PostResponse]], include_content: bool) -> ModelJSONResponse:
+    """Page de posts sérialisée en une passe (sans revalidation par response_model)"""
+    return ModelJSONResponse(posts, List[PostResponse] if include_content else List[PostSummary])
+
+def _can_read(post: dict, current_user: Optional[dict]) -> bool:
+    """Un brouillon n'est visible que par son auteur"""
+    return post.get("is_published", False) or (
+        current_user is not None and current_user.get("clerk_id") == post.get("author_id")
+    )
+
+@router.get("/", response_model=List[Union[PostResponse, PostSummary]])
 async def list_posts(
+    request: Request,
     skip: int = Query(0, ge=0, description="Nombre de posts à ignorer"),
     limit: int = Query(20, ge=1, le=100, description="Nombre maximum de posts"),
+    cursor: Optional[str] = Query(None, description=f"Curseur de pagination (en-tête {NEXT_CURSOR_HEADER}), remplace skip"),
     is_published: Optional[bool] = Query(None, description="Filtrer par statut de publication"),
     tag: Optional[str] = Query(None, description="Filtrer par tag"),
     author_id: Optional[str] = Query(None, description="Filtrer par auteur"),
+    include: Optional[str] = Query(None, description="`content` pour inclure le corps complet des posts"),
     current_user: Optional[dict] = Depends(get_optional_user)
 ):
-    """📋 Lister les posts avec filtres"""
+    """📋 Lister les posts avec filtres
+
+    Retourne des résumés sans `content`, sauf avec `?include=content`.
+    La page suivante s'obtient en repassant la valeur de l'en-tête `X-Next-Cursor`
+    dans `cursor` (coût constant quelle que soit la profondeur).
+    ETag = empreinte des (id, updated_at) de la page : une requête conditionnelle
+    est tranchée par une requête ne chargeant que ces deux champs.
+    """
+    after = _parse_cursor(cursor)
+    include_fields = _parse_include(include)
     try:
-        logger.info(f"📋 Liste posts demandée par: {current_user.get('clerk_id') if current_user else 'Anonymous'}")
+        logger.debug(f"📋 Liste posts demandée par: {current_user.get('clerk_id') if current_user else 'Anonymous'}")
         
         # Si utilisateur non connecté, ne montrer que les posts publiés
         if not current_user:
             is_published = True
-        
-        posts = await post_service.get_posts(
+
+        query = dict(
             skip=skip,
             limit=limit,
             is_published=is_published,
             tag=tag,
             author_id=author_id,
-            current_user_id=current_user.get("clerk_id") if current_user else None
+            current_user_id=current_user.get("clerk_id") if current_user else None,
+            after=after
         )
+        variant = ",".join(sorted(include_fields))
+
+        if has_conditions(request):
+            validators = await post_service.get_posts_validators(**query)
+            etag = list_etag(((str(doc["_id"]), doc.get("updated_at")) for doc in validators), variant)
+            modified = last_modified(doc.get("updated_at") for doc in validators)
+            if is_not_modified(request, etag, modified):
+                return not_modified_response(etag, modified)
         
-        logger.info(f"✅ {len(posts)} posts récupérés")
-        return posts
+        include_content = "content" in include_fields
+        posts = await post_service.get_posts(**query, include_content=include_content)
+
+        response = _list_response(posts, include_content)
+        cursor_value = next_cursor(posts, limit)
+        if cursor_value:
+            response.headers[NEXT_CURSOR_HEADER] = cursor_value
+        set_validators(
+            response,
+            list_etag(((post.id, post.updated_at) for post in posts), variant),
+            last_modified(post.updated_at for post in posts)
+        )
+        
+        logger.debug(f"✅ {len(posts)} posts récupérés")
+        return response
         
     except Exception as e:
         logger.error(f"❌ Erreur récupération posts: {str(e)}")
         raise HTTPException(status_code=500, detail="Erreur serveur")
 
+@router.get("/search", response_model=List[PostSearchResult])
+async def search_posts(
+    q: str = Query(..., min_length=1, max_length=200, description="Termes recherchés (\"phrase exacte\", -exclusion)"),
+    skip: int = Query(0, ge=0, le=1000, description="Nombre de résultats à ignorer"),
+    limit: int = Query(20, ge=1, le=50, description="Nombre maximum de résultats"),
+    tag: Optional[str] = Query(None, description="Restreindre à un tag")
+):
+    """🔎 Recherche plein texte dans les posts publiés
+
+    Résultats classés par pertinence (titre > tags > extrait > contenu), sans `content`,
+    avec le titre et un extrait surlignés par des balises `<mark>`.
+    """
+    try:
+        results = await post_service.search_posts(q, skip=skip, limit=limit, tag=tag)
+
+        logger.debug(f"✅ Recherche '{q}': {len(results)} résultat(s)")
+        return ModelJSONResponse(results, List[PostSearchResult])
+
+    except Exception as e:
+        logger.error(f"❌ Erreur recherche posts: {str(e)}")
+        raise HTTPException(status_code=500, detail="Erreur interne du serveur")
+
+@router.get("/tags", response_model=List[TagStat])
+async def list_tags(
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Nombre maximum de tags (les plus utilisés)")
+):
+    """🏷️ Nuage de tags : nombre de posts publiés par tag
+
+    Servi depuis les compteurs matérialisés `tag_stats` (instantané mémoire de courte durée).
+    """
+    try:
+        stats = await tag_stats_service.get_stats()
+        tags = [TagStat(tag=item["tag"], count=item["published"]) for item in stats if item["published"] > 0]
+        return ModelJSONResponse(tags[:limit] if limit else tags, List[TagStat])
+
+    except Exception as e:
+        logger.error(f"❌ Erreur récupération tags: {str(e)}")
+        raise HTTPException(status_code=500, detail="Erreur interne du serveur")
+
+@router.get("/export.ndjson", response_class=StreamingResponse)
+async def export_posts(
+    after: Optional[str] = Query(None, description="Reprendre après cet id (dernière ligne reçue)"),
+    is_published: Optional[bool] = Query(None, description="Filtrer par statut de publication"),
+    current_user: dict = Depends(get_admin_user)
+):
+    """👑 Export NDJSON de tous les posts, une ligne par post, trié par id (admin uniquement)
+
+    Flux continu à mémoire constante. Déclarée avant /{post_id}.
+    """
+    logger.info(f"📦 Export posts demandé par: {current_user.get('clerk_id')}")
+    return ndjson_response(
+        post_service.export_posts(after=parse_after(after), is_published=is_published),
+        PostResponse,
+        "posts.ndjson"
+    )
+
 @router.get("/slug/{slug}", response_model=PostResponse)
 async def get_post_by_slug(
     slug: str,
+    request: Request,
     current_user: Optional[dict] = Depends(get_optional_user)
 ):
-    """📖 Récupère un post par son slug"""
+    """📖 Récupère un post par son slug (ETag / Last-Modified, 304 si inchangé)"""
     try:
-        logger.info(f"🔍 Récupération post slug: {slug}")
+        logger.debug(f"🔍 Récupération post slug: {slug}")
+
+        # Revalidation : projection sans `content`
+        if has_conditions(request):
+            validators = await post_service.get_post_validators(slug=slug)
+            if validators and _can_read(validators, current_user):
+                etag = post_etag(validators["_id"], validators.get("updated_at"))
+                modified = last_modified([validators.get("updated_at")])
+                if is_not_modified(request, etag, modified):
+                    return not_modified_response(etag, modified)
         
         post = await post_service.get_post_by_slug(slug)
 
@@ -176,8 +322,10 @@ async def get_post_by_slug(
             if not current_user or current_user["clerk_id"] != post.author_id:
                 raise HTTPException(status_code=404, detail="Post non trouvé")
 
-        logger.info(f"✅ Post récupéré: {post.slug}")
-        return post
+        response = ModelJSONResponse(post, PostResponse)
+        set_validators(response, post_etag(post.id, post.updated_at), last_modified([post.updated_at]))
+        logger.debug(f"✅ Post récupéré: {post.slug}")
+        return response
 
     except HTTPException:
         raise
@@ -188,11 +336,21 @@ async def get_post_by_slug(
 @router.get("/{post_id}", response_model=PostResponse)
 async def get_post_by_id(
     post_id: str,
+    request: Request,
     current_user: Optional[dict] = Depends(get_optional_user)
 ):
-    """📖 Récupère un post par son ID"""
+    """📖 Récupère un post par son ID (ETag / Last-Modified, 304 si inchangé)"""
     try:
-        logger.info(f"🔍 Récupération post ID: {post_id}")
+        logger.debug(f"🔍 Récupération post ID: {post_id}")
+
+        # Revalidation : projection sans `content`
+        if has_conditions(request):
+            validators = await post_service.get_post_validators(post_id=post_id)
+            if validators and _can_read(validators, current_user):
+                etag = post_etag(validators["_id"], validators.get("updated_at"))
+                modified = last_modified([validators.get("updated_at")])
+                if is_not_modified(request, etag, modified):
+                    return not_modified_response(etag, modified)
         
         post = await post_service.get_post_by_id(post_id)
 
@@ -204,8 +362,10 @@ async def get_post_by_id(
             if not current_user or current_user["clerk_id"] != post.author_id:
                 raise HTTPException(status_code=404, detail="Post non trouvé")
 
-        logger.info(f"✅ Post récupéré: {post.id}")
-        return post
+        response = ModelJSONResponse(post, PostResponse)
+        set_validators(response, post_etag(post.id, post.updated_at), last_modified([post.updated_at]))
+        logger.debug(f"✅ Post récupéré: {post.id}")
+        return response
 
     except HTTPException:
         raise
@@ -213,23 +373,62 @@ async def get_post_by_id(
         logger.error(f"❌ Erreur récupération post: {str(e)}")
         raise HTTPException(status_code=500, detail="Erreur interne du serveur")
 
-@router.get("/tags/{tag}", response_model=List[PostResponse])
+@router.get("/tags/{tag}", response_model=List[Union[PostResponse, PostSummary]])
 async def get_posts_by_tag(
     tag: str,
     skip: int = Query(0, ge=0),
-    limit: int = Query(10, ge=1, le=100)
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description=f"Curseur de pagination (en-tête {NEXT_CURSOR_HEADER}), remplace skip"),
+    include: Optional[str] = Query(None, description="`content` pour inclure le corps complet des posts")
 ):
-    """📋 Récupère les posts par tag"""
+    """📋 Récupère les posts par tag (résumés sans `content`, sauf avec `?include=content`)"""
+    after = _parse_cursor(cursor)
+    include_fields = _parse_include(include)
+    include_content = "content" in include_fields
     try:
         posts = await post_service.get_posts_by_tag(
             tag=tag,
             skip=skip,
-            limit=limit
+            limit=limit,
+            after=after,
+            include_content=include_content
         )
 
-        logger.info(f"✅ Récupération posts tag '{tag}': {len(posts)} trouvés")
-        return posts
+        response = _list_response(posts, include_content)
+        cursor_value = next_cursor(posts, limit)
+        if cursor_value:
+            response.headers[NEXT_CURSOR_HEADER] = cursor_value
+
+        logger.debug(f"✅ Récupération posts tag '{tag}': {len(posts)} trouvés")
+        return response
 
     except Exception as e:
         logger.error(f"❌ Erreur récupération posts par tag: {str(e)}")
         raise HTTPException(status_code=500, detail="Erreur interne du serveur")
+
+@router.get("/{post_id}/related", response_model=List[RelatedPost])
+async def get_related_posts(
+    post_id: str,
+    limit: Optional[int] = Query(None, ge=1, le=20, description="Nombre maximum de posts similaires"),
+    current_user: Optional[dict] = Depends(get_optional_user)
+):
+    """🔗 Posts similaires (précalculés : tags communs et fraîcheur)
+
+    404 pour le brouillon d'un autre auteur, comme GET /posts/{post_id}.
+    Déclarée après /tags/{tag} : /posts/tags/related reste la liste du tag « related ».
+    """
+    try:
+        related = await related_posts_service.get_related(
+            post_id, limit=limit, viewer_id=current_user["clerk_id"] if current_user else None
+        )
+
+        if related is None:
+            raise HTTPException(status_code=404, detail="Post non trouvé")
+
+        return ModelJSONResponse(related, List[RelatedPost])
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"❌ Erreur récupération posts similaires: {str(e)}")
+        raise HTTPException(status_code=500, detail="Erreur interne du serveur")
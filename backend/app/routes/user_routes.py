@@ -1,10 +1,13 @@
 from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
 import logging
 import json
 
-from ..models.user import UserCreate, UserUpdate, UserResponse
+from ..models.user import UserCreate, UserProfileUpdate, UserUpdate, UserResponse
 from ..services.user_service import user_service
+from ..services.clerk_service import clerk_service
+from ..services.export import ndjson_response, parse_after
 from ..middleware.auth import get_current_user, get_optional_user, get_admin_user
 
 logger = logging.getLogger(__name__)
@@ -40,7 +43,7 @@ async def get_current_user_profile(
 ):
     """📱 Récupère le profil de l'utilisateur connecté"""
     try:
-        logger.info(f"🔍 Profil demandé: {current_user.get('clerk_id')}")
+        logger.debug(f"🔍 Profil demandé: {current_user.get('clerk_id')}")
         
         user = await user_service.get_user_by_clerk_id(current_user["clerk_id"])
         
@@ -57,7 +60,7 @@ async def get_current_user_profile(
             user = await user_service.create_user(user_create)
             logger.info(f"✅ Utilisateur créé automatiquement: {user.clerk_id}")
         
-        logger.info(f"✅ Profil récupéré: {user.clerk_id}")
+        logger.debug(f"✅ Profil récupéré: {user.clerk_id}")
         return user
         
     except Exception as e:
@@ -66,10 +69,10 @@ async def get_current_user_profile(
 
 @router.put("/me", response_model=UserResponse)
 async def update_current_user_profile(
-    user_update: UserUpdate,
+    user_update: UserProfileUpdate,
     current_user: dict = Depends(get_current_user)
 ):
-    """🔄 Met à jour le profil de l'utilisateur connecté"""
+    """🔄 Met à jour le profil de l'utilisateur connecté (rôle et statut ignorés)"""
     try:
         logger.info(f"🔄 Mise à jour profil: {current_user.get('clerk_id')}")
         
@@ -80,7 +83,8 @@ async def update_current_user_profile(
         
         if not updated_user:
             raise HTTPException(status_code=404, detail="Utilisateur non trouvé")
-        
+
+        await clerk_service.evict_user(updated_user.clerk_id)
         logger.info(f"✅ Profil mis à jour: {updated_user.clerk_id}")
         return updated_user
         
@@ -102,16 +106,33 @@ async def list_users(
 ):
     """👑 Liste tous les utilisateurs (admin uniquement)"""
     try:
-        logger.info(f"📋 Liste demandée par admin: {current_user.get('clerk_id')}")
+        logger.debug(f"📋 Liste demandée par admin: {current_user.get('clerk_id')}")
         
         users = await user_service.get_all_users(skip=skip, limit=limit)
-        logger.info(f"✅ {len(users)} utilisateurs récupérés")
+        logger.debug(f"✅ {len(users)} utilisateurs récupérés")
         return users
         
     except Exception as e:
         logger.error(f"❌ Erreur liste: {str(e)}")
         raise HTTPException(status_code=500, detail="Erreur serveur")
 
+@router.get("/export.ndjson", response_class=StreamingResponse)
+async def export_users(
+    after: Optional[str] = Query(None, description="Reprendre après cet id (dernière ligne reçue)"),
+    is_active: Optional[bool] = Query(None, description="Filtrer par statut actif"),
+    current_user: dict = Depends(get_admin_user)
+):
+    """👑 Export NDJSON de tous les utilisateurs, trié par id (admin uniquement)
+
+    Flux continu à mémoire constante. Déclarée avant /{user_id}.
+    """
+    logger.info(f"📦 Export utilisateurs demandé par: {current_user.get('clerk_id')}")
+    return ndjson_response(
+        user_service.export_users(after=parse_after(after), is_active=is_active),
+        UserResponse,
+        "users.ndjson"
+    )
+
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user_by_id(
     user_id: str,
@@ -124,7 +145,7 @@ async def get_user_by_id(
         if not user:
             raise HTTPException(status_code=404, detail="Utilisateur non trouvé")
         
-        logger.info(f"✅ Utilisateur récupéré: {user_id}")
+        logger.debug(f"✅ Utilisateur récupéré: {user_id}")
         return user
         
     except HTTPException:
@@ -133,6 +154,35 @@ async def get_user_by_id(
         logger.error(f"❌ Erreur récupération: {str(e)}")
         raise HTTPException(status_code=500, detail="Erreur serveur")
 
+@router.put("/{user_id}", response_model=UserResponse)
+async def update_user_by_admin(
+    user_id: str,
+    user_update: UserUpdate,
+    current_user: dict = Depends(get_admin_user)
+):
+    """👑 Met à jour un utilisateur, rôle et statut compris (admin uniquement)"""
+    try:
+        logger.info(f"🔄 Mise à jour par admin: {user_id}")
+
+        user = await user_service.get_user_by_id(user_id)
+        if not user:
+            raise HTTPException(status_code=404, detail="Utilisateur non trouvé")
+
+        updated_user = await user_service.update_user(clerk_id=user.clerk_id, user_update=user_update)
+        if not updated_user:
+            raise HTTPException(status_code=404, detail="Utilisateur non trouvé")
+
+        # Rôle et statut sont lus depuis le cache d'identité : éviction immédiate
+        await clerk_service.evict_user(user.clerk_id)
+        logger.info(f"✅ Utilisateur mis à jour par admin: {user_id}")
+        return updated_user
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"❌ Erreur mise à jour admin: {str(e)}")
+        raise HTTPException(status_code=500, detail="Erreur serveur")
+
 @router.delete("/{user_id}", status_code=204)
 async def deactivate_user_by_admin(
     user_id: str,
@@ -152,7 +202,8 @@ async def deactivate_user_by_admin(
         
         if not deactivated:
             raise HTTPException(status_code=404, detail="Erreur désactivation")
-        
+
+        await clerk_service.evict_user(user.clerk_id)
         logger.info(f"✅ Utilisateur désactivé: {user_id}")
         
     except HTTPException:
@@ -3,6 +3,7 @@ import logging
 import json
 from datetime import datetime
 from ..services.database import get_database
+from ..services.clerk_service import clerk_service
 
 logger = logging.getLogger(__name__)
 
@@ -13,8 +14,7 @@ async def clerk_webhook(request: Request):
     """🎣 Webhook Clerk pour synchronisation utilisateurs"""
     try:
         # Log de réception
-        print("🎣 WEBHOOK CLERK REÇU !")
-        logger.info("🎣 Webhook Clerk reçu")
+        logger.debug("🎣 Webhook Clerk reçu")
         
         # Lire et parser le payload
         body = await request.body()
@@ -27,9 +27,7 @@ async def clerk_webhook(request: Request):
         timestamp = request.headers.get("svix-timestamp")
 
         # Log des informations clés
-        print(f"🎯 Event Type: {event_type}")
-        print(f"🆔 Event ID: {event_id}")
-        print(f"👤 User ID: {user_data.get('id')}")
+        logger.debug(f"🎯 Event: {event_type} ({event_id}) - User ID: {user_data.get('id')}")
 
         # Traitement selon le type d'événement
         if event_type == "user.created":
@@ -39,7 +37,7 @@ async def clerk_webhook(request: Request):
         elif event_type == "user.deleted":
             await handle_user_deleted(user_data)
         else:
-            print(f"ℹ️ Événement non traité: {event_type}")
+            logger.debug(f"ℹ️ Événement non traité: {event_type}")
 
         logger.info(f"✅ Webhook {event_type} traité avec succès")
 
@@ -55,7 +53,6 @@ async def clerk_webhook(request: Request):
         logger.error("❌ Payload JSON invalide")
         raise HTTPException(status_code=400, detail="JSON invalide")
     except Exception as e:
-        print(f"❌ ERREUR WEBHOOK: {str(e)}")
         logger.error(f"❌ Erreur webhook: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -80,9 +77,7 @@ async def handle_user_created(user_data: dict):
             primary_email = email_addresses[0].get('email_address')
         
 
-        print(f"🆕 NOUVEL UTILISATEUR CRÉÉ")
-        print(f"🆔 ID: {user_id}")
-        print(f"📧 Email: {primary_email}")
+        logger.debug(f"🆕 Nouvel utilisateur: {user_id}")
         
         # Document MongoDB
         user_doc = {
@@ -104,17 +99,15 @@ async def handle_user_created(user_data: dict):
             users_collection = db["users"]
 
             # Vérifier si existe déjà
-            existing_user = await users_collection.find_one({"clerk_id: user_id"})
+            existing_user = await users_collection.find_one({"clerk_id": user_id})
 
             if existing_user:
-                print(f"⚠️ Utilisateur déjà existant: {user_id}")
+                logger.debug(f"⚠️ Utilisateur déjà existant: {user_id}")
             else:
                 result = await users_collection.insert_one(user_doc)
-                print(f"💾 ✅ Utilisateur sauvegardé MongoDB: {result.inserted_id}")
                 logger.info(f"💾 Utilisateur sauvegardé: {primary_email}")
 
         except Exception as db_error:
-            print(f"❌ Erreur MongoDB: {str(db_error)}")
             logger.error(f"❌ Erreur MongoDB: {str(db_error)}")
 
         logger.info(f"🆕 Utilisateur créé: {primary_email or user_id}")
@@ -126,7 +119,9 @@ async def handle_user_updated(user_data: dict):
     """Traite la mise à jour d'un utilisateur"""
     try:
         user_id = user_data.get('id')
-        print(f"🔄 UTILISATEUR MIS À JOUR: {user_id}")
+
+        # Invalider les identités en cache avant toute écriture
+        await clerk_service.evict_user(user_id)
 
         # mise à jour MongoDB
         db = await get_database()
@@ -145,8 +140,10 @@ async def handle_user_updated(user_data: dict):
             {"$set": update_doc}
         )
 
-        print(f"🔄 ✅ Utilisateur mis à jour: {result.modified_count} doc(s)")
-        logger.info(f"🔄 Utilisateur mis à jour: {user_id}")
+        # Puis après l'écriture : une requête concurrente a pu remettre l'ancienne version en cache
+        await clerk_service.evict_user(user_id)
+
+        logger.info(f"🔄 Utilisateur mis à jour: {user_id} ({result.modified_count} doc)")
 
     except Exception as e:
         logger.error(f"❌ Erreur mise à jour: {str(e)}")
@@ -156,7 +153,9 @@ async def handle_user_deleted(user_data: dict):
     """Traite la suppression d'un utilisateur"""
     try:
         user_id = user_data.get('id')
-        print(f"🗑️ UTILISATEUR SUPPRIMÉ: {user_id}")
+
+        # Le cache ne doit jamais servir un utilisateur supprimé
+        await clerk_service.evict_user(user_id)
 
         # Suppression MongoDB (soft delete)
         db = await get_database()
@@ -167,8 +166,9 @@ async def handle_user_deleted(user_data: dict):
             {"$set": {"is_active": False, "deleted_at": datetime.now().isoformat()}}
         )
 
-        print(f"🗑️ ✅ Utilisateur désactivé: {result.modified_count} doc(s)")
-        logger.info(f"🗑️ Utilisateur supprimé: {user_id}")
+        await clerk_service.evict_user(user_id)
+
+        logger.info(f"🗑️ Utilisateur supprimé: {user_id} ({result.modified_count} doc)")
 
     except Exception as e:
         logger.error(f"❌ Erreur suppression: {str(e)}")
@@ -176,8 +176,7 @@ async def handle_user_deleted(user_data: dict):
 @router.get("/test")
 async def test_webhook():
     """🧪 Test endpoint"""
-    print("🧪 ENDPOINT TEST APPELÉ")
-    logger.info("🧪 Test endpoint appelé")
+    logger.debug("🧪 Test endpoint appelé")
     return {
         "status": "webhook endpoint actif",
         "timestamp": datetime.now().isoformat(),
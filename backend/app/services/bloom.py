@@ -0,0 +1,69 @@
+import math
+import hashlib
+from typing import Any, Dict, Iterable
+
+
+class BloomFilter:
+    """Filtre de Bloom : appartenance probable, sans faux négatif
+
+    `capacity` éléments pour un taux de faux positifs `error_rate` ; au-delà, le
+    taux réel augmente (voir `estimated_false_positive_rate`). Pas de suppression :
+    un élément retiré reste « peut-être présent » jusqu'à la reconstruction.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        self.capacity = max(int(capacity), 1)
+        self.error_rate = error_rate
+        # m = -n ln(p) / ln(2)², k = (m / n) ln(2)
+        self.bits = max(int(math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2)), 8)
+        self.hashes = max(int(round(self.bits / self.capacity * math.log(2))), 1)
+        self._array = bytearray((self.bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str) -> Iterable[int]:
+        # Double hachage (Kirsch-Mitzenmacher) à partir d'une seule empreinte de 128 bits
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.bits for i in range(self.hashes))
+
+    def add(self, key: str) -> None:
+        added = False
+        for position in self._positions(key):
+            byte, bit = divmod(position, 8)
+            if not self._array[byte] & (1 << bit):
+                self._array[byte] |= 1 << bit
+                added = True
+        # Approximation : un élément dont tous les bits étaient déjà à 1 n'est pas compté
+        if added:
+            self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        for position in self._positions(key):
+            byte, bit = divmod(position, 8)
+            if not self._array[byte] & (1 << bit):
+                return False
+        return True
+
+    @property
+    def memory_bytes(self) -> int:
+        return len(self._array)
+
+    @property
+    def saturated(self) -> bool:
+        return self.count > self.capacity
+
+    def estimated_false_positive_rate(self) -> float:
+        """(1 - e^(-kn/m))^k pour le nombre d'éléments actuel"""
+        return (1 - math.exp(-self.hashes * self.count / self.bits)) ** self.hashes
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "items": self.count,
+            "capacity": self.capacity,
+            "bits": self.bits,
+            "hashes": self.hashes,
+            "memory_bytes": self.memory_bytes,
+            "target_false_positive_rate": self.error_rate,
+            "estimated_false_positive_rate": round(self.estimated_false_positive_rate(), 6),
+        }
@@ -0,0 +1,128 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional, Set, Tuple
+
+MISSING = object()
+
+
+class TTLCache:
+    """Cache mémoire borné (LRU) avec expiration par entrée et compteurs de hits/misses
+
+    Chaque entrée peut être rattachée à des groupes (ex: `user:<clerk_id>`) afin
+    d'invalider d'un coup toutes les entrées liées à un même objet. Avec `max_bytes`,
+    la taille déclarée des entrées (`size`) est aussi plafonnée.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300, max_bytes: Optional[int] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+        # clé -> (expiration, valeur, groupes, taille)
+        self._data: "OrderedDict[Hashable, Tuple[float, Any, Tuple[str, ...], int]]" = OrderedDict()
+        self._bytes = 0
+        self._groups: Dict[str, Set[Hashable]] = {}
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Retourne la valeur si présente et non expirée"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            expires_at, value, _, _ = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        ttl: Optional[float] = None,
+        groups: Iterable[str] = (),
+        size: int = 0
+    ) -> None:
+        """Ajoute ou remplace une entrée (TTL par défaut si non précisé)"""
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        # Entrée plus grosse que le plafond : jamais mise en cache
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+
+            groups = tuple(groups)
+            self._data[key] = (time.monotonic() + ttl, value, groups, size)
+            self._bytes += size
+            for group in groups:
+                self._groups.setdefault(group, set()).add(key)
+
+            while len(self._data) > self.maxsize or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                oldest = next(iter(self._data))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> bool:
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+                return True
+            return False
+
+    def invalidate_group(self, group: str) -> int:
+        """Supprime toutes les entrées rattachées au groupe, retourne leur nombre"""
+        with self._lock:
+            keys = self._groups.pop(group, set())
+            for key in list(keys):
+                self._remove(key)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._groups.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _remove(self, key: Hashable) -> None:
+        _, _, groups, size = self._data.pop(key)
+        self._bytes -= size
+        for group in groups:
+            members = self._groups.get(group)
+            if members is not None:
+                members.discard(key)
+                if not members:
+                    del self._groups[group]
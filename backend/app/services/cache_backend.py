@@ -0,0 +1,390 @@
+import os
+import json
+import uuid
+import pickle
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Hashable, Iterable, List, Optional
+
+from .cache import TTLCache, MISSING
+
+logger = logging.getLogger(__name__)
+
+# Groupe spécial diffusé par `clear()` : vide tout l'espace de noms
+ALL_GROUPS = "*"
+
+
+class CacheBackend(ABC):
+    """Interface commune des caches (asynchrone)
+
+    Les valeurs sont rangées par espace de noms (`post`, `user`, `identity`) et
+    peuvent être rattachées à des groupes pour une invalidation ciblée.
+    `get`/`mget` retournent `default`/`MISSING` pour une clé absente ou expirée.
+    """
+
+    kind = "base"
+
+    def __init__(self, namespace: str, manager: "CacheManager", ttl: float):
+        self.namespace = namespace
+        self.manager = manager
+        self.ttl = ttl
+
+    @abstractmethod
+    async def get(self, key: Hashable, default: Any = None) -> Any:
+        ...
+
+    @abstractmethod
+    async def mget(self, keys: List[Hashable]) -> List[Any]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: Hashable, value: Any, ttl: Optional[float] = None,
+                  groups: Iterable[str] = (), size: int = 0) -> None:
+        ...
+
+    @abstractmethod
+    async def mset(self, items: Dict[Hashable, Any], ttl: Optional[float] = None,
+                   groups: Iterable[str] = ()) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, key: Hashable) -> None:
+        ...
+
+    @abstractmethod
+    async def invalidate_groups(self, groups: Iterable[str]) -> int:
+        ...
+
+    @abstractmethod
+    async def clear(self) -> None:
+        ...
+
+    def invalidate_local(self, groups: Iterable[str]) -> int:
+        """Invalidation reçue d'un autre worker (sans effet sur un cache partagé)"""
+        return 0
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        ...
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Cache propre au worker (TTLCache) ; les invalidations sont diffusées aux autres workers"""
+
+    kind = "memory"
+
+    def __init__(self, namespace: str, manager: "CacheManager", maxsize: int, ttl: float,
+                 max_bytes: Optional[int] = None):
+        super().__init__(namespace, manager, ttl)
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl, max_bytes=max_bytes)
+
+    async def get(self, key: Hashable, default: Any = None) -> Any:
+        return self._cache.get(key, default)
+
+    async def mget(self, keys: List[Hashable]) -> List[Any]:
+        return [self._cache.get(key, MISSING) for key in keys]
+
+    async def set(self, key: Hashable, value: Any, ttl: Optional[float] = None,
+                  groups: Iterable[str] = (), size: int = 0) -> None:
+        self._cache.set(key, value, ttl=ttl, groups=groups, size=size)
+
+    async def mset(self, items: Dict[Hashable, Any], ttl: Optional[float] = None,
+                   groups: Iterable[str] = ()) -> None:
+        groups = tuple(groups)
+        for key, value in items.items():
+            self._cache.set(key, value, ttl=ttl, groups=groups)
+
+    async def delete(self, key: Hashable) -> None:
+        self._cache.delete(key)
+
+    async def invalidate_groups(self, groups: Iterable[str]) -> int:
+        groups = list(groups)
+        removed = self.invalidate_local(groups)
+        await self.manager.publish(self.namespace, groups)
+        return removed
+
+    async def clear(self) -> None:
+        self._cache.clear()
+        await self.manager.publish(self.namespace, [ALL_GROUPS])
+
+    def invalidate_local(self, groups: Iterable[str]) -> int:
+        removed = 0
+        for group in groups:
+            if group == ALL_GROUPS:
+                removed += len(self._cache)
+                self._cache.clear()
+            else:
+                removed += self._cache.invalidate_group(group)
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.kind, **self._cache.stats()}
+
+
+class RedisCacheBackend(CacheBackend):
+    """Cache partagé par tous les workers (protocole Redis)
+
+    Valeurs sérialisées avec pickle (Redis interne, non exposé). Chaque groupe est
+    un SET Redis contenant les clés qui lui sont rattachées. La mémoire est bornée
+    côté serveur (`maxmemory`), pas par worker. Si Redis est indisponible, les
+    lectures se comportent comme des absences et l'erreur est journalisée.
+    """
+
+    kind = "redis"
+
+    def __init__(self, namespace: str, manager: "CacheManager", ttl: float):
+        super().__init__(namespace, manager, ttl)
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, key: Hashable) -> str:
+        return f"{self.manager.prefix}:{self.namespace}:{key if isinstance(key, str) else repr(key)}"
+
+    def _group_key(self, group: str) -> str:
+        return f"{self.manager.prefix}:{self.namespace}:group:{group}"
+
+    async def get(self, key: Hashable, default: Any = None) -> Any:
+        value = (await self.mget([key]))[0]
+        return default if value is MISSING else value
+
+    async def mget(self, keys: List[Hashable]) -> List[Any]:
+        if not keys:
+            return []
+        try:
+            raw_values = await self.manager.redis.mget([self._key(key) for key in keys])
+        except Exception as e:
+            logger.error(f"❌ Erreur lecture cache Redis ({self.namespace}): {str(e)}")
+            self.misses += len(keys)
+            return [MISSING] * len(keys)
+        values = []
+        for raw in raw_values:
+            if raw is None:
+                self.misses += 1
+                values.append(MISSING)
+            else:
+                self.hits += 1
+                values.append(pickle.loads(raw))
+        return values
+
+    async def set(self, key: Hashable, value: Any, ttl: Optional[float] = None,
+                  groups: Iterable[str] = (), size: int = 0) -> None:
+        await self.mset({key: value}, ttl=ttl, groups=groups)
+
+    async def mset(self, items: Dict[Hashable, Any], ttl: Optional[float] = None,
+                   groups: Iterable[str] = ()) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0 or not items:
+            return
+
+        ttl_ms = max(int(ttl * 1000), 1)
+        groups = tuple(groups)
+        keys = [self._key(key) for key in items]
+
+        # Un seul aller-retour pour les valeurs et leurs groupes
+        pipe = self.manager.redis.pipeline(transaction=False)
+        for redis_key, value in zip(keys, items.values()):
+            pipe.set(redis_key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), px=ttl_ms)
+        for group in groups:
+            group_key = self._group_key(group)
+            pipe.sadd(group_key, *keys)
+            # Le groupe survit à ses membres, qui expirent d'eux-mêmes
+            pipe.pexpire(group_key, max(ttl_ms, int(self.ttl * 1000)) * 2)
+        try:
+            await pipe.execute()
+        except Exception as e:
+            logger.error(f"❌ Erreur écriture cache Redis ({self.namespace}): {str(e)}")
+
+    async def delete(self, key: Hashable) -> None:
+        try:
+            await self.manager.redis.delete(self._key(key))
+        except Exception as e:
+            logger.error(f"❌ Erreur suppression cache Redis ({self.namespace}): {str(e)}")
+
+    async def invalidate_groups(self, groups: Iterable[str]) -> int:
+        group_keys = [self._group_key(group) for group in groups]
+        if not group_keys:
+            return 0
+
+        redis = self.manager.redis
+        try:
+            pipe = redis.pipeline(transaction=False)
+            for group_key in group_keys:
+                pipe.smembers(group_key)
+            members = set()
+            for group_members in await pipe.execute():
+                members.update(group_members)
+
+            await redis.delete(*members, *group_keys)
+        except Exception as e:
+            # Les entrées concernées expireront d'elles-mêmes (TTL)
+            logger.error(f"❌ Erreur invalidation cache Redis ({self.namespace}): {str(e)}")
+            return 0
+        return len(members)
+
+    async def clear(self) -> None:
+        redis = self.manager.redis
+        try:
+            keys = [key async for key in redis.scan_iter(match=f"{self.manager.prefix}:{self.namespace}:*", count=500)]
+            if keys:
+                await redis.delete(*keys)
+        except Exception as e:
+            logger.error(f"❌ Erreur vidage cache Redis ({self.namespace}): {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "backend": self.kind,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+class CacheManager:
+    """Crée les caches selon la configuration et diffuse les invalidations
+
+    `CACHE_BACKEND` (memory | redis) s'applique à tous les espaces de noms, sauf
+    surcharge par `<NAMESPACE>_CACHE_BACKEND` (ex: POST_CACHE_BACKEND=redis).
+    Avec `CACHE_REDIS_URL`, les invalidations des caches mémoire sont publiées
+    sur un canal Redis et appliquées par les autres workers. Après une coupure
+    de l'abonnement, les caches mémoire sont vidés (messages possiblement perdus)
+    et l'écoute reprend.
+    """
+
+    def __init__(self):
+        self.default_backend = os.getenv("CACHE_BACKEND", "memory").lower()
+        self.redis_url = os.getenv("CACHE_REDIS_URL")
+        self.prefix = os.getenv("CACHE_KEY_PREFIX", "blog")
+        self.channel = f"{self.prefix}:cache:invalidate"
+        self.broadcast = os.getenv("CACHE_INVALIDATION_BROADCAST", "true").lower() == "true"
+        # Délai avant réabonnement (doublé à chaque échec, plafonné)
+        self.reconnect_delay = float(os.getenv("CACHE_INVALIDATION_RECONNECT_DELAY", 1))
+        self.max_reconnect_delay = float(os.getenv("CACHE_INVALIDATION_MAX_RECONNECT_DELAY", 30))
+
+        # Identifie ce worker pour ignorer ses propres messages
+        self.instance_id = uuid.uuid4().hex
+        self.caches: Dict[str, CacheBackend] = {}
+        self.redis_client = None
+        self._listener: Optional[asyncio.Task] = None
+        # Abonné au canal en ce moment (faux pendant une coupure)
+        self.subscribed = False
+
+    def create(self, namespace: str, maxsize: int, ttl: float, max_bytes: Optional[int] = None) -> CacheBackend:
+        kind = os.getenv(f"{namespace.upper()}_CACHE_BACKEND", self.default_backend).lower()
+        if kind == "redis":
+            if not self.redis_url:
+                raise ValueError(f"❌ CACHE_REDIS_URL requise pour le cache '{namespace}' (backend redis)")
+            cache: CacheBackend = RedisCacheBackend(namespace, self, ttl)
+        else:
+            cache = MemoryCacheBackend(namespace, self, maxsize, ttl, max_bytes)
+
+        self.caches[namespace] = cache
+        return cache
+
+    def register(self, namespace: str, cache: Any) -> None:
+        """Inscrit un cache construit ailleurs (reçoit les invalidations diffusées, apparaît dans stats)"""
+        self.caches[namespace] = cache
+
+    @property
+    def redis(self):
+        """Client Redis partagé (créé au premier usage)"""
+        if self.redis_client is None:
+            import redis.asyncio as redis_asyncio
+
+            self.redis_client = redis_asyncio.Redis.from_url(self.redis_url)
+        return self.redis_client
+
+    @property
+    def broadcasting(self) -> bool:
+        return self.broadcast and (self.redis_url is not None or self.redis_client is not None)
+
+    async def start(self) -> None:
+        """Écoute les invalidations des autres workers (si au moins un cache est local)"""
+        has_memory_cache = any(cache.kind == "memory" for cache in self.caches.values())
+        if self.broadcasting and has_memory_cache and self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+            logger.info(f"✅ Diffusion des invalidations de cache active ({self.channel})")
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        if self.redis_client is not None:
+            await self.redis_client.aclose()
+            self.redis_client = None
+
+    async def publish(self, namespace: str, groups: List[str]) -> None:
+        """Diffuse une invalidation ; une erreur n'interrompt pas l'écriture en cours"""
+        if not self.broadcasting or not groups:
+            return
+        message = json.dumps({"origin": self.instance_id, "namespace": namespace, "groups": groups})
+        try:
+            await self.redis.publish(self.channel, message)
+        except Exception as e:
+            logger.error(f"❌ Erreur diffusion invalidation cache: {str(e)}")
+
+    async def _listen(self) -> None:
+        """Applique les invalidations des autres workers ; se réabonne après une erreur"""
+        delay = self.reconnect_delay
+        interrupted = False
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                self.subscribed = True
+                if interrupted:
+                    # Invalidations possiblement perdues pendant la coupure
+                    self._invalidate_all_local()
+                    logger.info(f"✅ Écoute des invalidations de cache rétablie ({self.channel})")
+                    interrupted = False
+                delay = self.reconnect_delay
+                async for message in pubsub.listen():
+                    self._handle_message(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Écoute des invalidations de cache interrompue: {str(e)} (nouvel essai dans {delay:g} s)")
+            finally:
+                self.subscribed = False
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+            interrupted = True
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    def _handle_message(self, message: Dict[str, Any]) -> None:
+        if message.get("type") != "message":
+            return
+        try:
+            payload = json.loads(message["data"])
+        except (TypeError, ValueError):
+            return
+        if payload.get("origin") == self.instance_id:
+            return
+        cache = self.caches.get(payload.get("namespace"))
+        if cache is not None:
+            removed = cache.invalidate_local(payload.get("groups", []))
+            logger.debug(f"🧹 Invalidation reçue ({payload.get('namespace')}): {removed} entrée(s)")
+
+    def _invalidate_all_local(self) -> None:
+        for namespace, cache in self.caches.items():
+            removed = cache.invalidate_local([ALL_GROUPS])
+            logger.debug(f"🧹 Cache {namespace} vidé après coupure: {removed} entrée(s)")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "broadcast": self.broadcasting,
+            "listening": self._listener is not None and not self._listener.done(),
+            "caches": {namespace: cache.stats() for namespace, cache in self.caches.items()},
+        }
+
+# Instance globale
+cache_manager = CacheManager()
@@ -0,0 +1,207 @@
+import os
+import time
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+from .database import get_database
+from .post_service import post_service
+from .tag_stats import tag_stats_service
+from .related_posts import related_posts_service
+from .feed_service import feed_service
+from .known_posts import known_posts
+from .clerk_service import clerk_service
+
+logger = logging.getLogger(__name__)
+
+# Un document par collection surveillée : {"_id": <collection>, "token": <resume token>, "updated_at": ...}
+RESUME_TOKENS_COLLECTION = "change_stream_tokens"
+
+# Codes MongoDB : serveur sans replica set, historique de l'oplog dépassé
+NOT_A_REPLICA_SET = (40573, 40324)
+HISTORY_LOST = (286, 280)
+
+
+class ChangeStreamWatcher:
+    """Invalide les caches à partir des change streams MongoDB sur `posts` et `users`
+
+    Couvre les écritures faites hors de ce processus (webhooks, autres workers,
+    scripts d'administration). Le dernier resume token de chaque collection est
+    enregistré pour reprendre après un redémarrage. Nécessite un replica set
+    (un nœud unique suffit : `mongod --replSet rs0` puis `rs.initiate()`).
+
+    Les listes de posts similaires des posts modifiés sont recalculées (opération
+    idempotente). Les compteurs de tags ne le sont pas : un événement ne dit pas
+    si PostService l'a déjà compté. Après des écritures externes, lancer
+    POST /admin/tag-stats/rebuild.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("CHANGE_STREAMS_ENABLED", "false").lower() == "true"
+        # Pré-images (MongoDB 6+, changeStreamPreAndPostImages activé sur la collection)
+        self.pre_images = os.getenv("CHANGE_STREAMS_PRE_IMAGES", "false").lower() == "true"
+        self.token_save_interval = float(os.getenv("CHANGE_STREAMS_TOKEN_SAVE_INTERVAL", 1))
+        self.retry_delay = float(os.getenv("CHANGE_STREAMS_RETRY_DELAY", 5))
+
+        self._tasks: List[asyncio.Task] = []
+        self._pending_tokens: Dict[str, Any] = {}
+        self._saved_at: Dict[str, float] = {}
+        self.events: Dict[str, int] = {}
+
+    async def start(self) -> None:
+        if not self.enabled or self._tasks:
+            return
+        for collection_name in ("posts", "users"):
+            self._tasks.append(asyncio.create_task(self._watch(collection_name), name=f"change-stream-{collection_name}"))
+        logger.info("✅ Change streams démarrés (posts, users)")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+        # Dernière position connue, pour ne rien rejouer inutilement au redémarrage
+        for collection_name in list(self._pending_tokens):
+            try:
+                await self._save_token(collection_name)
+            except Exception as e:
+                logger.error(f"❌ Erreur sauvegarde resume token {collection_name}: {str(e)}")
+
+    @property
+    def watching_posts(self) -> bool:
+        """Le change stream de `posts` tourne (arrêté définitivement sans replica set)"""
+        return any(task.get_name() == "change-stream-posts" and not task.done() for task in self._tasks)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "running": [task.get_name() for task in self._tasks if not task.done()],
+            "events": dict(self.events),
+        }
+
+    # --- Boucle de surveillance ---
+
+    async def _watch(self, collection_name: str) -> None:
+        while True:
+            try:
+                await self._consume(collection_name)
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                if e.code in NOT_A_REPLICA_SET:
+                    logger.error(f"❌ Change streams indisponibles (replica set requis): {str(e)}")
+                    return
+                if e.code in HISTORY_LOST:
+                    # Position perdue : repartir de maintenant, les caches peuvent avoir manqué des écritures
+                    logger.warning(f"⚠️ Resume token {collection_name} expiré, reprise au présent et purge des caches")
+                    await self._forget_token(collection_name)
+                    await self._flush_caches(collection_name)
+                    continue
+                logger.error(f"❌ Erreur change stream {collection_name}: {str(e)}")
+            except PyMongoError as e:
+                logger.error(f"❌ Erreur change stream {collection_name}: {str(e)}")
+            await asyncio.sleep(self.retry_delay)
+
+    async def _consume(self, collection_name: str) -> None:
+        db = await get_database()
+        token = await self._load_token(collection_name)
+
+        options: Dict[str, Any] = {"full_document": "updateLookup"}
+        if self.pre_images:
+            options["full_document_before_change"] = "whenAvailable"
+        if token is not None:
+            options["resume_after"] = token
+
+        pipeline = [{"$match": {"operationType": {"$in": ["insert", "update", "replace", "delete"]}}}]
+        async with db[collection_name].watch(pipeline, **options) as stream:
+            logger.info(f"👀 Change stream {collection_name} {'repris' if token else 'ouvert'}")
+            async for change in stream:
+                await self._handle(collection_name, change)
+                self._pending_tokens[collection_name] = stream.resume_token
+                self.events[collection_name] = self.events.get(collection_name, 0) + 1
+                if time.monotonic() - self._saved_at.get(collection_name, 0) >= self.token_save_interval:
+                    await self._save_token(collection_name)
+
+    # --- Traitement des événements ---
+
+    async def _handle(self, collection_name: str, change: Dict[str, Any]) -> None:
+        documents = [
+            change.get("fullDocumentBeforeChange"),
+            change.get("fullDocument"),
+            change.get("documentKey"),
+        ]
+        documents = [document for document in documents if document]
+
+        try:
+            if collection_name == "posts":
+                await self._invalidate_post(documents)
+            else:
+                await self._invalidate_user(documents)
+        except Exception as e:
+            logger.error(f"❌ Erreur invalidation ({collection_name}, {change.get('operationType')}): {str(e)}")
+
+    async def _invalidate_post(self, documents: List[Dict[str, Any]]) -> None:
+        # `post:<id>` couvre toutes les entrées contenant le post (anciens slug et tags compris) ;
+        # la version après écriture ajoute ses nouveaux slug et tags
+        await post_service.invalidate_cache(*documents)
+        tag_stats_service.invalidate_snapshot()
+        # Écriture externe : ses id et slug ne doivent plus répondre 404. Chaque worker
+        # voit l'événement dans son propre change stream : ajout local, sans diffusion
+        known_posts.add_local(*documents)
+        await related_posts_service.schedule(*{
+            document["_id"] for document in documents if document.get("_id") is not None
+        })
+
+    async def _invalidate_user(self, documents: List[Dict[str, Any]]) -> None:
+        clerk_ids = {document.get("clerk_id") for document in documents if document.get("clerk_id")}
+        if not clerk_ids:
+            # Suppression physique sans pré-image : identités bornées par leur TTL
+            logger.debug("🔍 Utilisateur sans clerk_id dans l'événement, rien à invalider")
+        for clerk_id in clerk_ids:
+            await clerk_service.evict_user(clerk_id)
+
+    async def _flush_caches(self, collection_name: str) -> None:
+        if collection_name == "posts":
+            await post_service.cache.clear()
+            await feed_service.cache.clear()
+            known_posts.schedule_rebuild()
+        else:
+            await clerk_service.user_cache.clear()
+            await clerk_service.identity_cache.clear()
+
+    # --- Resume tokens ---
+
+    async def _load_token(self, collection_name: str) -> Optional[Dict[str, Any]]:
+        if collection_name in self._pending_tokens:
+            return self._pending_tokens[collection_name]
+        db = await get_database()
+        document = await db[RESUME_TOKENS_COLLECTION].find_one({"_id": collection_name})
+        return document.get("token") if document else None
+
+    async def _save_token(self, collection_name: str) -> None:
+        token = self._pending_tokens.get(collection_name)
+        if token is None:
+            return
+        db = await get_database()
+        await db[RESUME_TOKENS_COLLECTION].update_one(
+            {"_id": collection_name},
+            {"$set": {"token": token, "updated_at": datetime.now()}},
+            upsert=True
+        )
+        self._saved_at[collection_name] = time.monotonic()
+
+    async def _forget_token(self, collection_name: str) -> None:
+        self._pending_tokens.pop(collection_name, None)
+        db = await get_database()
+        await db[RESUME_TOKENS_COLLECTION].delete_one({"_id": collection_name})
+
+# Instance globale
+change_stream_watcher = ChangeStreamWatcher()
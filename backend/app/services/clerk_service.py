@@ -1,64 +1,67 @@
 import os
 import jwt
-import requests
+import time
+import hashlib
+import httpx
 from typing import Optional, Dict, Any
 from fastapi import HTTPException, status
 import logging
-from datetime import datetime
+from .jwks_service import jwks_service
+from .http_client import http_client
+from .cache import MISSING
+from .cache_backend import cache_manager
+from .singleflight import SingleFlight
+from .user_service import user_service
 
 
 logger = logging.getLogger(__name__)
 
 class ClerkService:
-    """Service d'authentification Clerk - Version simplifiée pour développement"""
+    """Service d'authentification Clerk (JWT vérifiés localement, identités en cache)"""
 
     def __init__(self):
         self.secret_key = os.getenv("CLERK_SECRET_KEY")
         self.publishable_key = os.getenv("CLERK_PUBLISHABLE_KEY")
+        self.api_url = os.getenv("CLERK_API_URL", "https://api.clerk.com/v1")
+        self.api_timeout = float(os.getenv("CLERK_API_TIMEOUT", 5))
+        self.issuer = os.getenv("CLERK_ISSUER") or None
+        self.leeway = int(os.getenv("CLERK_JWT_LEEWAY", 5))
+        self.authorized_parties = [
+            origin.strip() for origin in os.getenv("CLERK_AUTHORIZED_PARTIES", "").split(",") if origin.strip()
+        ]
+
+        # Cache des identités vérifiées (clé = hash du token) ; backend selon IDENTITY_CACHE_BACKEND
+        self.identity_cache = cache_manager.create(
+            "identity",
+            maxsize=int(os.getenv("IDENTITY_CACHE_MAXSIZE", 10000)),
+            ttl=float(os.getenv("IDENTITY_CACHE_TTL", 300)),
+        )
+        self.negative_ttl = float(os.getenv("IDENTITY_CACHE_NEGATIVE_TTL", 30))
+
+        # Cache des profils utilisateurs (clé = clerk_id) ; backend selon USER_CACHE_BACKEND
+        self.user_cache = cache_manager.create(
+            "user",
+            maxsize=int(os.getenv("USER_CACHE_MAXSIZE", 10000)),
+            ttl=float(os.getenv("USER_CACHE_TTL", 300)),
+        )
+        self._flights = SingleFlight()
 
         if not self.secret_key:
             logger.warning("⚠️ CLERK_SECRET_KEY manquante")
 
     async def verify_token(self, token: str) -> Dict[str, Any]:
-        """Vérifie un token JWT Clerk - Version développement"""
+        """Vérifie un token JWT Clerk (signature locale via le JWKS) et résout l'utilisateur"""
         try:
-            # Tokens de test acceptés en mode développement
-            if token.startswith("test"):
-                logger.info("🧪 Mode développement - Token de test")
-                return {
-                    "clerk_id": "user_test_123",
-                    "email": "test@example.com",
-                    "username": "testuser",
-                    "first_name": "Test",
-                    "last_name": "User",
-                    "role": "admin" if "admin" in token else "user",
-                    "is_active": True,
-                    "created_at": datetime.now().isoformat()
-                }
+            cache_key = self._cache_key(token)
+            cached = await self.identity_cache.get(cache_key, MISSING)
+            if cached is not MISSING:
+                if "rejected" in cached:
+                    raise HTTPException(status_code=401, detail=cached["rejected"])
+                return dict(cached)
 
-            # Validation basique pour vrais tokens Clerk
-            if not self.secret_key:
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail="Configuration Clerk manquante"
-                )
-
-            # Pour l'instant, validation simplifiée
-            # TODO: Implémenter validation JWT complète plus tard
-            try:
-                # Décoder sans vérification pour récupérer l'ID utilisateur
-                payload = jwt.decode(token, options={"verify_signature": False})
-                user_id = payload.get("sub")
-
-                if user_id:
-                    # Récupérer infos depuis API Clerk
-                    user_info = await self.get_user_from_api(user_id)
-                    return user_info
-                else:
-                    raise HTTPException(status_code=401, detail="Token invalide")
-
-            except Exception:
-                raise HTTPException(status_code=401, detail="Token invalide")
+            # Les vérifications concurrentes d'un même token partagent un seul appel
+            user_info = await self._flights.do(("token", cache_key), lambda: self._resolve_identity(token, cache_key))
+            return dict(user_info)
 
         except HTTPException:
             raise
@@ -66,18 +69,131 @@ class ClerkService:
             logger.info(f"❌ Erreur validation token: {str(e)}")
             raise HTTPException(status_code=401, detail="Erreur authentification")
 
+    async def _resolve_identity(self, token: str, cache_key: str) -> Dict[str, Any]:
+        """Vérifie la signature du token puis résout l'utilisateur, et met le résultat en cache"""
+        # Vérification de la signature en local via le JWKS mis en cache
+        try:
+            payload = await self.decode_token(token)
+        except jwt.InvalidTokenError as e:
+            logger.info(f"❌ Token rejeté: {str(e)}")
+            await self._cache_rejection(cache_key, "Token invalide")
+            raise HTTPException(status_code=401, detail="Token invalide")
+
+        # Résolution de l'utilisateur (une seule résolution par utilisateur en vol)
+        clerk_user_id = payload["sub"]
+        try:
+            user_info = await self._flights.do(("user", clerk_user_id), lambda: self.get_user_info(clerk_user_id))
+        except HTTPException as e:
+            if e.status_code == 401:
+                await self._cache_rejection(cache_key, e.detail)
+            raise
+
+        if not user_info.get("is_active", True):
+            await self._cache_rejection(cache_key, "Utilisateur désactivé")
+            raise HTTPException(status_code=401, detail="Utilisateur désactivé")
+
+        # TTL plafonné à l'expiration du token
+        ttl = min(self.identity_cache.ttl, payload["exp"] - time.time())
+        await self.identity_cache.set(
+            cache_key,
+            user_info,
+            ttl=ttl,
+            groups=[self._user_group(user_info["clerk_id"])]
+        )
+        return user_info
+
+    async def get_user_info(self, clerk_user_id: str) -> Dict[str, Any]:
+        """Résout un utilisateur : cache mémoire, puis collection `users`, puis API Clerk"""
+        cached = await self.user_cache.get(clerk_user_id)
+        if cached is not None:
+            return cached
+
+        user_info = await user_service.get_identity_by_clerk_id(clerk_user_id)
+
+        if user_info is None:
+            # Utilisateur pas encore synchronisé (webhook manqué ou en retard)
+            user_info = await self.get_user_from_api(clerk_user_id)
+            await user_service.mirror_identity(user_info)
+
+        await self.user_cache.set(clerk_user_id, user_info, groups=[self._user_group(clerk_user_id)])
+        return user_info
+
+    async def evict_user(self, clerk_id: str) -> int:
+        """Retire du cache toutes les identités d'un utilisateur (mise à jour, suppression)"""
+        await self.user_cache.invalidate_groups([self._user_group(clerk_id)])
+        evicted = await self.identity_cache.invalidate_groups([self._user_group(clerk_id)])
+        if evicted:
+            logger.info(f"🧹 {evicted} identité(s) retirée(s) du cache: {clerk_id}")
+        return evicted
+
+    def cache_stats(self) -> Dict[str, Any]:
+        return {
+            **self.identity_cache.stats(),
+            "users": self.user_cache.stats(),
+            "single_flight": self._flights.stats()
+        }
+
+    async def _cache_rejection(self, cache_key: str, detail: str) -> None:
+        await self.identity_cache.set(cache_key, {"rejected": detail}, ttl=self.negative_ttl)
+
+    @staticmethod
+    def _cache_key(token: str) -> str:
+        # On ne conserve pas le token brut en mémoire
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _role_from_metadata(user_data: Dict[str, Any]) -> str:
+        # Rôle défini côté Clerk dans public_metadata.role, "user" par défaut
+        role = (user_data.get("public_metadata") or {}).get("role")
+        return role if role in ("admin", "author", "user") else "user"
+
+    @staticmethod
+    def _user_group(clerk_id: str) -> str:
+        return f"user:{clerk_id}"
+
+    async def decode_token(self, token: str) -> Dict[str, Any]:
+        """Décode un JWT Clerk après vérification de sa signature (RS256) et de ses claims"""
+        header = jwt.get_unverified_header(token)
+        signing_key = await jwks_service.get_signing_key(header.get("kid"))
+
+        payload = jwt.decode(
+            token,
+            signing_key,
+            algorithms=["RS256"],
+            issuer=self.issuer,
+            leeway=self.leeway,
+            options={
+                "require": ["exp", "iat", "sub"],
+                "verify_aud": False,
+                "verify_iss": self.issuer is not None,
+            },
+        )
+
+        # Vérification de l'origine (claim azp) si configurée
+        azp = payload.get("azp")
+        if self.authorized_parties and azp and azp not in self.authorized_parties:
+            raise jwt.InvalidTokenError(f"azp non autorisé: {azp}")
+
+        return payload
+
     async def get_user_from_api(self, clerk_user_id: str) -> Dict[str, Any]:
         """Récupère utilisateur depuis API Clerk"""
+        if not self.secret_key:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Configuration Clerk manquante"
+            )
+
         try:
             headers = {
                 "Authorization": f"Bearer {self.secret_key}",
                 "Content-Type": "application/json"
             }
 
-            response = requests.get(
-                f"https://api.clerk.dev/v1/users/{clerk_user_id}",
+            response = await http_client.get(
+                f"{self.api_url}/users/{clerk_user_id}",
                 headers=headers,
-                timeout=10
+                timeout=self.api_timeout
             )
 
             if response.status_code == 200:
@@ -94,13 +210,16 @@ class ClerkService:
                     "first_name": user_data.get("first_name"),
                     "last_name": user_data.get("last_name"),
                     "profile_image": user_data.get("profile_image_url"),
-                    "role": "user",  # Par défaut
-                    "is_active": True
+                    "role": self._role_from_metadata(user_data),
+                    "is_active": not user_data.get("banned", False)
                 }
-            else:
+            elif response.status_code == 404:
                 raise HTTPException(status_code=401, detail="Utilisateur non trouvé")
+            else:
+                logger.error(f"❌ API Clerk: statut {response.status_code}")
+                raise HTTPException(status_code=500, detail="Erreur service Clerk")
 
-        except requests.RequestException:
+        except httpx.HTTPError:
             raise HTTPException(status_code=500, detail="Erreur service Clerk")
 
 # Instance globale
@@ -0,0 +1,75 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Iterable, Optional, Tuple
+
+from fastapi import Request, Response
+
+# Le client doit revalider à chaque fois (ETag / Last-Modified), sans retélécharger si rien n'a changé
+CACHE_CONTROL = "no-cache"
+
+
+def _utc(value: datetime) -> datetime:
+    # Les dates Mongo de ce projet sont naïves : interprétées comme UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def post_etag(post_id: Any, updated_at: Optional[datetime], variant: str = "") -> str:
+    """ETag faible d'un post, dérivé de son id et de sa date de mise à jour"""
+    stamp = _utc(updated_at).isoformat() if updated_at else "-"
+    digest = hashlib.sha1(f"{post_id}|{stamp}|{variant}".encode("utf-8")).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def list_etag(items: Iterable[Tuple[Any, Optional[datetime]]], variant: str = "") -> str:
+    """ETag faible d'une page de liste : empreinte des (id, updated_at) dans l'ordre"""
+    digest = hashlib.sha1(variant.encode("utf-8"))
+    for post_id, updated_at in items:
+        stamp = _utc(updated_at).isoformat() if updated_at else "-"
+        digest.update(f"|{post_id}:{stamp}".encode("utf-8"))
+    return f'W/"{digest.hexdigest()[:20]}"'
+
+
+def last_modified(dates: Iterable[Optional[datetime]]) -> Optional[datetime]:
+    """Date la plus récente (None si aucune)"""
+    known = [_utc(value) for value in dates if value is not None]
+    return max(known) if known else None
+
+
+def has_conditions(request: Request) -> bool:
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+
+def is_not_modified(request: Request, etag: str, modified: Optional[datetime]) -> bool:
+    """Évalue If-None-Match (prioritaire) puis If-Modified-Since (RFC 9110)"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # Comparaison faible : W/"x" et "x" désignent la même représentation
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag.removeprefix("W/") in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and modified is not None:
+        try:
+            since = _utc(parsedate_to_datetime(if_modified_since))
+        except (TypeError, ValueError):
+            return False
+        # Last-Modified est exprimé à la seconde
+        return modified.replace(microsecond=0) <= since
+
+    return False
+
+
+def set_validators(response: Response, etag: str, modified: Optional[datetime]) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    if modified is not None:
+        response.headers["Last-Modified"] = format_datetime(modified, usegmt=True)
+
+
+def not_modified_response(etag: str, modified: Optional[datetime]) -> Response:
+    response = Response(status_code=304)
+    set_validators(response, etag, modified)
+    return response
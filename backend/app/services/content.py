@@ -0,0 +1,82 @@
+import os
+import re
+import math
+from typing import Any, Dict, Optional
+
+import nh3
+from markdown_it import MarkdownIt
+
+from .search import strip_html
+
+# Incrémenté quand le rendu change : le backfill recalcule les posts d'une version antérieure
+DERIVED_VERSION = 2
+
+# Champs calculés à l'écriture à partir de `content`
+DERIVED_FIELDS = ("content_html", "auto_excerpt", "word_count", "reading_time", "derived_version")
+
+READING_WORDS_PER_MINUTE = int(os.getenv("READING_WORDS_PER_MINUTE", 230))
+AUTO_EXCERPT_LENGTH = int(os.getenv("AUTO_EXCERPT_LENGTH", 200))
+
+# CommonMark + tableaux ; le HTML brut est échappé et les liens javascript: refusés
+_markdown = MarkdownIt("commonmark", {"html": False, "linkify": False}).enable("table")
+
+# Contenu déjà produit par l'éditeur riche (TipTap) : assaini mais pas re-rendu
+_HTML_START = re.compile(r"^\s*<(p|h[1-6]|ul|ol|div|blockquote|pre|figure|img|table|hr)\b", re.IGNORECASE)
+_WORD = re.compile(r"\w+(?:['’-]\w+)*")
+
+# Liste blanche : balises de l'éditeur et du rendu Markdown ; scripts, styles et attributs on* sont retirés
+ALLOWED_TAGS = {
+    "p", "br", "hr", "h1", "h2", "h3", "h4", "h5", "h6", "strong", "b", "em", "i", "u", "s", "del",
+    "code", "pre", "blockquote", "ul", "ol", "li", "a", "img", "figure", "figcaption", "div", "span",
+    "table", "thead", "tbody", "tr", "th", "td",
+}
+ALLOWED_ATTRIBUTES = {
+    "a": {"href", "title", "target"},
+    "img": {"src", "alt", "title", "width", "height"},
+    "ol": {"start"},
+    "th": {"align"},
+    "td": {"align"},
+}
+URL_SCHEMES = {"http", "https", "mailto"}
+
+
+def sanitize_html(html: str) -> str:
+    """Retire du HTML tout ce qui n'est pas dans la liste blanche (dont les URLs javascript:)"""
+    return nh3.clean(html, tags=ALLOWED_TAGS, attributes=ALLOWED_ATTRIBUTES, url_schemes=URL_SCHEMES)
+
+
+def render_html(content: str) -> str:
+    """HTML affiché pour un post : rendu Markdown ou HTML de l'éditeur, toujours assaini"""
+    if _HTML_START.match(content):
+        return sanitize_html(content)
+    return sanitize_html(_markdown.render(content))
+
+
+def stored_html(post: Dict[str, Any]) -> Optional[str]:
+    """`content_html` stocké, ou recalculé si le post date d'un rendu antérieur (backfill pas encore passé)"""
+    if post.get("derived_version") == DERIVED_VERSION:
+        return post.get("content_html")
+    return render_html(post["content"]) if post.get("content") is not None else None
+
+
+def make_excerpt(text: str, length: int = AUTO_EXCERPT_LENGTH) -> str:
+    """Début du texte brut, coupé sur une fin de mot"""
+    text = " ".join(text.split())
+    if len(text) <= length:
+        return text
+    cut = text.rfind(" ", 0, length)
+    return text[: cut if cut > length // 2 else length].rstrip(" ,;:.") + "…"
+
+
+def derive_fields(content: str) -> Dict[str, Any]:
+    """Champs dérivés de `content`, stockés avec le post pour ne pas les recalculer à chaque lecture"""
+    content_html = render_html(content)
+    text = strip_html(content_html)
+    word_count = len(_WORD.findall(text))
+    return {
+        "content_html": content_html,
+        "auto_excerpt": make_excerpt(text),
+        "word_count": word_count,
+        "reading_time": max(1, math.ceil(word_count / READING_WORDS_PER_MINUTE)),
+        "derived_version": DERIVED_VERSION,
+    }
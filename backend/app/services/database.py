@@ -1,8 +1,11 @@
 import motor.motor_asyncio
 import os
+import asyncio
 import logging
 from typing import Optional
 from dotenv import load_dotenv
+from .indexes import ensure_indexes
+from .query_profiler import query_profiler
 
 load_dotenv()
 
@@ -15,13 +18,11 @@ class DatabaseService:
         self.client: Optional[motor.motor_asyncio.AsyncIOMotorClient] = None
         self.database = None
 
-        # DEBUG - Afficher la variable
         self.mongodb_url = os.getenv("MONGODB_URL")
         self.database_name = os.getenv("DATABASE_NAME", "blog_db")
+        self.auto_indexes = os.getenv("MONGODB_ENSURE_INDEXES", "true").lower() == "true"
 
-        print(f"🔍 DEBUG - MONGODB_URL présente: {bool(self.mongodb_url)}")
-        if self.mongodb_url:
-            print(f"🔍 DEBUG - URL: {self.mongodb_url[:50]}...")
+        logger.debug(f"🔍 MONGODB_URL présente: {bool(self.mongodb_url)}")
         
         if not self.mongodb_url:
             raise ValueError("❌ MONGODB_URL manquante dans les variables d'environnement")
@@ -29,12 +30,22 @@ class DatabaseService:
     async def connect(self):
         """Se connecter à MongoDB"""
         try:
-            self.client = motor.motor_asyncio.AsyncIOMotorClient(self.mongodb_url)
+            # Profilage des commandes (durées, requêtes lentes)
+            listeners = [query_profiler] if query_profiler.enabled else []
+            self.client = motor.motor_asyncio.AsyncIOMotorClient(self.mongodb_url, event_listeners=listeners)
             self.database = self.client[self.database_name]
+            query_profiler.attach(asyncio.get_running_loop(), self.database)
             
             # Test de connexion
             await self.client.admin.command('ping')
             logger.info(f"✅ Connexion MongoDB réussie: {self.database_name}")
+
+            # Provisionnement idempotent des index déclarés
+            if self.auto_indexes:
+                try:
+                    await ensure_indexes(self.database)
+                except Exception as index_error:
+                    logger.error(f"❌ Erreur création des index: {str(index_error)}")
             
         except Exception as e:
             logger.error(f"❌ Erreur connexion MongoDB: {str(e)}")
@@ -59,13 +70,13 @@ db_service = DatabaseService()
 async def get_database():
     """Fonction helper pour récupérer la DB"""
     try:
-        logger.info(f"🔍 Debug - database is None: {db_service.database is None}")
+        logger.debug(f"🔍 Debug - database is None: {db_service.database is None}")
         
         if db_service.database is None:
-            logger.info("🔄 Connexion à la base de données...")
+            logger.debug("🔄 Connexion à la base de données...")
             await db_service.connect()
         
-        logger.info("✅ Base de données récupérée")
+        logger.debug("✅ Base de données récupérée")
         return db_service.database
         
     except Exception as e:
@@ -0,0 +1,67 @@
+import os
+import logging
+from typing import Any, AsyncIterator, Dict, Optional
+
+from bson import ObjectId
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+from .serialization import type_adapter
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Documents lus par aller-retour MongoDB, et taille des morceaux envoyés au client
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 500))
+EXPORT_CHUNK_BYTES = int(os.getenv("EXPORT_CHUNK_BYTES", 64 * 1024))
+
+
+def parse_after(after: Optional[str]) -> Optional[ObjectId]:
+    """Point de reprise d'un export : `_id` du dernier document reçu"""
+    if after is None:
+        return None
+    if not ObjectId.is_valid(after):
+        raise HTTPException(status_code=400, detail="Paramètre after invalide")
+    return ObjectId(after)
+
+
+def export_cursor(collection, filter_dict: Dict[str, Any], after: Optional[ObjectId]):
+    """Curseur trié par `_id` (index par défaut) : reprise exacte après `after`, sans skip"""
+    if after is not None:
+        filter_dict = {**filter_dict, "_id": {"$gt": after}}
+    return collection.find(filter_dict).sort("_id", 1).batch_size(EXPORT_BATCH_SIZE)
+
+
+def ndjson_response(items: AsyncIterator[Any], annotation: Any, filename: str) -> StreamingResponse:
+    """Une ligne JSON par élément, écrite au fil du curseur (mémoire constante)
+
+    Les lignes sont regroupées en morceaux d'environ `EXPORT_CHUNK_BYTES`. Une
+    erreur en cours de flux interrompt la connexion : le client reprend avec
+    `after=<id de la dernière ligne reçue>`.
+    """
+    adapter = type_adapter(annotation)
+
+    async def body() -> AsyncIterator[bytes]:
+        buffer = bytearray()
+        count = 0
+        try:
+            async for item in items:
+                buffer += adapter.dump_json(item)
+                buffer += b"\n"
+                count += 1
+                if len(buffer) >= EXPORT_CHUNK_BYTES:
+                    yield bytes(buffer)
+                    buffer.clear()
+            if buffer:
+                yield bytes(buffer)
+            logger.info(f"📦 Export {filename}: {count} ligne(s)")
+        except Exception as e:
+            logger.error(f"❌ Export {filename} interrompu après {count} ligne(s): {str(e)}")
+            raise
+
+    return StreamingResponse(
+        body(),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
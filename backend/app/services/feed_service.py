@@ -0,0 +1,296 @@
+import os
+import hashlib
+import logging
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Any, Dict, List, Optional
+from xml.sax.saxutils import escape, quoteattr
+
+from .database import get_database
+from .cache import MISSING
+from .cache_backend import cache_manager
+from .pagination import Cursor, POST_SORT, keyset_filter
+from .singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Toutes les entrées du cache des flux : une écriture sur un post publié les invalide ensemble
+FEEDS_GROUP = "feeds"
+
+# Limite du protocole sitemaps.org par fichier
+SITEMAP_MAX_URLS = 50000
+
+FEED_PROJECTION = {
+    "title": 1, "slug": 1, "excerpt": 1, "auto_excerpt": 1, "tags": 1, "author_id": 1,
+    "author_email": 1, "created_at": 1, "updated_at": 1,
+}
+
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    # Les dates Mongo de ce projet sont naïves : interprétées comme UTC
+    if value is None:
+        return None
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def _rfc3339(value: datetime) -> str:
+    return _utc(value).isoformat().replace("+00:00", "Z")
+
+
+class FeedService:
+    """Flux RSS / Atom et sitemap des posts publiés
+
+    Le rendu (octets XML + ETag + Last-Modified) est mis en cache jusqu'à la
+    prochaine écriture d'un post publié via `PostService` (ou un change stream).
+    Au-delà de `SITEMAP_MAX_URLS` posts, `/sitemap.xml` devient un index de
+    fichiers `/sitemap-<n>.xml` découpés par curseur dans l'ordre POST_SORT.
+    """
+
+    def __init__(self):
+        self.site_url = os.getenv("SITE_URL", "http://localhost:3000").rstrip("/")
+        self.api_url = os.getenv("API_PUBLIC_URL", "http://localhost:8000").rstrip("/")
+        self.title = os.getenv("FEED_TITLE", "Blog")
+        self.description = os.getenv("FEED_DESCRIPTION", "Derniers articles publiés")
+        # Auteur du flux Atom, pour les entrées dont l'auteur n'a pas de nom affichable
+        self.author = os.getenv("FEED_AUTHOR") or self.title
+        self.items = int(os.getenv("FEED_ITEMS", 20))
+        self.sitemap_max_urls = min(int(os.getenv("SITEMAP_MAX_URLS", SITEMAP_MAX_URLS)), SITEMAP_MAX_URLS)
+
+        # Cache des rendus ; backend selon FEED_CACHE_BACKEND
+        self.cache = cache_manager.create(
+            "feed",
+            maxsize=int(os.getenv("FEED_CACHE_MAXSIZE", 256)),
+            ttl=float(os.getenv("FEED_CACHE_TTL", 3600)),
+        )
+        self._flights = SingleFlight()
+
+    # --- Lecture ---
+
+    async def get_rss(self) -> Dict[str, Any]:
+        return await self._get("rss", self._render_rss)
+
+    async def get_atom(self) -> Dict[str, Any]:
+        return await self._get("atom", self._render_atom)
+
+    async def get_sitemap(self) -> Dict[str, Any]:
+        """Sitemap unique, ou index de sitemaps au-delà de `sitemap_max_urls` posts"""
+        return await self._get("sitemap", self._render_sitemap)
+
+    async def get_sitemap_page(self, page: int) -> Optional[Dict[str, Any]]:
+        """Fichier n°`page` (à partir de 1) d'un sitemap découpé ; None s'il n'existe pas"""
+        if page < 1:
+            return None
+        chunks = await self._get("sitemap:chunks", self._load_chunks)
+        if page > len(chunks["starts"]):
+            return None
+        return await self._get(("sitemap", page), lambda: self._render_sitemap_page(chunks["starts"][page - 1]))
+
+    async def invalidate(self, *post_docs: Optional[dict]) -> int:
+        """Invalide les rendus si l'une des versions du post est (ou était) publiée
+
+        Un document sans `is_published` (suppression vue par un change stream) invalide aussi.
+        """
+        if post_docs and not any(post and post.get("is_published", True) for post in post_docs):
+            return 0
+        removed = await self.cache.invalidate_groups([FEEDS_GROUP])
+        logger.debug(f"🧹 Cache flux: {removed} entrée(s) invalidée(s)")
+        return removed
+
+    async def _get(self, key: Any, render) -> Dict[str, Any]:
+        cached = await self.cache.get(key, MISSING)
+        if cached is not MISSING:
+            return cached
+
+        # Un seul rendu même si plusieurs lecteurs de flux arrivent en même temps
+        return await self._flights.do(key, lambda: self._render_and_store(key, render))
+
+    async def _render_and_store(self, key: Any, render) -> Dict[str, Any]:
+        entry = await render()
+        if "body" in entry:
+            # ETag faible : le même validateur couvre les variantes gzip / br de CompressionMiddleware
+            entry["etag"] = 'W/"' + hashlib.sha1(entry["body"]).hexdigest()[:20] + '"'
+        await self.cache.set(key, entry, groups=[FEEDS_GROUP])
+        return entry
+
+    # --- Données ---
+
+    async def _latest(self) -> List[Dict[str, Any]]:
+        db = await get_database()
+        cursor = db["posts"].find(
+            {"is_published": True},
+            projection=FEED_PROJECTION
+        ).sort(POST_SORT).limit(self.items)
+        return await cursor.to_list(length=self.items)
+
+    async def _load_chunks(self) -> Dict[str, Any]:
+        """Parcourt les posts publiés (dates seulement) : début et dernière modification de chaque fichier"""
+        db = await get_database()
+        cursor = db["posts"].find(
+            {"is_published": True},
+            projection={"created_at": 1, "updated_at": 1}
+        ).sort(POST_SORT)
+
+        starts: List[Optional[Cursor]] = []
+        modified: List[Optional[datetime]] = []
+        count = 0
+        previous: Optional[Cursor] = None
+        async for post in cursor:
+            if count % self.sitemap_max_urls == 0:
+                starts.append(previous)
+                modified.append(None)
+            stamp = post.get("updated_at") or post.get("created_at")
+            if stamp and (modified[-1] is None or stamp > modified[-1]):
+                modified[-1] = stamp
+            if post.get("created_at") is not None:
+                previous = (post["created_at"], post["_id"])
+            count += 1
+        return {"count": count, "starts": starts or [None], "modified": modified or [None]}
+
+    async def _author_names(self, posts: List[Dict[str, Any]]) -> Dict[str, str]:
+        """Noms affichés des auteurs (prénom nom, sinon username), en une requête
+
+        Jamais l'identifiant Clerk ni l'email : un auteur sans nom est couvert par
+        l'auteur du flux.
+        """
+        author_ids = list({post["author_id"] for post in posts if post.get("author_id")})
+        if not author_ids:
+            return {}
+        db = await get_database()
+        cursor = db["users"].find(
+            {"clerk_id": {"$in": author_ids}},
+            projection={"clerk_id": 1, "first_name": 1, "last_name": 1, "username": 1}
+        )
+        names: Dict[str, str] = {}
+        async for user in cursor:
+            name = " ".join(part for part in (user.get("first_name"), user.get("last_name")) if part)
+            name = name or user.get("username")
+            if name:
+                names[user["clerk_id"]] = name
+        return names
+
+    def _post_url(self, post: Dict[str, Any]) -> str:
+        return f"{self.site_url}/blog/{post['slug']}"
+
+    # --- Rendus ---
+
+    async def _render_rss(self) -> Dict[str, Any]:
+        posts = await self._latest()
+        modified = max((post.get("updated_at") or post.get("created_at") for post in posts if post.get("created_at")), default=None)
+
+        lines = [
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">',
+            "<channel>",
+            f"<title>{escape(self.title)}</title>",
+            f"<link>{escape(self.site_url)}</link>",
+            f"<description>{escape(self.description)}</description>",
+            f'<atom:link href={quoteattr(self.api_url + "/feed.xml")} rel="self" type="application/rss+xml"/>',
+        ]
+        if modified:
+            lines.append(f"<lastBuildDate>{format_datetime(_utc(modified), usegmt=True)}</lastBuildDate>")
+        for post in posts:
+            url = escape(self._post_url(post))
+            lines.append("<item>")
+            lines.append(f"<title>{escape(post['title'])}</title>")
+            lines.append(f"<link>{url}</link>")
+            lines.append(f"<guid isPermaLink=\"false\">{post['_id']}</guid>")
+            if post.get("created_at"):
+                lines.append(f"<pubDate>{format_datetime(_utc(post['created_at']), usegmt=True)}</pubDate>")
+            excerpt = post.get("excerpt") or post.get("auto_excerpt")
+            if excerpt:
+                lines.append(f"<description>{escape(excerpt)}</description>")
+            lines.extend(f"<category>{escape(tag)}</category>" for tag in post.get("tags") or [])
+            lines.append("</item>")
+        lines += ["</channel>", "</rss>"]
+
+        return {"body": "\n".join(lines).encode("utf-8"), "modified": _utc(modified)}
+
+    async def _render_atom(self) -> Dict[str, Any]:
+        posts = await self._latest()
+        authors = await self._author_names(posts)
+        modified = max((post.get("updated_at") or post.get("created_at") for post in posts if post.get("created_at")), default=None)
+
+        lines = [
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            '<feed xmlns="http://www.w3.org/2005/Atom">',
+            f"<id>{escape(self.site_url)}/</id>",
+            f"<title>{escape(self.title)}</title>",
+            f"<subtitle>{escape(self.description)}</subtitle>",
+            f"<link href={quoteattr(self.site_url)}/>",
+            f'<link rel="self" href={quoteattr(self.api_url + "/atom.xml")}/>',
+            f"<updated>{_rfc3339(modified or datetime.now(timezone.utc))}</updated>",
+            f"<author><name>{escape(self.author)}</name></author>",
+        ]
+        for post in posts:
+            published = post.get("created_at")
+            updated = post.get("updated_at") or published
+            lines.append("<entry>")
+            lines.append(f"<id>{escape(self._post_url(post))}</id>")
+            lines.append(f"<title>{escape(post['title'])}</title>")
+            lines.append(f"<link href={quoteattr(self._post_url(post))}/>")
+            if updated:
+                lines.append(f"<updated>{_rfc3339(updated)}</updated>")
+            if published:
+                lines.append(f"<published>{_rfc3339(published)}</published>")
+            author = authors.get(post.get("author_id"))
+            if author:
+                lines.append(f"<author><name>{escape(author)}</name></author>")
+            excerpt = post.get("excerpt") or post.get("auto_excerpt")
+            if excerpt:
+                lines.append(f"<summary>{escape(excerpt)}</summary>")
+            lines.extend(f"<category term={quoteattr(tag)}/>" for tag in post.get("tags") or [])
+            lines.append("</entry>")
+        lines.append("</feed>")
+
+        return {"body": "\n".join(lines).encode("utf-8"), "modified": _utc(modified)}
+
+    async def _render_sitemap(self) -> Dict[str, Any]:
+        chunks = await self._get("sitemap:chunks", self._load_chunks)
+        if len(chunks["starts"]) == 1:
+            return await self._render_sitemap_page(None)
+
+        # Index de sitemaps : un fichier par tranche de `sitemap_max_urls` posts
+        lines = [
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">',
+        ]
+        for page, modified in enumerate(chunks["modified"], start=1):
+            lines.append("<sitemap>")
+            lines.append(f"<loc>{escape(self.api_url)}/sitemap-{page}.xml</loc>")
+            if modified:
+                lines.append(f"<lastmod>{_rfc3339(modified)}</lastmod>")
+            lines.append("</sitemap>")
+        lines.append("</sitemapindex>")
+
+        modified = max((value for value in chunks["modified"] if value), default=None)
+        return {"body": "\n".join(lines).encode("utf-8"), "modified": _utc(modified)}
+
+    async def _render_sitemap_page(self, after: Optional[Cursor]) -> Dict[str, Any]:
+        db = await get_database()
+        cursor = db["posts"].find(
+            {"is_published": True, **keyset_filter(after)},
+            projection={"slug": 1, "created_at": 1, "updated_at": 1}
+        ).sort(POST_SORT).limit(self.sitemap_max_urls)
+
+        lines = [
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">',
+        ]
+        modified = None
+        async for post in cursor:
+            stamp = post.get("updated_at") or post.get("created_at")
+            lines.append("<url>")
+            lines.append(f"<loc>{escape(self._post_url(post))}</loc>")
+            if stamp:
+                lines.append(f"<lastmod>{_rfc3339(stamp)}</lastmod>")
+                modified = stamp if modified is None or stamp > modified else modified
+            lines.append("</url>")
+        lines.append("</urlset>")
+
+        return {"body": "\n".join(lines).encode("utf-8"), "modified": _utc(modified)}
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.cache.stats(), "single_flight": self._flights.stats()}
+
+# Instance globale
+feed_service = FeedService()
@@ -0,0 +1,97 @@
+import os
+import asyncio
+import logging
+from typing import Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Codes HTTP considérés comme transitoires
+RETRYABLE_STATUS_CODES = {429, 502, 503, 504}
+
+
+class HTTPClientService:
+    """Client HTTP asynchrone partagé (pool de connexions persistant) pour les API externes"""
+
+    def __init__(self):
+        self.timeout = httpx.Timeout(
+            float(os.getenv("HTTP_TIMEOUT", 5)),
+            connect=float(os.getenv("HTTP_CONNECT_TIMEOUT", 2)),
+        )
+        self.limits = httpx.Limits(
+            max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", 100)),
+            max_keepalive_connections=int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", 20)),
+            keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_EXPIRY", 30)),
+        )
+        self.max_retries = int(os.getenv("HTTP_MAX_RETRIES", 2))
+        self.backoff = float(os.getenv("HTTP_RETRY_BACKOFF", 0.2))
+
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def start(self):
+        """Ouvre le pool de connexions (appelé dans le lifespan)"""
+        if self._client is None:
+            self._client = self._build_client()
+            logger.info("✅ Client HTTP partagé démarré")
+
+    async def close(self):
+        """Ferme le pool de connexions"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            logger.info("✅ Client HTTP partagé fermé")
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            # Hors lifespan (scripts, tests) : ouverture paresseuse
+            self._client = self._build_client()
+        return self._client
+
+    def _build_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(timeout=self.timeout, limits=self.limits)
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        timeout: Optional[float] = None,
+        **kwargs
+    ) -> httpx.Response:
+        """Envoie une requête avec réessais sur les erreurs transitoires (timeouts, 429, 5xx)"""
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+
+        attempt = 0
+        while True:
+            try:
+                response = await self.client.request(method, url, **kwargs)
+                if response.status_code not in RETRYABLE_STATUS_CODES or attempt >= self.max_retries:
+                    return response
+                delay = self._retry_delay(attempt, response.headers.get("Retry-After"))
+                logger.warning(f"⚠️ {method} {url} -> {response.status_code}, nouvel essai dans {delay:.2f}s")
+            except (httpx.TimeoutException, httpx.NetworkError) as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._retry_delay(attempt)
+                logger.warning(f"⚠️ {method} {url} -> {type(e).__name__}, nouvel essai dans {delay:.2f}s")
+
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    def _retry_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        delay = self.backoff * (2 ** attempt)
+        if retry_after:
+            try:
+                delay = max(delay, float(retry_after))
+            except ValueError:
+                pass
+        # Ne jamais bloquer une requête utilisateur trop longtemps
+        return min(delay, 2.0)
+
+# Instance globale
+http_client = HTTPClientService()
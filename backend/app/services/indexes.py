@@ -0,0 +1,114 @@
+import logging
+from typing import Dict, List, Any
+
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure
+
+from .search import SEARCH_WEIGHTS
+
+logger = logging.getLogger(__name__)
+
+# Registre déclaratif des index, calqué sur les requêtes de PostService / UserService
+INDEXES: Dict[str, List[IndexModel]] = {
+    "posts": [
+        # get_post_by_slug
+        IndexModel([("slug", ASCENDING)], name="slug_unique", unique=True),
+        # Les listes sont triées par (created_at, _id) : le _id final couvre le
+        # départage et la pagination par curseur sans tri en mémoire
+        # get_posts (liste publique) : filtre is_published + tri
+        IndexModel(
+            [("is_published", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="published_created_at_id"
+        ),
+        # get_posts_by_tag / get_posts?tag= : filtre tags (+ is_published) + tri
+        IndexModel(
+            [("tags", ASCENDING), ("is_published", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="tags_published_created_at_id"
+        ),
+        # get_posts?author_id= (avec ou sans is_published) + tri
+        IndexModel(
+            [("author_id", ASCENDING), ("is_published", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="author_published_created_at_id"
+        ),
+        IndexModel(
+            [("author_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="author_created_at_id"
+        ),
+        # get_posts sans filtre (utilisateur connecté)
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created_at_id"),
+        # search_posts : index texte pondéré (un seul index texte par collection)
+        IndexModel(
+            [("title", TEXT), ("tags", TEXT), ("excerpt", TEXT), ("content", TEXT)],
+            name="posts_text",
+            weights=SEARCH_WEIGHTS,
+            default_language="french"
+        ),
+    ],
+    "related_posts": [
+        # RelatedPostsService : listes contenant un post donné (mise à jour, suppression)
+        IndexModel([("related.id", ASCENDING)], name="related_id"),
+    ],
+    "users": [
+        # get_user_by_clerk_id / résolution d'identité / webhooks
+        IndexModel([("clerk_id", ASCENDING)], name="clerk_id_unique", unique=True),
+        # get_all_users
+        IndexModel([("is_active", ASCENDING)], name="is_active"),
+    ],
+}
+
+
+async def ensure_indexes(database) -> Dict[str, List[str]]:
+    """Crée les index déclarés (idempotent) et retourne les index créés ou déjà présents
+
+    Chaque index est créé séparément : un échec (doublons sur un index unique,
+    options en conflit) est journalisé sans bloquer les autres.
+    """
+    applied: Dict[str, List[str]] = {}
+
+    for collection_name, models in INDEXES.items():
+        collection = database[collection_name]
+        applied[collection_name] = []
+
+        for model in models:
+            name = model.document["name"]
+            try:
+                await collection.create_indexes([model])
+                applied[collection_name].append(name)
+            except OperationFailure as e:
+                logger.error(f"❌ Index {collection_name}.{name} non créé: {str(e)}")
+
+    logger.info(f"✅ Index MongoDB vérifiés: {sum(len(v) for v in applied.values())}")
+    return applied
+
+
+async def check_indexes(database) -> Dict[str, Dict[str, Any]]:
+    """Compare les index déclarés aux index présents et à leur utilisation ($indexStats)
+
+    Retourne par collection les index manquants, les index non déclarés et ceux
+    qui n'ont jamais été utilisés depuis le dernier redémarrage du serveur MongoDB.
+    """
+    report: Dict[str, Dict[str, Any]] = {}
+
+    for collection_name, models in INDEXES.items():
+        collection = database[collection_name]
+        declared = {model.document["name"] for model in models}
+
+        existing = set((await collection.index_information()).keys())
+        existing.discard("_id_")
+
+        usage: Dict[str, int] = {}
+        try:
+            async for stat in collection.aggregate([{"$indexStats": {}}]):
+                usage[stat["name"]] = stat.get("accesses", {}).get("ops", 0)
+        except OperationFailure as e:
+            # $indexStats peut être refusé selon les droits de l'utilisateur
+            logger.warning(f"⚠️ $indexStats indisponible sur {collection_name}: {str(e)}")
+
+        report[collection_name] = {
+            "missing": sorted(declared - existing),
+            "undeclared": sorted(existing - declared),
+            "unused": sorted(name for name in existing if usage.get(name) == 0),
+            "usage": usage,
+        }
+
+    return report
@@ -0,0 +1,121 @@
+import os
+import json
+import time
+import asyncio
+import logging
+from typing import Optional, Dict, Any
+
+import jwt
+from .http_client import http_client
+
+logger = logging.getLogger(__name__)
+
+
+class JWKSService:
+    """Cache local des clés publiques Clerk (JWKS) pour la vérification hors-ligne des JWT"""
+
+    def __init__(self):
+        self.secret_key = os.getenv("CLERK_SECRET_KEY")
+        self.jwks_url = os.getenv("CLERK_JWKS_URL", "https://api.clerk.com/v1/jwks")
+        # Fichier JWKS local (tests, environnements sans réseau)
+        self.jwks_path = os.getenv("CLERK_JWKS_PATH")
+
+        # Durée de vie du cache et délai minimum entre deux rafraîchissements forcés
+        self.cache_ttl = int(os.getenv("CLERK_JWKS_CACHE_TTL", 3600))
+        self.min_refresh_interval = int(os.getenv("CLERK_JWKS_MIN_REFRESH_INTERVAL", 60))
+        # Délai avant un nouvel essai après un échec de chargement
+        self.retry_interval = float(os.getenv("CLERK_JWKS_RETRY_INTERVAL", 5))
+
+        self._keys: Dict[str, Any] = {}
+        self._fetched_at: Optional[float] = None
+        self._failed_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    async def get_signing_key(self, kid: Optional[str]) -> Any:
+        """Retourne la clé publique correspondant au `kid` du token
+
+        Les clés sont servies depuis le cache. Un `kid` inconnu déclenche un
+        rafraîchissement (rotation des clés), limité à un par `min_refresh_interval`.
+        Après un échec de chargement, le prochain essai attend `retry_interval`.
+        """
+        if self._is_expired() and not self._in_backoff():
+            await self.refresh()
+
+        if not self._keys:
+            # Pas une erreur du token : la réponse ne doit pas être mise en cache comme un refus
+            raise RuntimeError("JWKS indisponible")
+
+        key = self._find_key(kid)
+        if key is not None:
+            return key
+
+        # Kid inconnu : rotation probable côté Clerk
+        if self._can_force_refresh():
+            logger.info(f"🔑 Kid inconnu ({kid}), rafraîchissement du JWKS")
+            await self.refresh(force=True)
+            key = self._find_key(kid)
+
+        if key is None:
+            raise jwt.InvalidTokenError(f"Clé de signature introuvable pour kid={kid}")
+        return key
+
+    async def refresh(self, force: bool = False) -> None:
+        """Recharge le JWKS (un seul rafraîchissement concurrent)"""
+        fetched_at, failed_at = self._fetched_at, self._failed_at
+        async with self._lock:
+            # Un autre appel a déjà rafraîchi pendant l'attente du verrou
+            if self._fetched_at != fetched_at and not self._is_expired():
+                return
+            # ... ou vient d'échouer : pas de nouvel essai avant `retry_interval`
+            if self._failed_at != failed_at and self._in_backoff():
+                return
+            if not force and self._keys and not self._is_expired():
+                return
+
+            try:
+                jwks = await self._load_jwks()
+                key_set = jwt.PyJWKSet.from_dict(jwks)
+                self._keys = {key.key_id: key.key for key in key_set.keys}
+                self._fetched_at = time.monotonic()
+                self._failed_at = None
+                logger.info(f"🔑 JWKS chargé: {len(self._keys)} clé(s)")
+            except Exception as e:
+                # On garde les anciennes clés (toujours considérées expirées) si le rafraîchissement échoue
+                logger.error(f"❌ Erreur chargement JWKS: {str(e)}")
+                self._failed_at = time.monotonic()
+                if not self._keys:
+                    raise
+
+    async def _load_jwks(self) -> Dict[str, Any]:
+        """Lit le JWKS depuis le fichier local ou l'API Clerk"""
+        if self.jwks_path:
+            with open(self.jwks_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+
+        headers = {}
+        if self.secret_key:
+            headers["Authorization"] = f"Bearer {self.secret_key}"
+
+        response = await http_client.get(self.jwks_url, headers=headers)
+        response.raise_for_status()
+        return response.json()
+
+    def _find_key(self, kid: Optional[str]) -> Any:
+        if kid is None:
+            # Token sans kid : accepté uniquement s'il n'y a qu'une seule clé
+            return next(iter(self._keys.values())) if len(self._keys) == 1 else None
+        return self._keys.get(kid)
+
+    def _is_expired(self) -> bool:
+        return self._fetched_at is None or time.monotonic() - self._fetched_at > self.cache_ttl
+
+    def _can_force_refresh(self) -> bool:
+        if self._in_backoff():
+            return False
+        return self._fetched_at is None or time.monotonic() - self._fetched_at > self.min_refresh_interval
+
+    def _in_backoff(self) -> bool:
+        return self._failed_at is not None and time.monotonic() - self._failed_at < self.retry_interval
+
+# Instance globale
+jwks_service = JWKSService()
@@ -0,0 +1,222 @@
+import os
+import time
+import asyncio
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+from .database import get_database
+from .bloom import BloomFilter
+from .cache_backend import cache_manager, ALL_GROUPS
+
+logger = logging.getLogger(__name__)
+
+NAMESPACE = "known_posts"
+
+
+class KnownPostsFilter:
+    """Cache des absences pour GET /posts/{post_id} et /posts/slug/{slug}
+
+    Filtre de Bloom des ids et slugs existants, reconstruit au démarrage (en tâche
+    de fond) puis périodiquement. Une réponse « absent » ne vaut que pour les
+    écritures connues de ce worker : les siennes, celles diffusées par les autres
+    workers (canal du CacheManager, CACHE_REDIS_URL) et celles vues par le change
+    stream de `posts`. Le filtre ne répond donc 404 sans requête MongoDB que si la
+    diffusion ou les change streams sont actifs ; sinon (ou tant qu'il n'est pas
+    construit) tout est « peut-être présent ». Après une coupure de l'abonnement
+    Redis, le filtre est écarté jusqu'à sa reconstruction. Reste une courte
+    fenêtre après une création sur un autre worker, le temps que l'ajout arrive.
+    """
+
+    kind = "memory"
+
+    def __init__(self):
+        self.enabled = os.getenv("KNOWN_POSTS_FILTER_ENABLED", "true").lower() == "true"
+        self.error_rate = float(os.getenv("KNOWN_POSTS_FILTER_ERROR_RATE", 0.01))
+        self.min_capacity = int(os.getenv("KNOWN_POSTS_FILTER_MIN_CAPACITY", 100000))
+        # Marge pour les créations entre deux reconstructions
+        self.headroom = float(os.getenv("KNOWN_POSTS_FILTER_HEADROOM", 2))
+        # Reconstruction périodique (purge des posts supprimés) ; 0 = au démarrage et à saturation seulement
+        self.rebuild_interval = float(os.getenv("KNOWN_POSTS_FILTER_REBUILD_INTERVAL", 3600))
+
+        self._filter: Optional[BloomFilter] = None
+        self._pending: Optional[List[str]] = None
+        self._task: Optional[asyncio.Task] = None
+        # Créé au démarrage, dans la boucle d'événements qui l'attend
+        self._rebuild_requested: Optional[asyncio.Event] = None
+        self.last_rebuild: Dict[str, Any] = {}
+
+        self.lookups = 0
+        self.definite_misses = 0
+        self.false_positives = 0
+
+        if self.enabled:
+            cache_manager.register(NAMESPACE, self)
+
+    @property
+    def authoritative(self) -> bool:
+        """Les créations des autres workers parviennent à ce worker en ce moment"""
+        # Import local : change_streams dépend de post_service, qui dépend de ce module
+        from .change_streams import change_stream_watcher
+
+        return cache_manager.subscribed or change_stream_watcher.watching_posts
+
+    @property
+    def ready(self) -> bool:
+        return self.enabled and self._filter is not None and self.authoritative
+
+    # --- Cycle de vie ---
+
+    async def start(self) -> None:
+        from .change_streams import change_stream_watcher
+
+        if not self.enabled or self._task is not None:
+            return
+        if not (cache_manager.broadcasting or change_stream_watcher.enabled):
+            logger.info("ℹ️ Filtre des posts inactif : ni diffusion des invalidations (CACHE_REDIS_URL) ni change streams")
+            return
+        self._rebuild_requested = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="known-posts-filter")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def schedule_rebuild(self) -> None:
+        """Demande une reconstruction (saturation, écritures possiblement manquées)"""
+        if self._rebuild_requested is not None:
+            self._rebuild_requested.set()
+
+    async def _run(self) -> None:
+        while True:
+            # Effacé avant la reconstruction : une demande arrivée pendant celle-ci n'est pas perdue
+            self._rebuild_requested.clear()
+            try:
+                await self.rebuild()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Erreur construction du filtre des posts: {str(e)}")
+
+            try:
+                timeout = self.rebuild_interval if self.rebuild_interval > 0 else None
+                await asyncio.wait_for(self._rebuild_requested.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def rebuild(self) -> Dict[str, Any]:
+        """Reconstruit le filtre depuis `posts` (index unique sur slug) puis l'échange d'un coup"""
+        start = time.perf_counter()
+        db = await get_database()
+        posts_collection = db["posts"]
+
+        # Les écritures pendant le parcours sont rejouées sur le nouveau filtre
+        self._pending = []
+        try:
+            count = await posts_collection.estimated_document_count()
+            bloom = BloomFilter(max(self.min_capacity, int(count * 2 * self.headroom)), self.error_rate)
+            async for post in posts_collection.find({}, projection={"slug": 1}).batch_size(5000):
+                for key in self._keys(post):
+                    bloom.add(key)
+            for key in self._pending:
+                bloom.add(key)
+        finally:
+            self._pending = None
+
+        self._filter = bloom
+        self.last_rebuild = {
+            "at": time.time(),
+            "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+            "posts": count,
+        }
+        logger.info(f"✅ Filtre des posts construit: {bloom.count} clés, {bloom.memory_bytes} octets")
+        return self.stats()
+
+    # --- Lecture ---
+
+    def might_exist(self, post_id: Optional[str] = None, slug: Optional[str] = None) -> bool:
+        """False si aucune écriture connue n'a créé ce post (voir la docstring de la classe)"""
+        if not self.ready:
+            return True
+        key = f"id:{post_id}" if post_id is not None else f"slug:{slug}"
+        self.lookups += 1
+        if key in self._filter:
+            return True
+        self.definite_misses += 1
+        return False
+
+    def record_false_positive(self) -> None:
+        """Le filtre a laissé passer une clé que MongoDB n'a pas trouvée"""
+        if self.ready:
+            self.false_positives += 1
+
+    # --- Écritures ---
+
+    async def add(self, *post_docs: Optional[dict]) -> None:
+        """Ajoute les ids et slugs des posts (création : avant l'écriture en base)"""
+        if not self.enabled:
+            return
+        keys = [key for post in post_docs if post for key in self._keys(post)]
+        if not keys:
+            return
+        self._add_local(keys)
+        await cache_manager.publish(NAMESPACE, keys)
+
+    def add_local(self, *post_docs: Optional[dict]) -> None:
+        """Ajout sans diffusion : écriture déjà vue par chaque worker (change stream)"""
+        if not self.enabled:
+            return
+        self._add_local(key for post in post_docs if post for key in self._keys(post))
+
+    def _add_local(self, keys: Iterable[str]) -> None:
+        keys = list(keys)
+        if self._pending is not None:
+            self._pending.extend(keys)
+        if self._filter is not None:
+            for key in keys:
+                self._filter.add(key)
+            if self._filter.saturated:
+                self.schedule_rebuild()
+
+    def invalidate_local(self, groups: Iterable[str]) -> int:
+        """Ajouts diffusés par un autre worker : la réponse « absent » n'est plus valable"""
+        groups = list(groups)
+        if ALL_GROUPS in groups:
+            # Diffusion interrompue, des ajouts ont pu être perdus : plus de 404 jusqu'à la reconstruction
+            self._filter = None
+            self.schedule_rebuild()
+            groups = [group for group in groups if group != ALL_GROUPS]
+        self._add_local(groups)
+        return len(groups)
+
+    @staticmethod
+    def _keys(post: Dict[str, Any]) -> List[str]:
+        keys = []
+        if post.get("_id") is not None:
+            keys.append(f"id:{post['_id']}")
+        if post.get("slug"):
+            keys.append(f"slug:{post['slug']}")
+        return keys
+
+    def stats(self) -> Dict[str, Any]:
+        absent = self.definite_misses + self.false_positives
+        return {
+            "backend": "bloom",
+            "enabled": self.enabled,
+            "authoritative": self.authoritative,
+            "ready": self.ready,
+            **(self._filter.stats() if self._filter is not None else {}),
+            "lookups": self.lookups,
+            "definite_misses": self.definite_misses,
+            "false_positives": self.false_positives,
+            # Parmi les clés absentes, part qui a quand même coûté une requête
+            "observed_false_positive_rate": round(self.false_positives / absent, 6) if absent else 0.0,
+            "last_rebuild": self.last_rebuild,
+        }
+
+# Instance globale
+known_posts = KnownPostsFilter()
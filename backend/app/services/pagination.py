@@ -0,0 +1,54 @@
+import json
+import base64
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from bson import ObjectId
+
+# Position dans un tri (created_at desc, _id desc)
+Cursor = Tuple[datetime, ObjectId]
+
+# Tri stable utilisé par toutes les listes de posts
+POST_SORT = [("created_at", -1), ("_id", -1)]
+
+
+def encode_cursor(created_at: datetime, post_id: Any) -> str:
+    """Encode la position du dernier élément d'une page en un curseur opaque"""
+    raw = json.dumps({"c": created_at.isoformat(), "i": str(post_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """Décode un curseur opaque, lève ValueError s'il est invalide"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        created_at = datetime.fromisoformat(data["c"])
+        post_id = ObjectId(data["i"])
+    except Exception as e:
+        raise ValueError(f"Curseur invalide: {cursor}") from e
+    return created_at, post_id
+
+
+def keyset_filter(after: Optional[Cursor]) -> Dict[str, Any]:
+    """Filtre des éléments situés strictement après le curseur dans POST_SORT"""
+    if after is None:
+        return {}
+
+    created_at, post_id = after
+    return {
+        "$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": post_id}},
+        ]
+    }
+
+
+def next_cursor(items: list, limit: int) -> Optional[str]:
+    """Curseur de la page suivante si la page courante est pleine"""
+    if len(items) < limit or not items:
+        return None
+    last = items[-1]
+    if last.created_at is None:
+        return None
+    return encode_cursor(last.created_at, last.id)
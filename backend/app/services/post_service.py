@@ -1,35 +1,86 @@
-from typing import Optional, List, Dict, Any
-from ..models.post import PostCreate, PostUpdate, PostResponse
+from typing import Optional, List, Dict, Any, Union, Tuple, AsyncIterator
+from ..models.post import (
+    PostCreate, PostUpdate, PostResponse, PostSummary, PostSearchResult,
+    BulkPostOperation, BulkPostItemResult, BulkPostResponse
+)
 from .database import get_database
+from .cache import MISSING
+from .cache_backend import cache_manager
+from .pagination import Cursor, POST_SORT, keyset_filter
+from .serialization import type_adapter
+from .export import export_cursor
+from .content import derive_fields, stored_html, DERIVED_VERSION
+from .search import query_terms, strip_html, snippet, highlight, regex_filter, regex_score
+from .related_posts import related_posts_service
+from .feed_service import feed_service
+from .known_posts import known_posts
+from .tag_stats import tag_stats_service, tag_deltas, merge_deltas, TagDeltas
 from bson import ObjectId
+from pymongo import InsertOne, UpdateOne, DeleteOne, ReturnDocument
+from pymongo.errors import BulkWriteError, OperationFailure
 from datetime import datetime
+import os
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Projection des listes : le corps des articles (source et rendu) n'est pas chargé depuis Mongo
+SUMMARY_PROJECTION = {"content": 0, "content_html": 0}
+
 class PostService:
-    """Service de gestion des posts - Version simplifiée"""
+    """Service de gestion des posts - Version simplifiée
+
+    Les lectures publiques (posts publiés uniquement) passent par un cache mémoire
+    LRU + TTL borné en nombre d'entrées et en octets. Chaque entrée est rattachée
+    aux groupes `post:<id>`, `slug:<slug>`, `tag:<tag>`, `author:<id>` et, pour les
+    premières pages des listes, `list:first` ; chaque écriture invalide les groupes
+    des versions avant/après du post. Les pages profondes non filtrées expirent par TTL.
+    """
+
+    def __init__(self):
+        self.cache_enabled = os.getenv("POST_CACHE_ENABLED", "true").lower() == "true"
+        # Backend selon POST_CACHE_BACKEND (mémoire du worker ou Redis partagé)
+        self.cache = cache_manager.create(
+            "post",
+            maxsize=int(os.getenv("POST_CACHE_MAXSIZE", 2000)),
+            ttl=float(os.getenv("POST_CACHE_TTL", 60)),
+            max_bytes=int(os.getenv("POST_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+        )
+        # Pages (skip) rattachées au groupe `list:first`, invalidé à chaque écriture
+        self.cache_first_pages = int(os.getenv("POST_CACHE_FIRST_PAGES", 3))
+        # Recherche sans index texte : nombre maximum de posts examinés (les plus récents)
+        self.search_fallback_scan = int(os.getenv("SEARCH_FALLBACK_SCAN", 500))
     
-    async def create_post(self, post_data: PostCreate) -> PostResponse:
-        """Crée un nouveau post"""
+    async def create_post(self, post_data: PostCreate, author: Optional[Dict[str, Any]] = None) -> PostResponse:
+        """Crée un nouveau post (un seul aller-retour, pas de relecture)"""
         try:
             db = await get_database()
             posts_collection = db["posts"]
             
-            # Convertir en dict et ajouter les timestamps
+            # Convertir en dict et ajouter l'auteur et les timestamps
+            now = datetime.now()
             post_dict = post_data.model_dump()
-            post_dict["created_at"] = datetime.now()
-            post_dict["updated_at"] = datetime.now()
+            if author is not None:
+                post_dict["author_id"] = author.get("clerk_id")
+                post_dict["author_email"] = author.get("email")
+            post_dict["created_at"] = now
+            post_dict["updated_at"] = now
             post_dict["is_published"] = post_dict.get("is_published", False)
+            # Rendu HTML, extrait automatique et temps de lecture calculés une fois, à l'écriture
+            post_dict.update(derive_fields(post_dict["content"]))
             
-            # Insérer en base
-            result = await posts_collection.insert_one(post_dict)
-            
-            # Récupérer le post créé
-            created_post = await posts_collection.find_one({"_id": result.inserted_id})
+            # Connu du filtre des posts avant d'être lisible (pas de 404 transitoire)
+            post_dict["_id"] = ObjectId()
+            await known_posts.add(post_dict)
+
+            # Insérer en base : le document inséré est déjà complet
+            await posts_collection.insert_one(post_dict)
+            await tag_stats_service.record_change(None, post_dict)
+            await related_posts_service.schedule(post_dict["_id"])
+            await self.invalidate_cache(post_dict)
             
-            logger.info(f"✅ Post créé: {created_post.get('title')}")
-            return self._convert_to_response(created_post)
+            logger.info(f"✅ Post créé: {post_dict.get('title')}")
+            return self._convert_to_response(post_dict)
             
         except Exception as e:
             logger.error(f"❌ Erreur création post: {str(e)}")
@@ -40,6 +91,9 @@ class PostService:
         try:
             if not ObjectId.is_valid(post_id):
                 return None
+            # Absence certaine : pas de requête
+            if not known_posts.might_exist(post_id=ObjectId(post_id)):
+                return None
             
             db = await get_database()
             posts_collection = db["posts"]
@@ -48,6 +102,7 @@ class PostService:
             
             if post:
                 return self._convert_to_response(post)
+            known_posts.record_false_positive()
             return None
             
         except Exception as e:
@@ -60,10 +115,23 @@ class PostService:
             db = await get_database()
             posts_collection = db["posts"]
             
+            cache_key = ("slug", slug)
+            cached = await self._cache_get(cache_key)
+            if cached is not MISSING:
+                return cached
+            # Absence certaine : pas de requête
+            if not known_posts.might_exist(slug=slug):
+                return None
+
             post = await posts_collection.find_one({"slug": slug})
             
             if post:
-                return self._convert_to_response(post)
+                response = self._convert_to_response(post)
+                # Seule la version publiée est identique pour tous les lecteurs
+                if response.is_published:
+                    await self._cache_set(cache_key, response, [post], groups=[f"slug:{slug}"])
+                return response
+            known_posts.record_false_positive()
             return None
             
         except Exception as e:
@@ -77,64 +145,270 @@ class PostService:
         is_published: Optional[bool] = None,
         tag: Optional[str] = None,
         author_id: Optional[str] = None,
-        current_user_id: Optional[str] = None
-    ) -> List[PostResponse]:
-        """Récupère les posts avec filtres"""
+        current_user_id: Optional[str] = None,
+        after: Optional[Cursor] = None,
+        include_content: bool = False
+    ) -> List[Union[PostSummary, PostResponse]]:
+        """Récupère les posts avec filtres (pagination par skip ou par curseur `after`)
+
+        Sans `include_content`, retourne des PostSummary chargés sans le contenu.
+        """
         try:
             db = await get_database()
             posts_collection = db["posts"]
             
-            # Construire le filtre
-            filter_dict = {}
-            
-            if is_published is not None:
-                filter_dict["is_published"] = is_published
-            
-            if tag:
-                filter_dict["tags"] = {"$in": [tag]}
-            
-            if author_id:
-                filter_dict["author_id"] = author_id
-            
-            # Si pas d'utilisateur connecté, ne montrer que les posts publiés
-            if not current_user_id and is_published is None:
-                filter_dict["is_published"] = True
+            filter_dict = self._posts_filter(is_published, tag, author_id, current_user_id)
+
+            # Pagination par curseur : coût constant quelle que soit la profondeur
+            if after is not None:
+                skip = 0
+
+            # Variante publique (publiés uniquement) : identique pour tous, mise en cache
+            cacheable = filter_dict.get("is_published") is True
+            cache_key = ("posts", tag, author_id, skip, limit, after, include_content)
+            if cacheable:
+                cached = await self._cache_get(cache_key)
+                if cached is not MISSING:
+                    return cached
+
+            if after is not None:
+                filter_dict.update(keyset_filter(after))
             
-            cursor = posts_collection.find(filter_dict).sort("created_at", -1).skip(skip).limit(limit)
+            cursor = posts_collection.find(
+                filter_dict,
+                projection=None if include_content else SUMMARY_PROJECTION
+            ).sort(POST_SORT).skip(skip).limit(limit)
             posts = await cursor.to_list(length=limit)
             
-            result = [self._convert_to_response(post) for post in posts]
-            
-            logger.info(f"✅ {len(result)} posts récupérés")
+            result = self._convert_list(posts, include_content)
+
+            if cacheable:
+                groups = [f"tag:{tag}"] if tag else []
+                if author_id:
+                    groups.append(f"author:{author_id}")
+                if after is None and skip < self.cache_first_pages * limit:
+                    groups.append("list:first")
+                await self._cache_set(cache_key, result, posts, groups=groups)
+            
+            logger.debug(f"✅ {len(result)} posts récupérés")
             return result
             
         except Exception as e:
             logger.error(f"❌ Erreur récupération posts: {str(e)}")
             return []
     
-    async def get_posts_by_tag(self, tag: str, skip: int = 0, limit: int = 10) -> List[PostResponse]:
-        """Récupère les posts par tag"""
+    async def get_posts_validators(
+        self,
+        skip: int = 0,
+        limit: int = 10,
+        is_published: Optional[bool] = None,
+        tag: Optional[str] = None,
+        author_id: Optional[str] = None,
+        current_user_id: Optional[str] = None,
+        after: Optional[Cursor] = None
+    ) -> List[Dict[str, Any]]:
+        """(_id, updated_at) de la page que retournerait `get_posts` (revalidation HTTP)
+
+        Même filtre, tri et pagination, mais seuls `_id` et `updated_at` sont chargés.
+        """
+        db = await get_database()
+        posts_collection = db["posts"]
+
+        filter_dict = self._posts_filter(is_published, tag, author_id, current_user_id)
+        if after is not None:
+            filter_dict.update(keyset_filter(after))
+            skip = 0
+
+        cursor = posts_collection.find(
+            filter_dict,
+            projection={"updated_at": 1}
+        ).sort(POST_SORT).skip(skip).limit(limit)
+        return await cursor.to_list(length=limit)
+
+    async def get_post_validators(
+        self,
+        post_id: Optional[str] = None,
+        slug: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Champs nécessaires à la revalidation HTTP d'un post, sans charger `content`"""
+        if post_id is not None:
+            if not ObjectId.is_valid(post_id):
+                return None
+            filter_dict: Dict[str, Any] = {"_id": ObjectId(post_id)}
+        else:
+            filter_dict = {"slug": slug}
+
+        if not known_posts.might_exist(post_id=filter_dict.get("_id"), slug=slug):
+            return None
+
+        db = await get_database()
+        posts_collection = db["posts"]
+
+        return await posts_collection.find_one(
+            filter_dict,
+            projection={"updated_at": 1, "is_published": 1, "author_id": 1}
+        )
+
+    @staticmethod
+    def _posts_filter(
+        is_published: Optional[bool],
+        tag: Optional[str],
+        author_id: Optional[str],
+        current_user_id: Optional[str]
+    ) -> Dict[str, Any]:
+        filter_dict: Dict[str, Any] = {}
+        
+        if is_published is not None:
+            filter_dict["is_published"] = is_published
+        
+        if tag:
+            filter_dict["tags"] = {"$in": [tag]}
+        
+        if author_id:
+            filter_dict["author_id"] = author_id
+        
+        # Si pas d'utilisateur connecté, ne montrer que les posts publiés
+        if not current_user_id and is_published is None:
+            filter_dict["is_published"] = True
+
+        return filter_dict
+
+    async def get_posts_by_tag(
+        self,
+        tag: str,
+        skip: int = 0,
+        limit: int = 10,
+        after: Optional[Cursor] = None,
+        include_content: bool = False
+    ) -> List[Union[PostSummary, PostResponse]]:
+        """Récupère les posts par tag (pagination par skip ou par curseur `after`)"""
         try:
             db = await get_database()
             posts_collection = db["posts"]
-            
-            cursor = posts_collection.find({
+
+            filter_dict = {
                 "tags": {"$in": [tag]},
                 "is_published": True
-            }).sort("created_at", -1).skip(skip).limit(limit)
+            }
+
+            if after is not None:
+                filter_dict.update(keyset_filter(after))
+                skip = 0
+
+            cache_key = ("tag", tag, skip, limit, after, include_content)
+            cached = await self._cache_get(cache_key)
+            if cached is not MISSING:
+                return cached
+            
+            cursor = posts_collection.find(
+                filter_dict,
+                projection=None if include_content else SUMMARY_PROJECTION
+            ).sort(POST_SORT).skip(skip).limit(limit)
             
             posts = await cursor.to_list(length=limit)
-            result = [self._convert_to_response(post) for post in posts]
+            result = self._convert_list(posts, include_content)
+            await self._cache_set(cache_key, result, posts, groups=[f"tag:{tag}"])
             
-            logger.info(f"✅ {len(result)} posts trouvés pour le tag '{tag}'")
+            logger.debug(f"✅ {len(result)} posts trouvés pour le tag '{tag}'")
             return result
             
         except Exception as e:
             logger.error(f"❌ Erreur récupération posts par tag: {str(e)}")
             return []
     
-    async def update_post(self, post_id: str, post_update: PostUpdate) -> Optional[PostResponse]:
-        """Met à jour un post"""
+    async def search_posts(
+        self,
+        query: str,
+        skip: int = 0,
+        limit: int = 20,
+        tag: Optional[str] = None
+    ) -> List[PostSearchResult]:
+        """Recherche plein texte parmi les posts publiés (index texte `posts_text`)
+
+        Résultats triés par pertinence puis par date. Seul le rendu (`content_html`) de
+        la page demandée est chargé, le temps d'en extraire un extrait surligné. Sans
+        index texte, repli sur une recherche par expressions régulières.
+        """
+        db = await get_database()
+        posts_collection = db["posts"]
+        terms = query_terms(query)
+
+        base_filter: Dict[str, Any] = {"is_published": True}
+        if tag:
+            base_filter["tags"] = tag
+
+        try:
+            cursor = posts_collection.find(
+                {**base_filter, "$text": {"$search": query}},
+                projection={"score": {"$meta": "textScore"}, "content": 0}
+            ).sort([("score", {"$meta": "textScore"}), *POST_SORT]).skip(skip).limit(limit)
+            posts = await cursor.to_list(length=limit)
+        except (OperationFailure, NotImplementedError) as e:
+            # Index texte absent (IndexNotFound) ou moteur sans $text
+            if isinstance(e, OperationFailure) and e.code != 27:
+                raise
+            logger.warning(f"⚠️ Recherche sans index texte, repli sur les regex: {str(e)}")
+            posts = await self._regex_search(posts_collection, base_filter, terms, skip, limit)
+
+        results = []
+        for post in posts:
+            text = post.get("excerpt") or ""
+            post_snippet = snippet(strip_html(text), terms) if text else None
+            if post_snippet is None:
+                # Texte affiché (rendu Markdown), pas la source : ni `**`, ni `#`, ni URLs de liens
+                post_snippet = snippet(strip_html(post.get("content_html") or ""), terms)
+            results.append(PostSearchResult(
+                **self._summary_data(post),
+                score=round(post.get("score", 0.0), 4),
+                title_highlight=highlight(post["title"], terms),
+                snippet=post_snippet
+            ))
+
+        logger.debug(f"🔎 Recherche '{query}': {len(results)} résultat(s)")
+        return results
+
+    async def _regex_search(
+        self,
+        posts_collection,
+        base_filter: Dict[str, Any],
+        terms: List[str],
+        skip: int,
+        limit: int
+    ) -> List[dict]:
+        """Recherche de secours : posts récents filtrés par regex, classés par poids des champs"""
+        cursor = posts_collection.find({**base_filter, **regex_filter(terms)}).sort(POST_SORT).limit(self.search_fallback_scan)
+        posts = await cursor.to_list(length=self.search_fallback_scan)
+        for post in posts:
+            post["score"] = regex_score(post, terms)
+        # Tri stable : à score égal, les plus récents d'abord (ordre de POST_SORT)
+        posts.sort(key=lambda post: post["score"], reverse=True)
+        return posts[skip:skip + limit]
+
+    async def export_posts(
+        self,
+        after: Optional[ObjectId] = None,
+        is_published: Optional[bool] = None
+    ) -> AsyncIterator[PostResponse]:
+        """Parcourt tous les posts (brouillons compris) par `_id` croissant, au fil du curseur"""
+        db = await get_database()
+        filter_dict: Dict[str, Any] = {}
+        if is_published is not None:
+            filter_dict["is_published"] = is_published
+
+        async for post in export_cursor(db["posts"], filter_dict, after):
+            yield self._convert_to_response(post)
+
+    async def update_post(
+        self,
+        post_id: str,
+        post_update: PostUpdate,
+        author_id: Optional[str] = None
+    ) -> Optional[PostResponse]:
+        """Met à jour un post et retourne sa nouvelle version
+
+        Avec `author_id`, la vérification de propriété fait partie du filtre :
+        retourne None si le post n'existe pas ou appartient à un autre auteur.
+        """
         try:
             if not ObjectId.is_valid(post_id):
                 return None
@@ -145,25 +419,37 @@ class PostService:
             # Préparer les données de mise à jour
             update_data = {k: v for k, v in post_update.model_dump().items() if v is not None}
             update_data["updated_at"] = datetime.now()
-            
-            # Mettre à jour
-            result = await posts_collection.update_one(
-                {"_id": ObjectId(post_id)},
-                {"$set": update_data}
+            if "content" in update_data:
+                update_data.update(derive_fields(update_data["content"]))
+            
+            # Vérification et écriture en un seul aller-retour. La version précédente
+            # est retournée (tags et statut d'origine pour tag_stats) ; la nouvelle
+            # s'en déduit localement, `$set` n'ayant que des champs de premier niveau.
+            previous_post = await posts_collection.find_one_and_update(
+                self._owned_filter(post_id, author_id),
+                {"$set": update_data},
+                return_document=ReturnDocument.BEFORE
             )
             
-            if result.modified_count > 0:
-                updated_post = await posts_collection.find_one({"_id": ObjectId(post_id)})
-                return self._convert_to_response(updated_post)
-            
-            return None
+            if not previous_post:
+                return None
+
+            # Nouveau slug connu du filtre des posts une fois la propriété vérifiée
+            if "slug" in update_data:
+                await known_posts.add({"_id": previous_post["_id"], "slug": update_data["slug"]})
+
+            updated_post = {**previous_post, **update_data}
+            await tag_stats_service.record_change(previous_post, updated_post)
+            await related_posts_service.schedule(previous_post["_id"])
+            await self.invalidate_cache(previous_post, updated_post)
+            return self._convert_to_response(updated_post)
             
         except Exception as e:
             logger.error(f"❌ Erreur mise à jour post: {str(e)}")
-            return None
+            raise e
     
-    async def delete_post(self, post_id: str) -> bool:
-        """Supprime un post"""
+    async def delete_post(self, post_id: str, author_id: Optional[str] = None) -> bool:
+        """Supprime un post (avec `author_id` : uniquement s'il appartient à cet auteur)"""
         try:
             if not ObjectId.is_valid(post_id):
                 return False
@@ -171,32 +457,415 @@ class PostService:
             db = await get_database()
             posts_collection = db["posts"]
             
-            result = await posts_collection.delete_one({"_id": ObjectId(post_id)})
+            deleted_post = await posts_collection.find_one_and_delete(
+                self._owned_filter(post_id, author_id),
+                projection={"slug": 1, "tags": 1, "is_published": 1, "author_id": 1}
+            )
             
-            logger.info(f"✅ Post supprimé: {post_id}")
-            return result.deleted_count > 0
+            if deleted_post:
+                await tag_stats_service.record_change(deleted_post, None)
+                await related_posts_service.schedule(post_id)
+                await self.invalidate_cache(deleted_post)
+                logger.info(f"✅ Post supprimé: {post_id}")
+            return deleted_post is not None
             
         except Exception as e:
             logger.error(f"❌ Erreur suppression post: {str(e)}")
+            raise e
+
+    async def post_exists(self, post_id: str) -> bool:
+        """Indique si un post existe (distingue 404 et 403 après un refus de propriété)"""
+        if not ObjectId.is_valid(post_id):
             return False
+
+        db = await get_database()
+        posts_collection = db["posts"]
+
+        post = await posts_collection.find_one({"_id": ObjectId(post_id)}, projection={"_id": 1})
+        return post is not None
+
+    @staticmethod
+    def _owned_filter(post_id: str, author_id: Optional[str]) -> Dict[str, Any]:
+        filter_dict: Dict[str, Any] = {"_id": ObjectId(post_id)}
+        if author_id is not None:
+            filter_dict["author_id"] = author_id
+        return filter_dict
     
+    async def bulk_write_posts(
+        self,
+        operations: List[BulkPostOperation],
+        author: Dict[str, Any],
+        ordered: bool = True
+    ) -> BulkPostResponse:
+        """Applique un lot d'opérations en un seul bulk_write
+
+        La propriété des posts visés est vérifiée en une seule requête `$in`, puis
+        rappelée dans le filtre de chaque écriture avec le `updated_at` lu : un post
+        supprimé ou modifié entre-temps n'est pas écrit et l'opération est en échec
+        (404 / 409). En mode ordonné, le lot s'arrête à la première erreur d'écriture.
+        """
+        db = await get_database()
+        posts_collection = db["posts"]
+        author_id = author.get("clerk_id")
+        now = datetime.now()
+        # Précision de MongoDB (ms) : comparable à la valeur relue
+        now = now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+        results: List[Optional[BulkPostItemResult]] = [None] * len(operations)
+
+        # Vérification de propriété en une seule requête
+        target_ids = {
+            operation.post_id for operation in operations
+            if operation.op != "create" and ObjectId.is_valid(operation.post_id)
+        }
+        owners: Dict[str, Optional[str]] = {}
+        # État courant (tags, publication) des posts visés, pour tag_stats
+        states: Dict[str, Optional[Dict[str, Any]]] = {}
+        if target_ids:
+            cursor = posts_collection.find(
+                {"_id": {"$in": [ObjectId(post_id) for post_id in target_ids]}},
+                projection={"author_id": 1, "slug": 1, "tags": 1, "is_published": 1, "updated_at": 1}
+            )
+            async for post in cursor:
+                owners[str(post["_id"])] = post.get("author_id")
+                states[str(post["_id"])] = post
+
+        # Construction des écritures (positions dans `operations` conservées)
+        requests = []
+        request_positions: List[int] = []
+        for index, operation in enumerate(operations):
+            error = self._check_bulk_operation(operation, owners, author_id)
+            if error:
+                status_code, message = error
+                results[index] = BulkPostItemResult(
+                    index=index, op=operation.op, post_id=operation.post_id,
+                    success=False, status=status_code, error=message
+                )
+                if ordered:
+                    break
+                continue
+
+            request, post_id, written = self._build_bulk_request(operation, author, now, states.get(operation.post_id))
+            requests.append((request, post_id, written))
+            request_positions.append(index)
+            if operation.op == "create":
+                operation.post_id = post_id
+
+        # Exécution en un seul aller-retour
+        write_errors: Dict[int, Dict[str, Any]] = {}
+        details: Dict[str, Any] = {}
+        if requests:
+            # Nouveaux ids et slugs connus du filtre des posts avant l'écriture
+            await known_posts.add(*(written for _, _, written in requests))
+            try:
+                result = await posts_collection.bulk_write([request for request, _, _ in requests], ordered=ordered)
+                details = result.bulk_api_result
+            except BulkWriteError as e:
+                details = e.details
+                write_errors = {error["index"]: error for error in details.get("writeErrors", [])}
+
+        # En mode ordonné, rien n'est exécuté après la première erreur d'écriture
+        stopped_at = min(write_errors) if ordered and write_errors else None
+        executed = [
+            position for position in range(len(requests))
+            if position not in write_errors and (stopped_at is None or position < stopped_at)
+        ]
+        noops = await self._find_bulk_noops(posts_collection, operations, request_positions, executed, details, now)
+
+        deltas: TagDeltas = {}
+        touched: List[Optional[Dict[str, Any]]] = []
+        for position, index in enumerate(request_positions):
+            operation = operations[index]
+            if position in write_errors:
+                error = write_errors[position]
+                results[index] = BulkPostItemResult(
+                    index=index, op=operation.op, post_id=operation.post_id, success=False,
+                    status=409 if error.get("code") == 11000 else 400,
+                    error="Slug déjà utilisé" if error.get("code") == 11000 else error.get("errmsg")
+                )
+            elif stopped_at is not None and position > stopped_at:
+                continue
+            elif position in noops:
+                status_code, message = noops[position]
+                results[index] = BulkPostItemResult(
+                    index=index, op=operation.op, post_id=operation.post_id,
+                    success=False, status=status_code, error=message
+                )
+            else:
+                results[index] = BulkPostItemResult(
+                    index=index, op=operation.op, post_id=operation.post_id, success=True,
+                    status=201 if operation.op == "create" else 200
+                )
+                # Les écritures réussies sont rejouées dans l'ordre sur l'état connu
+                request, post_id, written = requests[position]
+                before = states.get(post_id)
+                after = written
+                if before is not None and written is not None:
+                    after = {**before, **written}
+                merge_deltas(deltas, tag_deltas(before, after))
+                touched.extend((before, after))
+                states[post_id] = after
+
+        await tag_stats_service.apply(deltas)
+        await self.invalidate_cache(*touched)
+        await related_posts_service.schedule(*(
+            operations[index].post_id for index in request_positions
+            if results[index] is not None and results[index].success
+        ))
+
+        final_results = [
+            result or BulkPostItemResult(
+                index=index, op=operations[index].op, post_id=operations[index].post_id,
+                success=False, status=424, error="Non exécutée (lot interrompu)"
+            )
+            for index, result in enumerate(results)
+        ]
+
+        logger.info(f"✅ Lot de {len(operations)} opération(s) appliqué ({len(requests)} écriture(s))")
+        return BulkPostResponse(
+            success=all(result.success for result in final_results),
+            ordered=ordered,
+            inserted=details.get("nInserted", 0),
+            modified=details.get("nModified", 0),
+            deleted=details.get("nRemoved", 0),
+            results=final_results
+        )
+
+    def _check_bulk_operation(
+        self,
+        operation: BulkPostOperation,
+        owners: Dict[str, Optional[str]],
+        author_id: Optional[str]
+    ) -> Optional[Tuple[int, str]]:
+        """Retourne (statut, message) si l'opération ne peut pas être appliquée"""
+        if operation.op == "create":
+            return None
+        if not ObjectId.is_valid(operation.post_id):
+            return 400, "ID de post invalide"
+        if operation.post_id not in owners:
+            return 404, "Post non trouvé"
+        if owners[operation.post_id] != author_id:
+            return 403, "Vous ne pouvez modifier que vos propres posts"
+        return None
+
+    async def _find_bulk_noops(
+        self,
+        posts_collection,
+        operations: List[BulkPostOperation],
+        request_positions: List[int],
+        executed: List[int],
+        details: Dict[str, Any],
+        now: datetime
+    ) -> Dict[int, Tuple[int, str]]:
+        """Écritures exécutées sans effet (filtre sans correspondance) : position -> (statut, message)
+
+        bulk_write ne retourne que des totaux ; les posts ne sont relus que si
+        `nMatched` / `nRemoved` sont inférieurs au nombre d'écritures exécutées.
+        """
+        updates = [position for position in executed if operations[request_positions[position]].op not in ("create", "delete")]
+        deletes = [position for position in executed if operations[request_positions[position]].op == "delete"]
+        if details.get("nMatched", 0) >= len(updates) and details.get("nRemoved", 0) >= len(deletes):
+            return {}
+
+        ids = [ObjectId(operations[request_positions[position]].post_id) for position in updates + deletes]
+        current = {
+            str(post["_id"]): post
+            async for post in posts_collection.find({"_id": {"$in": ids}}, projection={"updated_at": 1})
+        }
+
+        noops: Dict[int, Tuple[int, str]] = {}
+        for position in updates:
+            post = current.get(operations[request_positions[position]].post_id)
+            if post is None:
+                noops[position] = (404, "Post non trouvé")
+            elif post.get("updated_at") != now:
+                noops[position] = (409, "Post modifié pendant le lot")
+
+        # Un post disparu a pu être supprimé par une autre requête : seules `nRemoved` suppressions reviennent au lot
+        removed = details.get("nRemoved", 0)
+        for position in deletes:
+            if operations[request_positions[position]].post_id in current:
+                noops[position] = (409, "Post modifié pendant le lot")
+            elif removed > 0:
+                removed -= 1
+            else:
+                noops[position] = (404, "Post non trouvé")
+        return noops
+
+    def _build_bulk_request(
+        self,
+        operation: BulkPostOperation,
+        author: Dict[str, Any],
+        now: datetime,
+        state: Optional[Dict[str, Any]] = None
+    ) -> Tuple[Any, str, Optional[Dict[str, Any]]]:
+        """Construit l'écriture pymongo d'une opération (filtre incluant l'auteur et l'état lu)
+
+        Retourne aussi les champs écrits (None pour une suppression).
+        """
+        if operation.op == "create":
+            post_dict = operation.post.model_dump()
+            post_dict["_id"] = ObjectId()
+            post_dict["author_id"] = author.get("clerk_id")
+            post_dict["author_email"] = author.get("email")
+            post_dict["created_at"] = now
+            post_dict["updated_at"] = now
+            post_dict.update(derive_fields(post_dict["content"]))
+            return InsertOne(post_dict), str(post_dict["_id"]), post_dict
+
+        owned_filter = {"_id": ObjectId(operation.post_id), "author_id": author.get("clerk_id")}
+        if state is not None:
+            # Écriture conditionnelle : sans effet si le post a changé depuis la lecture
+            owned_filter["updated_at"] = state.get("updated_at")
+
+        if operation.op == "delete":
+            return DeleteOne(owned_filter), operation.post_id, None
+
+        if operation.op == "update":
+            update_data = {k: v for k, v in operation.changes.model_dump().items() if v is not None}
+            if "content" in update_data:
+                update_data.update(derive_fields(update_data["content"]))
+        else:
+            update_data = {"is_published": operation.op == "publish"}
+        update_data["updated_at"] = now
+
+        return UpdateOne(owned_filter, {"$set": update_data}), operation.post_id, update_data
+
+    async def backfill_derived_fields(self, batch_size: int = 500, after: Optional[ObjectId] = None) -> Dict[str, Any]:
+        """Calcule les champs dérivés des posts écrits avant la fonctionnalité (ou d'une version antérieure)
+
+        Lots parcourus par `_id` croissant ; chaque lot est écrit en un bulk_write.
+        Reprise possible : les posts déjà à jour ne correspondent plus au filtre, et
+        `after` permet de repartir du dernier `_id` journalisé. Un post modifié
+        entre la lecture et l'écriture (donc déjà recalculé) n'est pas écrasé.
+        `updated_at` est avancé : `content_html` change, les ETag aussi.
+        """
+        db = await get_database()
+        posts_collection = db["posts"]
+        pending = {"derived_version": {"$ne": DERIVED_VERSION}}
+
+        updated = 0
+        while True:
+            filter_dict = {**pending, "_id": {"$gt": after}} if after is not None else pending
+            batch = await posts_collection.find(
+                filter_dict,
+                projection={"content": 1, "is_published": 1}
+            ).sort("_id", 1).limit(batch_size).to_list(length=batch_size)
+            if not batch:
+                break
+
+            now = datetime.now()
+            requests = [
+                UpdateOne(
+                    {"_id": post["_id"], **pending},
+                    {"$set": {**derive_fields(post.get("content") or ""), "updated_at": now}}
+                )
+                for post in batch
+            ]
+            result = await posts_collection.bulk_write(requests, ordered=False)
+            updated += result.modified_count
+            after = batch[-1]["_id"]
+            await self.invalidate_cache(*batch)
+            logger.info(f"🧮 Champs dérivés: {updated} post(s) mis à jour, dernier _id {after}")
+
+        return {"updated": updated, "last_id": str(after) if after is not None else None}
+
+    # --- Cache des lectures publiques ---
+
+    async def _cache_get(self, key: Tuple) -> Any:
+        if not self.cache_enabled:
+            return MISSING
+        return await self.cache.get(key, MISSING)
+
+    async def _cache_set(self, key: Tuple, value: Any, post_docs: List[dict], groups: List[str]) -> None:
+        if not self.cache_enabled:
+            return
+        groups = groups + [f"post:{post['_id']}" for post in post_docs]
+        await self.cache.set(key, value, groups=groups, size=sum(self._doc_size(post) for post in post_docs))
+
+    @staticmethod
+    def _doc_size(post_doc: dict) -> int:
+        """Taille approximative d'un post en mémoire (textes + surcoût fixe par champ)"""
+        size = 0
+        for value in post_doc.values():
+            if isinstance(value, str):
+                size += len(value)
+            elif isinstance(value, list):
+                size += sum(len(item) if isinstance(item, str) else 64 for item in value)
+            size += 64
+        return size
+
+    async def invalidate_cache(self, *post_docs: Optional[dict]) -> int:
+        """Invalide les entrées liées aux versions d'un post (avant et/ou après écriture)
+
+        Les listes (premières pages, tags, auteur) ne contiennent que des posts publiés :
+        elles ne sont invalidées que si l'une des versions est (ou était) publiée. Un
+        document sans `is_published` (suppression vue par un change stream) les invalide aussi.
+        """
+        published = any(post and post.get("is_published", True) for post in post_docs)
+        groups = {"list:first"} if published else set()
+        for post in post_docs:
+            if not post:
+                continue
+            if post.get("_id") is not None:
+                groups.add(f"post:{post['_id']}")
+            if post.get("slug"):
+                groups.add(f"slug:{post['slug']}")
+            if published:
+                if post.get("author_id"):
+                    groups.add(f"author:{post['author_id']}")
+                groups.update(f"tag:{tag}" for tag in post.get("tags") or [])
+
+        removed = await self.cache.invalidate_groups(groups)
+        logger.debug(f"🧹 Cache posts: {removed} entrée(s) invalidée(s)")
+
+        # Flux RSS / Atom et sitemap, seulement si un post publié est concerné
+        await feed_service.invalidate(*post_docs)
+        return removed
+
+    def _convert_list(self, post_docs: List[dict], include_content: bool) -> List[Union[PostSummary, PostResponse]]:
+        """Valide toute la page en un seul appel (TypeAdapter mis en cache)"""
+        if include_content:
+            items = [
+                {**self._summary_data(post), "content": post["content"], "content_html": stored_html(post)}
+                for post in post_docs
+            ]
+            return type_adapter(List[PostResponse]).validate_python(items)
+        return type_adapter(List[PostSummary]).validate_python([self._summary_data(post) for post in post_docs])
+
+    def _summary_data(self, post_doc: dict) -> Dict[str, Any]:
+        return {
+            "id": str(post_doc["_id"]),
+            "title": post_doc["title"],
+            "slug": post_doc["slug"],
+            # Extrait de l'auteur, sinon celui calculé à l'écriture
+            "excerpt": post_doc.get("excerpt") or post_doc.get("auto_excerpt"),
+            "tags": post_doc.get("tags", []),
+            "is_published": post_doc.get("is_published", False),
+            "author_id": post_doc["author_id"],
+            "author_email": post_doc.get("author_email"),
+            "featured_image": post_doc.get("featured_image"),
+            "word_count": post_doc.get("word_count"),
+            "reading_time": post_doc.get("reading_time"),
+            "created_at": post_doc.get("created_at"),
+            "updated_at": post_doc.get("updated_at")
+        }
+
+    def _convert_to_summary(self, post_doc: dict) -> PostSummary:
+        """Convertit un document MongoDB (projeté sans contenu) en PostSummary"""
+        try:
+            return PostSummary(**self._summary_data(post_doc))
+
+        except Exception as e:
+            logger.error(f"❌ Erreur conversion document: {str(e)}")
+            raise e
+
     def _convert_to_response(self, post_doc: dict) -> PostResponse:
         """Convertit un document MongoDB en PostResponse"""
         try:
-            response_data = {
-                "id": str(post_doc["_id"]),
-                "title": post_doc["title"],
-                "content": post_doc["content"],
-                "slug": post_doc["slug"],
-                "excerpt": post_doc.get("excerpt"),
-                "tags": post_doc.get("tags", []),
-                "is_published": post_doc.get("is_published", False),
-                "author_id": post_doc["author_id"],
-                "author_email": post_doc.get("author_email"),
-                "featured_image": post_doc.get("featured_image"),
-                "created_at": post_doc.get("created_at"),
-                "updated_at": post_doc.get("updated_at")
-            }
+            response_data = self._summary_data(post_doc)
+            response_data["content"] = post_doc["content"]
+            response_data["content_html"] = stored_html(post_doc)
             
             return PostResponse(**response_data)
             
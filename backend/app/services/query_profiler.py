@@ -0,0 +1,227 @@
+import os
+import time
+import random
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+# Commandes internes au driver, sans intérêt pour le profilage
+IGNORED_COMMANDS = {
+    "hello", "ismaster", "isMaster", "ping", "buildinfo", "buildInfo", "endSessions",
+    "saslStart", "saslContinue", "killCursors", "explain", "getLastError",
+}
+
+# Commandes dont on peut demander le plan d'exécution
+EXPLAINABLE_COMMANDS = {"find", "aggregate", "count", "distinct", "update", "delete", "findAndModify"}
+
+
+def redact(value: Any) -> Any:
+    """Forme d'un filtre : conserve les champs et opérateurs, masque les valeurs"""
+    if isinstance(value, dict):
+        return {key: redact(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        # Sous-filtres ($or, $and...) conservés, listes de valeurs ($in...) résumées
+        if value and all(isinstance(item, dict) for item in value):
+            return [redact(item) for item in value]
+        return ["?"] if value else []
+    return "?"
+
+
+def filter_shape(command_name: str, command: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Extrait la forme du filtre d'une commande (valeurs masquées)"""
+    if command_name in ("find", "count", "distinct"):
+        shape = {"filter": redact(command.get("filter", command.get("query", {})))}
+        if command.get("sort"):
+            shape["sort"] = dict(command["sort"])
+        return shape
+    if command_name == "aggregate":
+        stages = []
+        for stage in command.get("pipeline", []):
+            name = next(iter(stage), None)
+            stages.append({name: redact(stage[name])} if name == "$match" else name)
+        return {"pipeline": stages}
+    if command_name == "findAndModify":
+        return {"filter": redact(command.get("query", {}))}
+    if command_name == "update":
+        updates = command.get("updates") or [{}]
+        return {"filter": redact(updates[0].get("q", {})), "count": len(updates)}
+    if command_name == "delete":
+        deletes = command.get("deletes") or [{}]
+        return {"filter": redact(deletes[0].get("q", {})), "count": len(deletes)}
+    return None
+
+
+def find_stages(plan: Any) -> List[str]:
+    """Liste les étapes (stage) d'un plan d'exécution retourné par explain"""
+    stages: List[str] = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(find_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(find_stages(item))
+    return stages
+
+
+class QueryProfiler(monitoring.CommandListener):
+    """Mesure la durée des commandes MongoDB par collection et opération
+
+    Les commandes au-delà du seuil sont journalisées avec la forme de leur filtre
+    (valeurs masquées). Une partie d'entre elles est rejouée avec `explain` pour
+    repérer les plans en COLLSCAN.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("SLOW_QUERY_PROFILER", "true").lower() == "true"
+        self.threshold_ms = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", 100))
+        self.explain_sample_rate = float(os.getenv("SLOW_QUERY_EXPLAIN_SAMPLE_RATE", 0.1))
+
+        self._pending: Dict[Tuple[Any, int], Tuple[str, str, Optional[Dict[str, Any]], Optional[Dict[str, Any]]]] = {}
+        self._stats: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._slow_queries: deque = deque(maxlen=int(os.getenv("SLOW_QUERY_HISTORY", 200)))
+        self._lock = threading.Lock()
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._database = None
+
+    def attach(self, loop: asyncio.AbstractEventLoop, database) -> None:
+        """Donne accès à la boucle et à la base pour lancer les `explain` échantillonnés"""
+        self._loop = loop
+        self._database = database
+
+    # --- Événements pymongo (appelés dans les threads du driver) ---
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        if event.command_name in IGNORED_COMMANDS:
+            return
+
+        command = event.command
+        collection = command.get(event.command_name)
+        if event.command_name == "getMore":
+            collection = command.get("collection")
+        if not isinstance(collection, str):
+            collection = "-"
+
+        shape = filter_shape(event.command_name, command)
+        explainable = None
+        if event.command_name in EXPLAINABLE_COMMANDS:
+            explainable = {
+                key: value for key, value in command.items()
+                if key not in ("$db", "lsid", "$clusterTime", "$readPreference", "txnNumber")
+            }
+
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (
+                collection, event.command_name, shape, explainable
+            )
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._finish(event, failed=False)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._finish(event, failed=True)
+
+    def _finish(self, event, failed: bool) -> None:
+        with self._lock:
+            pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is None:
+            return
+
+        collection, operation, shape, explainable = pending
+        duration_ms = event.duration_micros / 1000
+        slow = duration_ms >= self.threshold_ms
+
+        with self._lock:
+            stats = self._stats.setdefault((collection, operation), {
+                "collection": collection,
+                "operation": operation,
+                "count": 0,
+                "failed": 0,
+                "slow": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+            })
+            stats["count"] += 1
+            stats["total_ms"] += duration_ms
+            stats["max_ms"] = max(stats["max_ms"], duration_ms)
+            if failed:
+                stats["failed"] += 1
+            if slow:
+                stats["slow"] += 1
+
+        if not slow:
+            return
+
+        entry = {
+            "collection": collection,
+            "operation": operation,
+            "duration_ms": round(duration_ms, 2),
+            "shape": shape,
+            "failed": failed,
+            "at": time.time(),
+            "plan": None,
+        }
+        with self._lock:
+            self._slow_queries.append(entry)
+
+        logger.warning(f"🐢 Requête lente {collection}.{operation} ({duration_ms:.1f} ms): {shape}")
+
+        if explainable is not None and not failed and random.random() < self.explain_sample_rate:
+            self._schedule_explain(explainable, entry)
+
+    # --- Explain échantillonné ---
+
+    def _schedule_explain(self, command: Dict[str, Any], entry: Dict[str, Any]) -> None:
+        if self._loop is None or self._database is None or self._loop.is_closed():
+            return
+        asyncio.run_coroutine_threadsafe(self._explain(command, entry), self._loop)
+
+    async def _explain(self, command: Dict[str, Any], entry: Dict[str, Any]) -> None:
+        try:
+            result = await self._database.command({"explain": command, "verbosity": "queryPlanner"})
+            stages = find_stages(result.get("queryPlanner", {}).get("winningPlan", result))
+            entry["plan"] = stages
+            if "COLLSCAN" in stages:
+                logger.warning(f"⚠️ COLLSCAN sur {entry['collection']}.{entry['operation']}: {entry['shape']}")
+        except Exception as e:
+            logger.debug(f"explain impossible: {str(e)}")
+
+    # --- Consultation ---
+
+    def report(self, limit: int = 50) -> Dict[str, Any]:
+        with self._lock:
+            operations = [
+                {
+                    **stats,
+                    "total_ms": round(stats["total_ms"], 2),
+                    "max_ms": round(stats["max_ms"], 2),
+                    "avg_ms": round(stats["total_ms"] / stats["count"], 2) if stats["count"] else 0.0,
+                }
+                for stats in self._stats.values()
+            ]
+            slow_queries = list(self._slow_queries)[-limit:]
+
+        operations.sort(key=lambda item: item["total_ms"], reverse=True)
+        return {
+            "threshold_ms": self.threshold_ms,
+            "explain_sample_rate": self.explain_sample_rate,
+            "operations": operations,
+            "slow_queries": list(reversed(slow_queries)),
+            "collscans": [entry for entry in slow_queries if entry["plan"] and "COLLSCAN" in entry["plan"]],
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self._slow_queries.clear()
+
+# Instance globale
+query_profiler = QueryProfiler()
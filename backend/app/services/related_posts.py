@@ -0,0 +1,338 @@
+import os
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from .database import get_database
+from .pagination import POST_SORT
+from .serialization import type_adapter
+from ..models.post import RelatedPost
+
+logger = logging.getLogger(__name__)
+
+# Un document par post : {"_id": ObjectId, "tags": [...], "related": [entrées], "updated_at": ...}
+RELATED_POSTS_COLLECTION = "related_posts"
+
+# Champs recopiés dans chaque entrée : la route sert la liste sans relire `posts`
+RELATED_FIELDS = {
+    "title": 1, "slug": 1, "excerpt": 1, "tags": 1, "is_published": 1, "author_id": 1,
+    "author_email": 1, "featured_image": 1, "word_count": 1, "reading_time": 1,
+    "created_at": 1, "updated_at": 1,
+}
+# Lecture des candidats : l'extrait automatique remplace un extrait absent
+RELATED_PROJECTION = {**RELATED_FIELDS, "auto_excerpt": 1}
+
+
+def jaccard(tags_a: Iterable[str], tags_b: Iterable[str]) -> float:
+    """Similarité de Jaccard entre deux ensembles de tags"""
+    set_a, set_b = set(tags_a or []), set(tags_b or [])
+    if not set_a or not set_b:
+        return 0.0
+    return len(set_a & set_b) / len(set_a | set_b)
+
+
+class RelatedPostsService:
+    """Posts similaires précalculés (top-K par post)
+
+    Score = Jaccard sur les tags, pondéré par la fraîcheur du post candidat.
+    Une écriture via PostService ne recalcule que la liste du post modifié et
+    fusionne ce post dans les listes des posts qui partagent (ou partageaient)
+    un de ses tags. Ce travail est fait par une tâche de fond qui regroupe les
+    posts modifiés entre deux passes, hors du chemin des requêtes (en ligne si
+    la tâche n'est pas démarrée). La lecture est un `find_one` sur `_id`.
+    """
+
+    def __init__(self):
+        self.top_k = int(os.getenv("RELATED_POSTS_K", 5))
+        # Nombre maximum de candidats examinés par tag commun (les plus récents)
+        self.max_candidates = int(os.getenv("RELATED_POSTS_CANDIDATES", 500))
+        self.recency_weight = float(os.getenv("RELATED_POSTS_RECENCY_WEIGHT", 0.2))
+        self.half_life_days = float(os.getenv("RELATED_POSTS_HALF_LIFE_DAYS", 180))
+        self.background = os.getenv("RELATED_POSTS_BACKGROUND", "true").lower() == "true"
+
+        # Posts à traiter par la tâche de fond (ids regroupés entre deux passes)
+        self._pending: Set[str] = set()
+        self._task: Optional[asyncio.Task] = None
+        # Créés au démarrage, dans la boucle d'événements qui les attend
+        self._wakeup: Optional[asyncio.Event] = None
+        self._idle: Optional[asyncio.Event] = None
+
+    # --- Cycle de vie ---
+
+    async def start(self) -> None:
+        if not self.background or self._task is not None:
+            return
+        self._wakeup = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._task = asyncio.create_task(self._run(), name="related-posts")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Dernière passe pour les écritures pas encore traitées
+        pending, self._pending = self._pending, set()
+        if pending:
+            await self.refresh_posts(pending)
+
+    async def schedule(self, *post_ids: Any) -> None:
+        """Demande la mise à jour des listes touchées par des posts créés, modifiés ou supprimés"""
+        ids = {str(post_id) for post_id in post_ids}
+        if not ids:
+            return
+        if self._task is None:
+            await self.refresh_posts(ids)
+            return
+        self._pending.update(ids)
+        self._idle.clear()
+        self._wakeup.set()
+
+    async def drain(self) -> None:
+        """Attend que la tâche de fond ait traité les posts en attente"""
+        if self._task is not None:
+            await self._idle.wait()
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            batch, self._pending = self._pending, set()
+            try:
+                await self.refresh_posts(batch)
+            except asyncio.CancelledError:
+                self._pending.update(batch)
+                raise
+            except Exception as e:
+                logger.error(f"❌ Erreur tâche posts similaires: {str(e)}")
+            if not self._pending:
+                self._idle.set()
+
+    # --- Score ---
+
+    def score(self, tags: Iterable[str], candidate: Dict[str, Any], now: datetime) -> float:
+        similarity = jaccard(tags, candidate.get("tags"))
+        if similarity == 0:
+            return 0.0
+
+        created_at = candidate.get("created_at") or now
+        age_days = max((now - created_at).total_seconds() / 86400, 0)
+        recency = 0.5 ** (age_days / self.half_life_days) if self.half_life_days > 0 else 0.0
+
+        return round((1 - self.recency_weight) * similarity + self.recency_weight * recency, 6)
+
+    def _entry(self, post: Dict[str, Any], score: float) -> Dict[str, Any]:
+        entry = {field: post.get(field) for field in RELATED_FIELDS}
+        entry["excerpt"] = post.get("excerpt") or post.get("auto_excerpt")
+        entry["id"] = str(post["_id"])
+        entry["score"] = score
+        return entry
+
+    def _top(self, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        entries.sort(key=lambda entry: (entry["score"], entry.get("created_at") or datetime.min), reverse=True)
+        return entries[: self.top_k]
+
+    # --- Calcul ---
+
+    async def _candidates(self, db, tags: List[str], exclude_id: ObjectId) -> List[Dict[str, Any]]:
+        """Posts publiés partageant au moins un tag (index tags_published_created_at_id)"""
+        if not tags:
+            return []
+        cursor = db["posts"].find(
+            {"tags": {"$in": list(tags)}, "is_published": True, "_id": {"$ne": exclude_id}},
+            projection=RELATED_PROJECTION
+        ).sort(POST_SORT).limit(self.max_candidates)
+        return await cursor.to_list(length=self.max_candidates)
+
+    async def _compute(self, db, post_id: ObjectId, tags: List[str], now: datetime) -> List[Dict[str, Any]]:
+        candidates = await self._candidates(db, tags, post_id)
+        return self._top([
+            self._entry(candidate, self.score(tags, candidate, now))
+            for candidate in candidates
+        ])
+
+    async def refresh_post(self, post: Dict[str, Any]) -> None:
+        """Recalcule la liste d'un post créé ou modifié et le fusionne chez ses voisins
+
+        Une erreur est journalisée sans faire échouer l'écriture du post ;
+        `rebuild` recalcule l'ensemble.
+        """
+        try:
+            db = await get_database()
+            related_collection = db[RELATED_POSTS_COLLECTION]
+            now = datetime.now()
+            post_id = post["_id"]
+            tags = list(set(post.get("tags") or []))
+
+            # 1. Liste du post lui-même
+            candidates = await self._candidates(db, tags, post_id)
+            own = self._top([self._entry(candidate, self.score(tags, candidate, now)) for candidate in candidates])
+            requests = [UpdateOne(
+                {"_id": post_id},
+                {"$set": {"tags": tags, "related": own, "updated_at": now}},
+                upsert=True
+            )]
+
+            # 2. Voisins : posts partageant un tag, ou dont la liste contient déjà ce post
+            neighbor_ids = {candidate["_id"] for candidate in candidates}
+            cursor = related_collection.find(
+                {"$or": [{"_id": {"$in": list(neighbor_ids)}}, {"related.id": str(post_id)}]},
+                projection={"tags": 1, "related": 1}
+            )
+            entry = self._entry(post, 0.0)
+            async for neighbor in cursor:
+                if neighbor["_id"] == post_id:
+                    continue
+                previous = neighbor.get("related", [])
+                related = [item for item in previous if item["id"] != entry["id"]]
+
+                score = self.score(neighbor.get("tags"), post, now) if post.get("is_published") else 0.0
+                if score > 0:
+                    related.append({**entry, "score": score})
+                related = self._top(related)
+
+                # Le post sort d'une liste pleine : la place libérée exige un recalcul complet
+                if len(related) < len(previous) and len(previous) >= self.top_k:
+                    related = await self._compute(db, neighbor["_id"], neighbor.get("tags") or [], now)
+
+                if related != previous:
+                    requests.append(UpdateOne(
+                        {"_id": neighbor["_id"]},
+                        {"$set": {"related": related, "updated_at": now}}
+                    ))
+
+            await related_collection.bulk_write(requests, ordered=False)
+            logger.debug(f"🔗 Posts similaires mis à jour pour {post_id}: {len(requests)} liste(s)")
+
+        except Exception as e:
+            logger.error(f"❌ Erreur mise à jour posts similaires: {str(e)}")
+
+    async def refresh_posts(self, post_ids: Iterable[str]) -> None:
+        """Variante pour un lot : relit les posts en une requête puis les traite un à un"""
+        object_ids = [ObjectId(post_id) for post_id in set(post_ids)]
+        if not object_ids:
+            return
+
+        try:
+            db = await get_database()
+            found = set()
+            async for post in db["posts"].find({"_id": {"$in": object_ids}}, projection=RELATED_PROJECTION):
+                found.add(post["_id"])
+                await self.refresh_post(post)
+            for post_id in object_ids:
+                if post_id not in found:
+                    await self.remove_post(str(post_id))
+
+        except Exception as e:
+            logger.error(f"❌ Erreur mise à jour posts similaires (lot): {str(e)}")
+
+    async def remove_post(self, post_id: str) -> None:
+        """Retire un post supprimé : sa liste et ses apparitions chez les voisins"""
+        try:
+            db = await get_database()
+            related_collection = db[RELATED_POSTS_COLLECTION]
+            now = datetime.now()
+
+            await related_collection.delete_one({"_id": ObjectId(post_id)})
+
+            requests = []
+            async for neighbor in related_collection.find({"related.id": post_id}, projection={"tags": 1, "related": 1}):
+                related = [item for item in neighbor.get("related", []) if item["id"] != post_id]
+                if len(neighbor.get("related", [])) >= self.top_k:
+                    related = await self._compute(db, neighbor["_id"], neighbor.get("tags") or [], now)
+                requests.append(UpdateOne(
+                    {"_id": neighbor["_id"]},
+                    {"$set": {"related": related, "updated_at": now}}
+                ))
+            if requests:
+                await related_collection.bulk_write(requests, ordered=False)
+
+        except Exception as e:
+            logger.error(f"❌ Erreur suppression posts similaires: {str(e)}")
+
+    # --- Lecture ---
+
+    async def get_related(
+        self,
+        post_id: str,
+        limit: Optional[int] = None,
+        viewer_id: Optional[str] = None
+    ) -> Optional[List[RelatedPost]]:
+        """Posts similaires d'un post (None si le post n'existe pas ou est un brouillon d'un autre auteur)
+
+        Deux lectures indexées sur `_id` ; la liste d'un post publié antérieur à la
+        fonctionnalité est calculée et enregistrée au premier accès.
+        """
+        if not ObjectId.is_valid(post_id):
+            return None
+
+        db = await get_database()
+        related_collection = db[RELATED_POSTS_COLLECTION]
+
+        post = await db["posts"].find_one(
+            {"_id": ObjectId(post_id)},
+            projection={"tags": 1, "is_published": 1, "author_id": 1}
+        )
+        if post is None:
+            return None
+        if not post.get("is_published") and (viewer_id is None or viewer_id != post.get("author_id")):
+            return None
+
+        document = await related_collection.find_one({"_id": post["_id"]}, projection={"related": 1})
+        if document is None:
+            now = datetime.now()
+            tags = list(set(post.get("tags") or []))
+            related = await self._compute(db, post["_id"], tags, now)
+            # Un brouillon garde sa liste calculée à la volée : rien n'est écrit pour lui ici
+            if post.get("is_published"):
+                await related_collection.update_one(
+                    {"_id": post["_id"]},
+                    {"$set": {"tags": tags, "related": related, "updated_at": now}},
+                    upsert=True
+                )
+            document = {"related": related}
+
+        related = document.get("related", [])
+        return type_adapter(List[RelatedPost]).validate_python(related[:limit] if limit else related)
+
+    # --- Maintenance ---
+
+    async def rebuild(self) -> Dict[str, int]:
+        """Recalcule toutes les listes (scores de fraîcheur à jour) et purge les orphelines"""
+        db = await get_database()
+        related_collection = db[RELATED_POSTS_COLLECTION]
+        now = datetime.now()
+
+        count = 0
+        requests = []
+        async for post in db["posts"].find({}, projection={"tags": 1}):
+            tags = list(set(post.get("tags") or []))
+            related = await self._compute(db, post["_id"], tags, now)
+            count += 1
+            requests.append(UpdateOne(
+                {"_id": post["_id"]},
+                {"$set": {"tags": tags, "related": related, "updated_at": now}},
+                upsert=True
+            ))
+            if len(requests) >= 500:
+                await related_collection.bulk_write(requests, ordered=False)
+                requests = []
+        if requests:
+            await related_collection.bulk_write(requests, ordered=False)
+
+        # Toute liste encore valide vient d'être réécrite : les plus anciennes sont orphelines
+        removed = await related_collection.delete_many({"updated_at": {"$lt": now}})
+
+        logger.info(f"✅ Posts similaires recalculés: {count} post(s), {removed.deleted_count} orpheline(s)")
+        return {"posts": count, "removed": removed.deleted_count}
+
+# Instance globale
+related_posts_service = RelatedPostsService()
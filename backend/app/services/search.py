@@ -0,0 +1,117 @@
+import re
+import html
+import unicodedata
+from typing import Any, Dict, List, Optional
+
+# Balises retirées du rendu `content_html` : les extraits sont pris dans le texte affiché,
+# pas dans la source Markdown (`content`)
+_TAG_RE = re.compile(r"<[^>]+>")
+_SPACE_RE = re.compile(r"\s+")
+# Termes d'une requête $text : mots, en ignorant les exclusions (-mot) et les guillemets
+_TERM_RE = re.compile(r'(?<![\w-])-?"[^"]*"|(?<![\w-])-?[^\s"]+')
+
+HIGHLIGHT_OPEN = "<mark>"
+HIGHLIGHT_CLOSE = "</mark>"
+# Préfixe minimal retenu pour surligner les formes fléchies (« publier » -> « publié »)
+STEM_PREFIX = 5
+
+# Poids des champs de l'index texte `posts_text`, repris par la recherche de secours
+SEARCH_WEIGHTS = {"title": 10, "tags": 5, "excerpt": 3, "content": 1}
+
+
+def strip_html(text: str) -> str:
+    """Texte brut d'un contenu HTML (balises retirées, entités décodées, espaces normalisés)"""
+    return _SPACE_RE.sub(" ", html.unescape(_TAG_RE.sub(" ", text or ""))).strip()
+
+
+def fold(text: str) -> str:
+    """Minuscules sans accents, caractère par caractère (même longueur que `text`)"""
+    return "".join(unicodedata.normalize("NFD", char)[0].lower()[:1] for char in text)
+
+
+def query_terms(query: str) -> List[str]:
+    """Termes positifs d'une requête $text (phrases découpées, exclusions ignorées)"""
+    terms: List[str] = []
+    for token in _TERM_RE.findall(query):
+        if token.startswith("-"):
+            continue
+        for word in re.findall(r"\w+", fold(token.strip('"'))):
+            word = word[:STEM_PREFIX] if len(word) > STEM_PREFIX else word
+            if len(word) > 1 and word not in terms:
+                terms.append(word)
+    return terms
+
+
+def regex_filter(terms: List[str]) -> Dict[str, Any]:
+    """Filtre Mongo de secours sans index texte : un des termes en début de mot dans un champ indexé
+
+    Insensible à la casse mais pas aux accents (contrairement à $text).
+    """
+    if not terms:
+        # Requête sans terme exploitable (uniquement des exclusions) : aucun résultat
+        return {"_id": {"$exists": False}}
+    pattern = r"\b(?:" + "|".join(re.escape(term) for term in terms) + ")"
+    return {"$or": [{field: {"$regex": pattern, "$options": "i"}} for field in SEARCH_WEIGHTS]}
+
+
+def regex_score(post: Dict[str, Any], terms: List[str]) -> float:
+    """Pertinence approchée : pour chaque terme, somme des poids des champs qui le contiennent"""
+    score = 0
+    for field, weight in SEARCH_WEIGHTS.items():
+        value = post.get(field) or ""
+        text = fold(" ".join(value) if isinstance(value, list) else str(value))
+        score += weight * sum(1 for term in terms if re.search(rf"\b{re.escape(term)}", text))
+    return float(score)
+
+
+def _term_pattern(terms: List[str]) -> Optional["re.Pattern[str]"]:
+    if not terms:
+        return None
+    alternatives = "|".join(re.escape(term) for term in sorted(terms, key=len, reverse=True))
+    # Mot commençant par un des termes, surligné jusqu'à la fin du mot
+    return re.compile(rf"\b(?:{alternatives})\w*")
+
+
+def highlight(text: str, terms: List[str]) -> str:
+    """Échappe `text` et entoure de <mark> les mots correspondant aux termes"""
+    pattern = _term_pattern(terms)
+    if pattern is None:
+        return html.escape(text)
+
+    folded = fold(text)
+    parts: List[str] = []
+    position = 0
+    for match in pattern.finditer(folded):
+        parts.append(html.escape(text[position:match.start()]))
+        parts.append(HIGHLIGHT_OPEN + html.escape(text[match.start():match.end()]) + HIGHLIGHT_CLOSE)
+        position = match.end()
+    parts.append(html.escape(text[position:]))
+    return "".join(parts)
+
+
+def snippet(text: str, terms: List[str], width: int = 160) -> Optional[str]:
+    """Extrait d'environ `width` caractères centré sur la première occurrence, surligné
+
+    Retourne None si aucun terme n'apparaît dans le texte.
+    """
+    pattern = _term_pattern(terms)
+    if not text or pattern is None:
+        return None
+
+    match = pattern.search(fold(text))
+    if match is None:
+        return None
+
+    start = max(0, match.start() - width // 3)
+    end = min(len(text), start + width)
+    # Couper sur des limites de mots
+    if start > 0:
+        space = text.find(" ", start)
+        start = space + 1 if 0 <= space < match.start() else start
+    if end < len(text):
+        space = text.rfind(" ", match.end(), end)
+        end = space if space > 0 else end
+
+    prefix = "… " if start > 0 else ""
+    suffix = " …" if end < len(text) else ""
+    return prefix + highlight(text[start:end], terms) + suffix
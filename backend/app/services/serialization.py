@@ -0,0 +1,31 @@
+from functools import lru_cache
+from typing import Any, Optional
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+
+
+@lru_cache(maxsize=None)
+def type_adapter(annotation: Any) -> TypeAdapter:
+    """TypeAdapter construit une seule fois par type (la compilation du schéma est coûteuse)"""
+    return TypeAdapter(annotation)
+
+
+class ModelJSONResponse(JSONResponse):
+    """Réponse JSON sérialisée directement par pydantic-core
+
+    Retourner cette réponse depuis une route court-circuite `response_model`
+    (conservé pour la documentation OpenAPI) : pas de seconde validation, pas de
+    `jsonable_encoder` ni de `json.dumps`. Le contenu doit donc déjà être du type
+    `annotation` (modèles validés par le service).
+    """
+
+    def __init__(self, content: Any, annotation: Optional[Any] = None, **kwargs):
+        self.annotation = annotation
+        super().__init__(content, **kwargs)
+
+    def render(self, content: Any) -> bytes:
+        if self.annotation is None:
+            return to_json(content)
+        return type_adapter(self.annotation).dump_json(content)
@@ -0,0 +1,177 @@
+import os
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import UpdateOne, DeleteOne
+
+from .database import get_database
+from .cache import TTLCache, MISSING
+from .singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Un document par tag : {"_id": <tag>, "total": n, "published": n, "updated_at": ...}
+TAG_STATS_COLLECTION = "tag_stats"
+
+TagDeltas = Dict[str, Dict[str, int]]
+
+
+def tag_deltas(before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]) -> TagDeltas:
+    """Variations des compteurs par tag entre deux versions d'un post
+
+    `before` vaut None pour une création, `after` vaut None pour une suppression.
+    Seuls les champs `tags` et `is_published` sont lus.
+    """
+    deltas: TagDeltas = defaultdict(lambda: {"total": 0, "published": 0})
+
+    for doc, sign in ((before, -1), (after, 1)):
+        if not doc:
+            continue
+        published = bool(doc.get("is_published", False))
+        for tag in set(doc.get("tags") or []):
+            deltas[tag]["total"] += sign
+            if published:
+                deltas[tag]["published"] += sign
+
+    return {
+        tag: counts for tag, counts in deltas.items()
+        if counts["total"] or counts["published"]
+    }
+
+
+def merge_deltas(target: TagDeltas, deltas: TagDeltas) -> TagDeltas:
+    """Cumule `deltas` dans `target` (plusieurs changements appliqués en une écriture)"""
+    for tag, counts in deltas.items():
+        current = target.setdefault(tag, {"total": 0, "published": 0})
+        current["total"] += counts["total"]
+        current["published"] += counts["published"]
+    return target
+
+
+class TagStatsService:
+    """Compteurs de posts par tag, maintenus incrémentalement
+
+    Chaque écriture de post applique un `$inc` sur les tags ajoutés ou retirés
+    et sur les changements de statut de publication. La lecture (`GET /posts/tags`)
+    est servie depuis un instantané mémoire de courte durée ; `rebuild` recalcule
+    les compteurs depuis `posts` pour corriger une éventuelle dérive.
+    """
+
+    def __init__(self):
+        self.snapshot_ttl = float(os.getenv("TAG_STATS_SNAPSHOT_TTL", 30))
+        self._snapshot = TTLCache(maxsize=1, ttl=self.snapshot_ttl)
+        self._flights = SingleFlight()
+
+    async def record_change(self, before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]) -> None:
+        """Répercute le passage d'un post de `before` à `after` sur les compteurs"""
+        await self.apply(tag_deltas(before, after))
+
+    async def apply(self, deltas: TagDeltas) -> None:
+        """Applique des variations en un seul bulk_write
+
+        Une erreur ici ne fait pas échouer l'écriture du post : elle est journalisée
+        et la dérive est corrigée par `rebuild`.
+        """
+        if not deltas:
+            return
+
+        try:
+            db = await get_database()
+            stats_collection = db[TAG_STATS_COLLECTION]
+            now = datetime.now()
+
+            requests = [
+                UpdateOne(
+                    {"_id": tag},
+                    {"$inc": counts, "$set": {"updated_at": now}},
+                    upsert=True
+                )
+                for tag, counts in deltas.items()
+            ]
+            await stats_collection.bulk_write(requests, ordered=False)
+
+            # Les tags qui ne portent plus aucun post disparaissent du nuage
+            decremented = [tag for tag, counts in deltas.items() if counts["total"] < 0]
+            if decremented:
+                await stats_collection.delete_many({"_id": {"$in": decremented}, "total": {"$lte": 0}})
+
+            self.invalidate_snapshot()
+
+        except Exception as e:
+            logger.error(f"❌ Erreur mise à jour statistiques tags: {str(e)}")
+
+    def invalidate_snapshot(self) -> None:
+        """Force le rechargement de l'instantané à la prochaine lecture"""
+        self._snapshot.clear()
+
+    async def get_stats(self) -> List[Dict[str, Any]]:
+        """Compteurs de tous les tags (instantané mémoire de `TAG_STATS_SNAPSHOT_TTL` secondes)"""
+        stats = self._snapshot.get("tags", MISSING)
+        if stats is not MISSING:
+            return stats
+
+        # Un seul chargement même si l'instantané expire sous forte charge
+        return await self._flights.do("tags", self._load_snapshot)
+
+    async def _load_snapshot(self) -> List[Dict[str, Any]]:
+        db = await get_database()
+        stats_collection = db[TAG_STATS_COLLECTION]
+
+        cursor = stats_collection.find({}, projection={"total": 1, "published": 1})
+        stats = [
+            {"tag": doc["_id"], "total": doc.get("total", 0), "published": doc.get("published", 0)}
+            async for doc in cursor
+        ]
+        stats.sort(key=lambda item: (-item["published"], -item["total"], item["tag"]))
+
+        self._snapshot.set("tags", stats)
+        return stats
+
+    async def rebuild(self) -> Dict[str, int]:
+        """Recalcule les compteurs depuis `posts` et corrige les écarts"""
+        db = await get_database()
+        posts_collection = db["posts"]
+        stats_collection = db[TAG_STATS_COLLECTION]
+
+        pipeline = [
+            {"$project": {"tags": {"$setUnion": [{"$ifNull": ["$tags", []]}, []]}, "is_published": 1}},
+            {"$unwind": "$tags"},
+            {"$group": {
+                "_id": "$tags",
+                "total": {"$sum": 1},
+                "published": {"$sum": {"$cond": [{"$eq": ["$is_published", True]}, 1, 0]}},
+            }},
+        ]
+        expected: Dict[str, Tuple[int, int]] = {}
+        async for doc in posts_collection.aggregate(pipeline):
+            expected[doc["_id"]] = (doc["total"], doc["published"])
+
+        current: Dict[str, Tuple[int, int]] = {}
+        async for doc in stats_collection.find({}, projection={"total": 1, "published": 1}):
+            current[doc["_id"]] = (doc.get("total", 0), doc.get("published", 0))
+
+        now = datetime.now()
+        requests: List[Any] = [
+            UpdateOne(
+                {"_id": tag},
+                {"$set": {"total": total, "published": published, "updated_at": now}},
+                upsert=True
+            )
+            for tag, (total, published) in expected.items()
+            if current.get(tag) != (total, published)
+        ]
+        corrected = len(requests)
+        stale = [tag for tag in current if tag not in expected]
+        requests.extend(DeleteOne({"_id": tag}) for tag in stale)
+
+        if requests:
+            await stats_collection.bulk_write(requests, ordered=False)
+        self.invalidate_snapshot()
+
+        logger.info(f"✅ Statistiques tags reconstruites: {len(expected)} tag(s), {corrected} corrigé(s), {len(stale)} supprimé(s)")
+        return {"tags": len(expected), "corrected": corrected, "removed": len(stale)}
+
+# Instance globale
+tag_stats_service = TagStatsService()
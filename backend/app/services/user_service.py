@@ -1,12 +1,27 @@
-from typing import Optional, List
+from typing import Optional, List, Dict, Any, AsyncIterator
 from ..services.database import get_database
-from ..models.user import UserCreate, UserUpdate, UserResponse
+from ..services.export import export_cursor
+from ..models.user import UserCreate, UserProfileUpdate, UserResponse
 from bson import ObjectId
+from pymongo import ReturnDocument
 from datetime import datetime
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Champs nécessaires à la résolution d'identité
+IDENTITY_PROJECTION = {
+    "_id": 0,
+    "clerk_id": 1,
+    "email": 1,
+    "username": 1,
+    "first_name": 1,
+    "last_name": 1,
+    "profile_image": 1,
+    "role": 1,
+    "is_active": 1,
+}
+
 class UserService:
     """Service de gestion des utilisateurs - Version simplifiée"""
     
@@ -22,14 +37,12 @@ class UserService:
             user_dict["updated_at"] = datetime.now()
             user_dict["is_active"] = True
             
-            # Insérer en base
+            # Insérer en base : le document inséré est déjà complet
             result = await users_collection.insert_one(user_dict)
+            user_dict["_id"] = result.inserted_id
             
-            # Récupérer l'utilisateur créé
-            created_user = await users_collection.find_one({"_id": result.inserted_id})
-            
-            logger.info(f"✅ Utilisateur créé: {created_user.get('email')}")
-            return self._convert_to_response(created_user)
+            logger.info(f"✅ Utilisateur créé: {user_dict.get('email')}")
+            return self._convert_to_response(user_dict)
             
         except Exception as e:
             logger.error(f"❌ Erreur création utilisateur: {str(e)}")
@@ -51,6 +64,50 @@ class UserService:
             logger.error(f"❌ Erreur récupération utilisateur par clerk_id: {str(e)}")
             return None
     
+    async def get_identity_by_clerk_id(self, clerk_id: str) -> Optional[Dict[str, Any]]:
+        """Récupère les infos d'authentification (email, rôle, statut) depuis la collection locale"""
+        try:
+            db = await get_database()
+            users_collection = db["users"]
+
+            user = await users_collection.find_one(
+                {"clerk_id": clerk_id},
+                projection=IDENTITY_PROJECTION
+            )
+
+            if user:
+                return {
+                    "clerk_id": user["clerk_id"],
+                    "email": user.get("email"),
+                    "username": user.get("username"),
+                    "first_name": user.get("first_name"),
+                    "last_name": user.get("last_name"),
+                    "profile_image": user.get("profile_image"),
+                    "role": user.get("role", "user"),
+                    "is_active": user.get("is_active", True)
+                }
+            return None
+
+        except Exception as e:
+            logger.error(f"❌ Erreur récupération identité: {str(e)}")
+            return None
+
+    async def mirror_identity(self, user_info: Dict[str, Any]) -> None:
+        """Enregistre localement un utilisateur résolu via l'API Clerk (sans écraser l'existant)"""
+        try:
+            db = await get_database()
+            users_collection = db["users"]
+
+            now = datetime.now()
+            await users_collection.update_one(
+                {"clerk_id": user_info["clerk_id"]},
+                {"$setOnInsert": {**user_info, "created_at": now, "updated_at": now}},
+                upsert=True
+            )
+
+        except Exception as e:
+            logger.error(f"❌ Erreur synchronisation identité: {str(e)}")
+
     async def get_user_by_id(self, user_id: str) -> Optional[UserResponse]:
         """Récupère un utilisateur par son ID MongoDB"""
         try:
@@ -70,8 +127,8 @@ class UserService:
             logger.error(f"❌ Erreur récupération utilisateur par ID: {str(e)}")
             return None
     
-    async def update_user(self, clerk_id: str, user_update: UserUpdate) -> Optional[UserResponse]:
-        """Met à jour un utilisateur par clerk_id"""
+    async def update_user(self, clerk_id: str, user_update: UserProfileUpdate) -> Optional[UserResponse]:
+        """Met à jour un utilisateur par clerk_id (rôle et statut seulement via `UserUpdate`, réservé aux admins)"""
         try:
             db = await get_database()
             users_collection = db["users"]
@@ -80,15 +137,14 @@ class UserService:
             update_data = {k: v for k, v in user_update.model_dump().items() if v is not None}
             update_data["updated_at"] = datetime.now()
             
-            # Mettre à jour
-            result = await users_collection.update_one(
+            # Mettre à jour et récupérer la nouvelle version en un seul aller-retour
+            updated_user = await users_collection.find_one_and_update(
                 {"clerk_id": clerk_id},
-                {"$set": update_data}
+                {"$set": update_data},
+                return_document=ReturnDocument.AFTER
             )
             
-            if result.modified_count > 0:
-                # Récupérer l'utilisateur mis à jour
-                updated_user = await users_collection.find_one({"clerk_id": clerk_id})
+            if updated_user:
                 return self._convert_to_response(updated_user)
             
             return None
@@ -126,13 +182,27 @@ class UserService:
             
             result = [self._convert_to_response(user) for user in users]
             
-            logger.info(f"✅ {len(result)} utilisateurs récupérés")
+            logger.debug(f"✅ {len(result)} utilisateurs récupérés")
             return result
             
         except Exception as e:
             logger.error(f"❌ Erreur récupération utilisateurs: {str(e)}")
             return []
     
+    async def export_users(
+        self,
+        after: Optional[ObjectId] = None,
+        is_active: Optional[bool] = None
+    ) -> AsyncIterator[UserResponse]:
+        """Parcourt tous les utilisateurs par `_id` croissant, au fil du curseur"""
+        db = await get_database()
+        filter_dict: Dict[str, Any] = {}
+        if is_active is not None:
+            filter_dict["is_active"] = is_active
+
+        async for user in export_cursor(db["users"], filter_dict, after):
+            yield self._convert_to_response(user)
+
     def _convert_to_response(self, user_doc: dict) -> UserResponse:
         """Convertit un document MongoDB en UserResponse"""
         try:
@@ -0,0 +1,124 @@
+"""Benchmark : débit d'une route selon la configuration de logging
+
+Compare l'ancienne configuration (handler synchrone, plusieurs INFO par requête)
+au sous-système actuel (file + thread d'écriture, bavardage en DEBUG, log d'accès
+échantillonné). Les logs sont écrits dans un fichier temporaire.
+
+Usage (depuis backend/) :
+    python -m benchmarks.bench_logging --requests 5000 --concurrency 50 [--sink-latency-us 200]
+"""
+import os
+import sys
+import time
+import asyncio
+import logging
+import argparse
+import tempfile
+
+os.environ.setdefault("MONGODB_URL", "mongodb://localhost:27017")
+
+import httpx
+from fastapi import FastAPI
+
+from app.config import logging_config
+from app.middleware.access_log import AccessLogMiddleware
+
+
+class SlowFileHandler(logging.FileHandler):
+    """FileHandler avec latence d'écriture simulée (pipe ou disque saturé)"""
+
+    latency = 0.0
+
+    def emit(self, record):
+        super().emit(record)
+        if self.latency:
+            time.sleep(self.latency)
+
+
+def build_app(chatter_level: int, with_access_log: bool) -> FastAPI:
+    app = FastAPI()
+    logger = logging.getLogger("bench.route")
+    access = logging.getLogger("bench.access")
+
+    @app.get("/posts/{post_id}")
+    async def get_post(post_id: str):
+        # Reproduit les logs par appel (get_database, auth, route)
+        logger.log(chatter_level, f"🔍 Debug - database is None: False")
+        logger.log(chatter_level, f"🔐 Validation token: test_token...")
+        logger.log(chatter_level, f"🔍 Récupération post ID: {post_id}")
+        logger.log(chatter_level, f"✅ Post récupéré: {post_id}")
+        if not with_access_log:
+            # Équivalent de uvicorn.access : une ligne INFO synchrone par requête
+            access.info(f'127.0.0.1 - "GET /posts/{post_id} HTTP/1.1" 200')
+        return {"id": post_id}
+
+    if with_access_log:
+        app.add_middleware(AccessLogMiddleware)
+    return app
+
+
+def configure_legacy(log_file: str) -> None:
+    root = logging.getLogger()
+    root.handlers = []
+    handler = SlowFileHandler(log_file, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+    root.addHandler(handler)
+    root.setLevel(logging.INFO)
+
+
+def configure_current(log_file: str) -> None:
+    os.environ["LOG_FILE"] = log_file
+    os.environ["LOG_LEVEL"] = "INFO"
+    logging_config.setup_logging()
+    # Même sink que la configuration historique, sans sortie console pendant la mesure
+    handlers = []
+    for handler in logging_config._listener.handlers:
+        if isinstance(handler, logging.FileHandler):
+            slow = SlowFileHandler(log_file, encoding="utf-8")
+            slow.setFormatter(handler.formatter)
+            handlers.append(slow)
+    logging_config._listener.handlers = tuple(handlers)
+
+
+async def run(app: FastAPI, total: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        queue: "asyncio.Queue[int]" = asyncio.Queue()
+        for i in range(total):
+            queue.put_nowait(i)
+
+        async def worker():
+            while not queue.empty():
+                i = queue.get_nowait()
+                await client.get(f"/posts/{i}")
+
+        start = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        return total / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--sink-latency-us", type=float, default=0, help="Latence simulée par écriture de log")
+    args = parser.parse_args()
+    SlowFileHandler.latency = args.sink_latency_us / 1_000_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        configure_legacy(os.path.join(tmp, "legacy.log"))
+        legacy_app = build_app(logging.INFO, with_access_log=False)
+        legacy = asyncio.run(run(legacy_app, args.requests, args.concurrency))
+
+        configure_current(os.path.join(tmp, "current.log"))
+        current_app = build_app(logging.DEBUG, with_access_log=True)
+        current = asyncio.run(run(current_app, args.requests, args.concurrency))
+        logging_config.shutdown_logging()
+
+    print(f"legacy  (sync handler, INFO chatter)      : {legacy:8.0f} req/s")
+    print(f"current (queue handler, sampled access)   : {current:8.0f} req/s")
+    print(f"gain                                      : {current / legacy:8.2f}x")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
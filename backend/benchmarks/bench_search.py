@@ -0,0 +1,174 @@
+"""Benchmark : recherche plein texte sur un corpus de 100k posts
+
+Compare `PostService.search_posts` (index texte `posts_text`) au contournement
+actuel des lecteurs : un filtre `$regex` insensible à la casse sur titre, extrait
+et contenu, qui parcourt toute la collection.
+
+Nécessite un serveur MongoDB (MONGODB_URL). Le corpus est écrit dans une base
+dédiée (`--database`, par défaut blog_bench), réutilisée si elle est déjà remplie.
+
+Usage (depuis backend/) :
+    python -m benchmarks.bench_search --posts 100000 --queries 200 [--concurrency 10] [--drop]
+"""
+import os
+import re
+import sys
+import time
+import random
+import asyncio
+import argparse
+import statistics
+from datetime import datetime, timedelta
+
+from pymongo.errors import ServerSelectionTimeoutError
+
+os.environ.setdefault("MONGODB_URL", "mongodb://localhost:27017")
+os.environ.setdefault("SLOW_QUERY_PROFILER", "false")
+
+from app.services.database import db_service
+from app.services.indexes import ensure_indexes
+from app.services.post_service import post_service
+
+WORDS = (
+    "python fastapi mongodb index requête cache performance latence déploiement docker "
+    "kubernetes sécurité authentification jeton pagination curseur recherche texte "
+    "architecture microservice asynchrone événement file message journalisation métrique "
+    "tableau graphique frontend react composant état rendu serveur client réseau http "
+    "compression brotli gzip flux exportation sauvegarde restauration migration schéma"
+).split()
+TAGS = ["tech", "python", "devops", "frontend", "data", "sécurité", "carrière", "tutoriel"]
+
+
+def make_post(i: int, base: datetime) -> dict:
+    rng = random.Random(i)
+    title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 7))).capitalize()
+    paragraphs = [
+        "<p>" + " ".join(rng.choice(WORDS) for _ in range(rng.randint(40, 90))) + ".</p>"
+        for _ in range(rng.randint(3, 8))
+    ]
+    return {
+        "title": f"{title} #{i}",
+        "slug": f"bench-{i}",
+        "excerpt": " ".join(rng.choice(WORDS) for _ in range(20)),
+        "content": "\n".join(paragraphs),
+        "tags": rng.sample(TAGS, rng.randint(1, 3)),
+        "is_published": rng.random() < 0.9,
+        "author_id": f"user_{rng.randint(1, 200)}",
+        "author_email": None,
+        "featured_image": None,
+        "created_at": base + timedelta(minutes=i),
+        "updated_at": base + timedelta(minutes=i),
+    }
+
+
+async def seed(database, total: int) -> None:
+    posts_collection = database["posts"]
+    existing = await posts_collection.estimated_document_count()
+    if existing >= total:
+        print(f"corpus existant : {existing} posts")
+        return
+
+    base = datetime(2020, 1, 1)
+    batch = []
+    start = time.perf_counter()
+    for i in range(existing, total):
+        batch.append(make_post(i, base))
+        if len(batch) == 2000:
+            await posts_collection.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        await posts_collection.insert_many(batch, ordered=False)
+    print(f"corpus inséré : {total - existing} posts en {time.perf_counter() - start:.1f} s")
+
+
+async def regex_search(database, query: str, limit: int) -> list:
+    """Contournement sans index : regex sur chaque terme, puis tri par date"""
+    clauses = []
+    for term in query.split():
+        pattern = re.compile(re.escape(term), re.IGNORECASE)
+        clauses.append({"$or": [{"title": pattern}, {"excerpt": pattern}, {"content": pattern}]})
+    cursor = database["posts"].find(
+        {"is_published": True, "$and": clauses},
+        projection={"content": 0}
+    ).sort([("created_at", -1), ("_id", -1)]).limit(limit)
+    return await cursor.to_list(length=limit)
+
+
+async def measure(name: str, fn, queries: list, concurrency: int) -> None:
+    durations = []
+    queue: "asyncio.Queue[str]" = asyncio.Queue()
+    for query in queries:
+        queue.put_nowait(query)
+
+    async def worker():
+        while not queue.empty():
+            query = queue.get_nowait()
+            start = time.perf_counter()
+            await fn(query)
+            durations.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+
+    durations.sort()
+    p95 = durations[int(len(durations) * 0.95) - 1] if len(durations) >= 20 else durations[-1]
+    print(
+        f"{name:<28} p50 {statistics.median(durations):8.1f} ms   p95 {p95:8.1f} ms   "
+        f"{len(queries) / elapsed:8.1f} req/s"
+    )
+
+
+async def run(args: argparse.Namespace) -> int:
+    db_service.database_name = args.database
+    try:
+        await db_service.connect()
+    except ServerSelectionTimeoutError:
+        # Aucun résultat plutôt qu'une trace : ce benchmark n'a de sens que sur un vrai serveur
+        print(f"MongoDB injoignable ({db_service.mongodb_url}) : benchmark non exécuté", file=sys.stderr)
+        return 1
+    database = db_service.database
+    try:
+        if args.drop:
+            await database["posts"].drop()
+        await seed(database, args.posts)
+        await ensure_indexes(database)
+
+        rng = random.Random(42)
+        queries = [" ".join(rng.sample(WORDS, rng.randint(1, 3))) for _ in range(args.queries)]
+
+        # Préchauffage (cache WiredTiger, chargement de l'index)
+        for query in queries[:10]:
+            await post_service.search_posts(query, limit=args.limit)
+
+        await measure(
+            "index texte (search_posts)",
+            lambda query: post_service.search_posts(query, limit=args.limit),
+            queries, args.concurrency
+        )
+        await measure(
+            "regex sans index",
+            lambda query: regex_search(database, query, args.limit),
+            queries[: args.regex_queries], args.concurrency
+        )
+    finally:
+        await db_service.disconnect()
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--posts", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--regex-queries", type=int, default=20, help="Le parcours complet est lent : moins d'itérations")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--database", default="blog_bench")
+    parser.add_argument("--drop", action="store_true", help="Recrée le corpus")
+    args = parser.parse_args()
+
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
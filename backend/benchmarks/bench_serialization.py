@@ -0,0 +1,110 @@
+"""Benchmark : sérialisation d'une page de posts (document Mongo -> octets JSON)
+
+Compare le chemin précédent (un PostSummary construit par document, puis
+revalidation par `response_model`, `jsonable_encoder` et `json.dumps` dans
+FastAPI) au chemin actuel (validation de la page par un TypeAdapter mis en
+cache, puis `ModelJSONResponse` sérialisée par pydantic-core).
+
+Aucune base n'est nécessaire : les documents sont générés en mémoire.
+
+Usage (depuis backend/) :
+    python -m benchmarks.bench_serialization --posts 100 --iterations 2000 [--include-content]
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+from datetime import datetime, timedelta
+from typing import List, Union
+
+from bson import ObjectId
+
+os.environ.setdefault("MONGODB_URL", "mongodb://localhost:27017")
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.models.post import PostResponse, PostSummary
+from app.services.post_service import post_service
+from app.services.serialization import ModelJSONResponse
+
+
+def make_doc(i: int, base: datetime, content_size: int) -> dict:
+    return {
+        "_id": ObjectId(),
+        "title": f"Article de test numéro {i}",
+        "slug": f"article-{i}",
+        "excerpt": "Un court résumé de l'article, affiché dans les listes. " * 2,
+        "content": "<p>" + "Lorem ipsum dolor sit amet. " * (content_size // 28) + "</p>",
+        "tags": ["python", "fastapi", "mongodb"][: 1 + i % 3],
+        "is_published": True,
+        "author_id": f"user_{i % 20}",
+        "author_email": f"auteur{i % 20}@example.com",
+        "featured_image": None,
+        "created_at": base + timedelta(minutes=i),
+        "updated_at": base + timedelta(minutes=i, seconds=30),
+    }
+
+
+async def legacy_path(docs: List[dict], include_content: bool, field) -> bytes:
+    """Un modèle par document, puis le traitement de response_model par FastAPI"""
+    convert = post_service._convert_to_response if include_content else post_service._convert_to_summary
+    posts = [convert(doc) for doc in docs]
+    content = await serialize_response(field=field, response_content=posts, is_coroutine=True)
+    return JSONResponse(content).body
+
+
+async def fast_path(docs: List[dict], include_content: bool, field) -> bytes:
+    """Validation de la page en un appel, sérialisation directe par pydantic-core"""
+    posts = post_service._convert_list(docs, include_content)
+    return ModelJSONResponse(posts, List[PostResponse] if include_content else List[PostSummary]).body
+
+
+async def measure(name: str, fn, docs: List[dict], include_content: bool, field, iterations: int) -> float:
+    # Préchauffage (construction des schémas, caches de TypeAdapter)
+    for _ in range(20):
+        await fn(docs, include_content, field)
+
+    durations = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await fn(docs, include_content, field)
+        durations.append((time.perf_counter() - start) * 1_000_000)
+
+    durations.sort()
+    median = statistics.median(durations)
+    p95 = durations[int(len(durations) * 0.95) - 1]
+    print(f"{name:<36} p50 {median:9.1f} µs   p95 {p95:9.1f} µs")
+    return median
+
+
+async def run(args: argparse.Namespace) -> None:
+    base = datetime(2024, 1, 1)
+    docs = [make_doc(i, base, args.content_size) for i in range(args.posts)]
+    field = create_response_field(name="Response_list_posts", type_=List[Union[PostResponse, PostSummary]])
+
+    legacy = await legacy_path(docs, args.include_content, field)
+    fast = await fast_path(docs, args.include_content, field)
+    print(f"{args.posts} posts, corps JSON : {len(legacy)} octets (avant) / {len(fast)} octets (après)")
+
+    before = await measure("avant (response_model + json)", legacy_path, docs, args.include_content, field, args.iterations)
+    after = await measure("après (TypeAdapter + pydantic-core)", fast_path, docs, args.include_content, field, args.iterations)
+    print(f"gain : x{before / after:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--posts", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--content-size", type=int, default=4000, help="Taille approximative de `content` en octets")
+    parser.add_argument("--include-content", action="store_true", help="Sérialise des PostResponse (avec content)")
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
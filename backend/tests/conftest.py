@@ -0,0 +1,139 @@
+import os
+import json
+import time
+import tempfile
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+# Clé de signature locale : les jetons de test sont de vrais JWT vérifiés via CLERK_JWKS_PATH
+PRIVATE_KEY = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+KID = "test-key"
+
+
+def write_jwks(path: str, private_key=PRIVATE_KEY, kid: str = KID) -> None:
+    jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+    jwk.update({"kid": kid, "use": "sig", "alg": "RS256"})
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"keys": [jwk]}, f)
+
+
+def make_token(sub: str, private_key=PRIVATE_KEY, kid: str = KID, ttl: int = 3600, **claims) -> str:
+    now = int(time.time())
+    payload = {"sub": sub, "iat": now, "exp": now + ttl}
+    payload.update(claims)
+    return jwt.encode(payload, private_key, algorithm="RS256", headers={"kid": kid})
+
+
+JWKS_PATH = os.path.join(tempfile.mkdtemp(prefix="blog-tests-"), "jwks.json")
+write_jwks(JWKS_PATH)
+
+# Configuration minimale avant l'import de l'application (aucun service externe)
+os.environ.update({
+    "MONGODB_URL": "mongodb://localhost:27017",
+    "DATABASE_NAME": "blog_test",
+    "MONGODB_ENSURE_INDEXES": "false",
+    "CLOUDINARY_CLOUD_NAME": "test",
+    "CLOUDINARY_API_KEY": "test",
+    "CLOUDINARY_API_SECRET": "test",
+    "CLERK_SECRET_KEY": "sk_test",
+    "CLERK_JWKS_PATH": JWKS_PATH,
+    "CACHE_BACKEND": "memory",
+    "CHANGE_STREAMS_ENABLED": "false",
+})
+for name in ("CACHE_REDIS_URL", "CLERK_ISSUER", "CLERK_AUTHORIZED_PARTIES"):
+    os.environ.pop(name, None)
+
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from mongomock_motor import AsyncMongoMockClient
+
+from app.main import app
+from app.services.database import db_service
+from app.services.cache_backend import cache_manager, MemoryCacheBackend
+from app.services.known_posts import known_posts
+from app.services.tag_stats import tag_stats_service
+from app.middleware.compression import compressed_cache
+
+# Utilisateurs présents dans `users` pour chaque test (rôle lu en base)
+TEST_CLERK_ID = "user_test_123"
+ADMIN_CLERK_ID = "user_admin_1"
+USER_HEADERS = {"Authorization": f"Bearer {make_token(TEST_CLERK_ID)}"}
+ADMIN_HEADERS = {"Authorization": f"Bearer {make_token(ADMIN_CLERK_ID)}"}
+
+
+def make_user(clerk_id: str, role: str = "user", **fields) -> dict:
+    user = {
+        "clerk_id": clerk_id,
+        "email": f"{clerk_id}@example.com",
+        "username": clerk_id.replace("user_", ""),
+        "first_name": None,
+        "last_name": None,
+        "profile_image": None,
+        "role": role,
+        "is_active": True,
+        "created_at": datetime(2025, 1, 1),
+        "updated_at": datetime(2025, 1, 1),
+    }
+    user.update(fields)
+    return user
+
+
+def _reset_caches() -> None:
+    for cache in cache_manager.caches.values():
+        if isinstance(cache, MemoryCacheBackend):
+            cache._cache.clear()
+    compressed_cache.clear()
+    tag_stats_service._snapshot.clear()
+    known_posts._filter = None
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """Base MongoDB en mémoire, neuve pour chaque test"""
+    async def noop():
+        return None
+
+    client = AsyncMongoMockClient()
+    monkeypatch.setattr(db_service, "connect", noop)
+    monkeypatch.setattr(db_service, "disconnect", noop)
+    monkeypatch.setattr(db_service, "client", client)
+    monkeypatch.setattr(db_service, "database", client["blog_test"])
+    raw_collection(db_service.database, "users").insert_many([
+        make_user(TEST_CLERK_ID), make_user(ADMIN_CLERK_ID, role="admin"),
+    ])
+    _reset_caches()
+    yield db_service.database
+    _reset_caches()
+
+
+@pytest.fixture
+def client(db):
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def raw_collection(db, name: str):
+    """Collection mongomock synchrone sous-jacente (préparation des données)"""
+    return db[name]._AsyncMongoMockCollection__collection
+
+
+def make_post(i: int, **fields) -> dict:
+    created_at = datetime(2025, 1, 1) + timedelta(hours=i)
+    post = {
+        "title": f"Post {i}",
+        "content": f"Contenu du post {i}",
+        "slug": f"post-{i}",
+        "excerpt": None,
+        "tags": ["tech" if i % 2 else "life"],
+        "is_published": True,
+        "author_id": TEST_CLERK_ID,
+        "author_email": f"{TEST_CLERK_ID}@example.com",
+        "featured_image": None,
+        "created_at": created_at,
+        "updated_at": created_at,
+    }
+    post.update(fields)
+    return post
@@ -0,0 +1,32 @@
+from app.middleware.access_log import AccessLogMiddleware, UNMATCHED
+
+from .conftest import make_post, raw_collection
+
+
+def access_log(client) -> AccessLogMiddleware:
+    layer = client.app.middleware_stack
+    while not isinstance(layer, AccessLogMiddleware):
+        layer = layer.app
+    return layer
+
+
+def test_requests_counted_by_route_template(db, client):
+    post_ids = [str(raw_collection(db, "posts").insert_one(make_post(i)).inserted_id) for i in range(2)]
+    log = access_log(client)
+    log.counts.clear()
+
+    for post_id in post_ids:
+        client.get(f"/posts/{post_id}")
+
+    assert log.counts["GET /posts/{post_id}"] == 2
+
+
+def test_unmatched_paths_share_one_key(client):
+    log = access_log(client)
+    log.counts.clear()
+
+    for i in range(20):
+        assert client.get(f"/wp-admin/{i}.php").status_code == 404
+    client.request("PROPFIND", "/nulle-part")
+
+    assert log.counts == {UNMATCHED: 21}
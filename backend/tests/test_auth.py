@@ -0,0 +1,108 @@
+import time
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import HTTPException
+
+from app.services.clerk_service import clerk_service
+from app.services.jwks_service import jwks_service
+
+from .conftest import KID, USER_HEADERS, make_token as sign, write_jwks
+
+ISSUER = "https://clerk.example.com"
+ORIGIN = "https://blog.example.com"
+
+_other_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+def make_token(**claims) -> str:
+    claims = {"sub": "user_jwt_1", "iss": ISSUER, "azp": ORIGIN, "ttl": 60, **claims}
+    return sign(claims.pop("sub"), **claims)
+
+
+@pytest.fixture
+def jwks_file(tmp_path, monkeypatch):
+    path = tmp_path / "jwks.json"
+    write_jwks(str(path))
+    monkeypatch.setattr(jwks_service, "jwks_path", str(path))
+    monkeypatch.setattr(jwks_service, "_keys", {})
+    monkeypatch.setattr(jwks_service, "_fetched_at", None)
+    monkeypatch.setattr(jwks_service, "_failed_at", None)
+    monkeypatch.setattr(clerk_service, "issuer", ISSUER)
+    monkeypatch.setattr(clerk_service, "authorized_parties", [ORIGIN])
+    return path
+
+
+async def test_valid_token_is_decoded(jwks_file):
+    payload = await clerk_service.decode_token(make_token())
+    assert payload["sub"] == "user_jwt_1"
+
+
+async def test_unknown_kid_is_rejected(jwks_file):
+    with pytest.raises(jwt.InvalidTokenError):
+        await clerk_service.decode_token(make_token(kid="rotated-key"))
+
+
+async def test_signature_from_another_key_is_rejected(jwks_file):
+    with pytest.raises(jwt.InvalidSignatureError):
+        await clerk_service.decode_token(make_token(private_key=_other_key))
+
+
+async def test_expired_token_is_rejected(jwks_file):
+    now = int(time.time())
+    with pytest.raises(jwt.ExpiredSignatureError):
+        await clerk_service.decode_token(make_token(iat=now - 120, exp=now - 60))
+
+
+async def test_wrong_issuer_is_rejected(jwks_file):
+    with pytest.raises(jwt.InvalidIssuerError):
+        await clerk_service.decode_token(make_token(iss="https://other.example.com"))
+
+
+async def test_unauthorized_party_is_rejected(jwks_file):
+    with pytest.raises(jwt.InvalidTokenError):
+        await clerk_service.decode_token(make_token(azp="https://evil.example.com"))
+
+
+async def test_failed_jwks_load_is_retried_after_backoff(jwks_file, monkeypatch):
+    jwks_file.unlink()
+    with pytest.raises(FileNotFoundError):
+        await jwks_service.get_signing_key(KID)
+    assert jwks_service._fetched_at is None
+
+    # Pendant le délai, pas de nouvel essai
+    write_jwks(str(jwks_file))
+    with pytest.raises(RuntimeError):
+        await jwks_service.get_signing_key(KID)
+
+    monkeypatch.setattr(jwks_service, "retry_interval", 0)
+    assert await jwks_service.get_signing_key(KID) is not None
+    assert jwks_service._fetched_at is not None
+
+
+async def test_verified_token_resolves_local_user(jwks_file, db):
+    await db["users"].insert_one({
+        "clerk_id": "user_jwt_1", "email": "jwt@example.com", "username": "jwt",
+        "role": "author", "is_active": True,
+    })
+
+    user_info = await clerk_service.verify_token(make_token())
+    assert user_info["clerk_id"] == "user_jwt_1"
+    assert user_info["role"] == "author"
+
+
+async def test_invalid_token_is_401(jwks_file, db):
+    with pytest.raises(HTTPException) as error:
+        await clerk_service.verify_token(make_token(private_key=_other_key))
+    assert error.value.status_code == 401
+
+
+@pytest.mark.parametrize("token", ["test_admin_token", "test_token", "not-a-jwt"])
+def test_unsigned_tokens_are_rejected(client, token):
+    response = client.get("/users/", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 401
+
+
+def test_signed_token_reaches_protected_route(client):
+    assert client.get("/users/me", headers=USER_HEADERS).status_code == 200
@@ -0,0 +1,105 @@
+from datetime import datetime
+
+from app.services.known_posts import known_posts
+from app.services.tag_stats import TAG_STATS_COLLECTION
+
+from .conftest import USER_HEADERS, make_post, raw_collection
+
+
+def seed(db, count=3):
+    posts = raw_collection(db, "posts")
+    ids = [str(posts.insert_one(make_post(i)).inserted_id) for i in range(count)]
+    raw_collection(db, TAG_STATS_COLLECTION).insert_many([
+        {"_id": "life", "total": 2, "published": 2},
+        {"_id": "tech", "total": 1, "published": 1},
+    ])
+    return ids
+
+
+def race_before_write(monkeypatch, change):
+    """Applique `change` entre la lecture des posts visés et le bulk_write (écriture concurrente)"""
+    add = known_posts.add
+
+    async def add_then_change(*post_docs):
+        change()
+        await add(*post_docs)
+
+    monkeypatch.setattr(known_posts, "add", add_then_change)
+
+
+def test_bulk_applies_operations(client, db):
+    ids = seed(db)
+    response = client.post("/posts/bulk", json={"operations": [
+        {"op": "unpublish", "post_id": ids[0]},
+        {"op": "delete", "post_id": ids[1]},
+    ]}, headers=USER_HEADERS)
+
+    body = response.json()
+    assert response.status_code == 200
+    assert body["success"] is True
+    assert [result["status"] for result in body["results"]] == [200, 200]
+    assert (body["modified"], body["deleted"]) == (1, 1)
+
+
+def test_bulk_rejects_duplicate_post_ids(client, db):
+    ids = seed(db)
+    response = client.post("/posts/bulk", json={"operations": [
+        {"op": "publish", "post_id": ids[0]},
+        {"op": "delete", "post_id": ids[0]},
+    ]}, headers=USER_HEADERS)
+
+    assert response.status_code == 422
+    assert raw_collection(db, "posts").count_documents({}) == 3
+
+
+def test_bulk_reports_posts_deleted_concurrently(client, db, monkeypatch):
+    ids = seed(db)
+    posts = raw_collection(db, "posts")
+    # Les deux posts visés sont supprimés par une autre requête
+    race_before_write(monkeypatch, lambda: posts.delete_many({"slug": {"$in": ["post-0", "post-1"]}}))
+
+    response = client.post("/posts/bulk", json={"ordered": False, "operations": [
+        {"op": "update", "post_id": ids[0], "changes": {"tags": ["tech"]}},
+        {"op": "delete", "post_id": ids[1]},
+        {"op": "unpublish", "post_id": ids[2]},
+    ]}, headers=USER_HEADERS)
+
+    body = response.json()
+    assert body["success"] is False
+    assert [result["status"] for result in body["results"]] == [404, 404, 200]
+    # Seule l'opération appliquée compte dans les statistiques de tags
+    stats = {doc["_id"]: doc for doc in raw_collection(db, TAG_STATS_COLLECTION).find()}
+    assert (stats["life"]["total"], stats["life"]["published"]) == (2, 1)
+    assert stats["tech"]["total"] == 1
+
+
+def test_bulk_does_not_overwrite_concurrent_update(client, db, monkeypatch):
+    ids = seed(db)
+    posts = raw_collection(db, "posts")
+    race_before_write(monkeypatch, lambda: posts.update_one(
+        {"slug": "post-0"}, {"$set": {"title": "Modifié ailleurs", "updated_at": datetime(2025, 6, 1)}}
+    ))
+
+    response = client.post("/posts/bulk", json={"operations": [
+        {"op": "update", "post_id": ids[0], "changes": {"title": "Modifié par le lot"}},
+    ]}, headers=USER_HEADERS)
+
+    assert response.json()["results"][0]["status"] == 409
+    assert posts.find_one({"slug": "post-0"})["title"] == "Modifié ailleurs"
+
+
+def test_bulk_post_ids_are_case_insensitive(client, db):
+    ids = seed(db)
+
+    duplicate = client.post("/posts/bulk", json={"operations": [
+        {"op": "publish", "post_id": ids[0]},
+        {"op": "unpublish", "post_id": ids[0].upper()},
+    ]}, headers=USER_HEADERS)
+    assert duplicate.status_code == 422
+
+    response = client.post("/posts/bulk", json={"operations": [
+        {"op": "unpublish", "post_id": ids[1].upper()},
+    ]}, headers=USER_HEADERS)
+    result = response.json()["results"][0]
+    assert (result["status"], result["post_id"]) == (200, ids[1])
+    assert raw_collection(db, "posts").find_one({"slug": "post-1"})["is_published"] is False
@@ -0,0 +1,111 @@
+import asyncio
+
+import fakeredis
+import pytest
+
+from app.services.cache import MISSING
+from app.services.cache_backend import CacheBackend, CacheManager, RedisCacheBackend
+
+
+@pytest.fixture
+def redis_server():
+    return fakeredis.FakeServer()
+
+
+def make_manager(server) -> CacheManager:
+    manager = CacheManager()
+    manager.redis_client = fakeredis.aioredis.FakeRedis(server=server)
+    manager.reconnect_delay = 0.01
+    return manager
+
+
+async def wait_for(predicate, timeout: float = 2.0) -> bool:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while asyncio.get_running_loop().time() < deadline:
+        if await predicate():
+            return True
+        await asyncio.sleep(0.01)
+    return False
+
+
+async def test_invalidation_is_broadcast_to_other_workers(redis_server):
+    worker_a, worker_b = make_manager(redis_server), make_manager(redis_server)
+    cache_a = worker_a.create("post", maxsize=100, ttl=60)
+    cache_b = worker_b.create("post", maxsize=100, ttl=60)
+    await worker_a.start()
+    await worker_b.start()
+    try:
+        await cache_b.set("post:1", {"title": "v1"}, groups=["post:1"])
+        await cache_b.set("post:2", {"title": "v1"}, groups=["post:2"])
+        await asyncio.sleep(0.05)  # abonnements établis
+
+        await cache_a.invalidate_groups(["post:1"])
+
+        assert await wait_for(lambda: _is_missing(cache_b, "post:1"))
+        assert await cache_b.get("post:2") == {"title": "v1"}
+    finally:
+        await worker_a.close()
+        await worker_b.close()
+
+
+async def test_listener_resubscribes_and_resets_local_caches(redis_server):
+    worker_a, worker_b = make_manager(redis_server), make_manager(redis_server)
+    cache_a = worker_a.create("post", maxsize=100, ttl=60)
+    cache_b = worker_b.create("post", maxsize=100, ttl=60)
+
+    # Redis injoignable au démarrage : l'écoute réessaie au lieu de s'arrêter
+    redis_server.connected = False
+    await worker_b.start()
+    await cache_b.set("post:1", {"title": "v1"}, groups=["post:1"])
+    await asyncio.sleep(0.05)
+    assert worker_b.stats()["listening"] is True
+
+    redis_server.connected = True
+    try:
+        # Invalidations manquées pendant la coupure : le cache local est vidé
+        assert await wait_for(lambda: _is_missing(cache_b, "post:1"))
+
+        await cache_b.set("post:2", {"title": "v1"}, groups=["post:2"])
+        await cache_a.invalidate_groups(["post:2"])
+        assert await wait_for(lambda: _is_missing(cache_b, "post:2"))
+    finally:
+        await worker_a.close()
+        await worker_b.close()
+
+
+async def test_redis_backend_groups(redis_server):
+    manager = make_manager(redis_server)
+    cache = RedisCacheBackend("post", manager, ttl=60)
+    try:
+        await cache.mset({"a": 1, "b": 2}, groups=["tag:tech"])
+        await cache.set("c", 3, groups=["tag:life"])
+        assert await cache.mget(["a", "b", "c", "d"]) == [1, 2, 3, MISSING]
+
+        assert await cache.invalidate_groups(["tag:tech"]) == 2
+        assert await cache.mget(["a", "b", "c"]) == [MISSING, MISSING, 3]
+    finally:
+        await manager.close()
+
+
+async def test_redis_backend_errors_do_not_raise(redis_server):
+    manager = make_manager(redis_server)
+    cache = RedisCacheBackend("post", manager, ttl=60)
+    redis_server.connected = False
+    try:
+        assert await cache.get("a", "défaut") == "défaut"
+        await cache.set("a", 1, groups=["tag:tech"])
+        await cache.delete("a")
+        assert await cache.invalidate_groups(["tag:tech"]) == 0
+        await cache.clear()
+    finally:
+        redis_server.connected = True
+        await manager.close()
+
+
+def test_cache_backend_is_abstract():
+    with pytest.raises(TypeError):
+        CacheBackend("post", CacheManager(), ttl=60)
+
+
+async def _is_missing(cache, key) -> bool:
+    return await cache.get(key, MISSING) is MISSING
@@ -0,0 +1,128 @@
+import os
+import asyncio
+import uuid
+
+import pytest
+
+from app.services.cache_backend import cache_manager
+from app.services.change_streams import RESUME_TOKENS_COLLECTION, ChangeStreamWatcher
+from app.services.database import db_service
+from app.services.known_posts import NAMESPACE as KNOWN_POSTS_NAMESPACE, known_posts
+from app.services.post_service import post_service
+from app.services.related_posts import RELATED_POSTS_COLLECTION
+
+from .conftest import make_post, raw_collection
+
+REPLICA_URL = os.getenv("TEST_MONGODB_REPLICA_URL")
+
+
+@pytest.fixture
+def published(monkeypatch):
+    """Diffusions des invalidations (espaces de noms publiés)"""
+    namespaces = []
+
+    async def publish(namespace, groups):
+        namespaces.append(namespace)
+
+    monkeypatch.setattr(cache_manager, "publish", publish)
+    return namespaces
+
+
+async def test_external_write_is_applied_locally(db, published, monkeypatch):
+    posts = raw_collection(db, "posts")
+    neighbor_id = posts.insert_one(make_post(1, tags=["python"])).inserted_id
+    monkeypatch.setattr(cache_manager, "subscribed", True)
+    await known_posts.rebuild()
+
+    # Écriture d'un script d'administration, vue seulement par le change stream
+    post = make_post(2, tags=["python"])
+    post["_id"] = posts.insert_one(post).inserted_id
+    assert known_posts.might_exist(slug="post-2") is False
+
+    await ChangeStreamWatcher()._handle("posts", {
+        "operationType": "insert", "fullDocument": post, "documentKey": {"_id": post["_id"]}
+    })
+
+    # Filtre mis à jour sur ce worker sans rediffuser : les autres voient le même événement
+    assert known_posts.might_exist(slug="post-2") is True
+    assert KNOWN_POSTS_NAMESPACE not in published
+    # Posts similaires recalculés pour le post écrit hors de PostService
+    related = raw_collection(db, RELATED_POSTS_COLLECTION).find_one({"_id": post["_id"]})
+    assert [item["id"] for item in related["related"]] == [str(neighbor_id)]
+
+
+# --- Replica set réel (TEST_MONGODB_REPLICA_URL=mongodb://localhost:27017/?replicaSet=rs0) ---
+
+async def wait_for(predicate, timeout: float = 10.0) -> bool:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while asyncio.get_running_loop().time() < deadline:
+        if await predicate():
+            return True
+        await asyncio.sleep(0.05)
+    return False
+
+
+@pytest.fixture
+async def replica_db(monkeypatch):
+    if not REPLICA_URL:
+        pytest.skip("TEST_MONGODB_REPLICA_URL non défini (replica set requis)")
+    import motor.motor_asyncio
+
+    client = motor.motor_asyncio.AsyncIOMotorClient(REPLICA_URL, serverSelectionTimeoutMS=2000)
+    try:
+        await client.admin.command("ping")
+    except Exception as e:
+        pytest.skip(f"Replica set injoignable: {e}")
+
+    database = client[f"blog_test_{uuid.uuid4().hex[:8]}"]
+    monkeypatch.setattr(db_service, "client", client)
+    monkeypatch.setattr(db_service, "database", database)
+    post_service.cache._cache.clear()
+    yield database
+    post_service.cache._cache.clear()
+    await client.drop_database(database.name)
+    client.close()
+
+
+async def cached_title(slug: str) -> str:
+    return (await post_service.get_post_by_slug(slug)).title
+
+
+async def _title_is(slug: str, title: str) -> bool:
+    return await cached_title(slug) == title
+
+
+async def test_replica_external_write_invalidates_and_resumes(replica_db):
+    posts = replica_db["posts"]
+    await posts.insert_one(make_post(1))
+
+    watcher = ChangeStreamWatcher()
+    watcher.enabled = True
+    watcher.token_save_interval = 0
+    await watcher.start()
+    try:
+        # Attendre l'ouverture du flux : les écritures précédentes ne sont pas rejouées
+        async def stream_open():
+            await posts.insert_one(make_post(100 + len(watcher.events), slug=f"marker-{uuid.uuid4().hex}"))
+            return watcher.events.get("posts", 0) > 0
+        assert await wait_for(stream_open)
+
+        assert await cached_title("post-1") == "Post 1"
+        await posts.update_one({"slug": "post-1"}, {"$set": {"title": "Externe"}})
+        assert await wait_for(lambda: _title_is("post-1", "Externe"))
+    finally:
+        await watcher.stop()
+
+    # Arrêté : l'écriture suivante est rejouée depuis le resume token enregistré
+    assert await replica_db[RESUME_TOKENS_COLLECTION].find_one({"_id": "posts"}) is not None
+    assert await cached_title("post-1") == "Externe"
+    await posts.update_one({"slug": "post-1"}, {"$set": {"title": "Pendant l'arrêt"}})
+    assert await cached_title("post-1") == "Externe"
+
+    restarted = ChangeStreamWatcher()
+    restarted.enabled = True
+    await restarted.start()
+    try:
+        assert await wait_for(lambda: _title_is("post-1", "Pendant l'arrêt"))
+    finally:
+        await restarted.stop()
@@ -0,0 +1,158 @@
+import asyncio
+import zlib
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.middleware.compression import CompressionMiddleware, compressed_cache
+
+BODY = b'{"items": "' + b"x" * 4000 + b'"}'
+CHUNKS = [b'{"n": %d}\n' % i for i in range(3)]
+
+
+async def large(request):
+    return Response(BODY, media_type="application/json", headers={"ETag": 'W/"v1"'})
+
+
+async def small(request):
+    return Response(b'{"ok": true}', media_type="application/json")
+
+
+async def not_modified(request):
+    return Response(status_code=304, headers={"ETag": 'W/"v1"'})
+
+
+async def stream(request):
+    async def lines():
+        for chunk in CHUNKS:
+            yield chunk
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+app = Starlette(routes=[
+    Route("/large", large, methods=["GET", "HEAD"]),
+    Route("/small", small),
+    Route("/not-modified", not_modified),
+    Route("/stream", stream),
+])
+
+
+@pytest.fixture
+def middleware():
+    compressed_cache.clear()
+    yield CompressionMiddleware(app)
+    compressed_cache.clear()
+
+
+@pytest.fixture
+def client(middleware):
+    return TestClient(middleware)
+
+
+def raw_get(client, path, accept_encoding="gzip", method="GET"):
+    """Réponse et octets tels qu'envoyés (httpx décompresserait `content`)"""
+    with client.stream(method, path, headers={"Accept-Encoding": accept_encoding}) as response:
+        return response, b"".join(response.iter_raw())
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip", "gzip"),
+    ("gzip, br", "br"),
+    ("br;q=0.5, gzip;q=0.8", "gzip"),
+    ("br;q=0, gzip;q=0", None),
+    ("identity", None),
+    ("*", "br"),
+    ("*;q=0.1, br;q=0", "gzip"),
+    ("GZIP;q=1.0", "gzip"),
+    ("", None),
+])
+def test_accept_encoding_negotiation(middleware, header, expected):
+    middleware.brotli_enabled = True
+    assert middleware.negotiate(header) == expected
+
+
+def test_large_body_is_compressed(client):
+    response, raw = raw_get(client, "/large")
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) == len(raw) < len(BODY)
+    assert zlib.decompress(raw, 31) == BODY
+
+
+def test_identity_and_small_bodies_pass_through(client):
+    response, raw = raw_get(client, "/large", accept_encoding="identity")
+    assert "content-encoding" not in response.headers
+    assert raw == BODY
+
+    response, raw = raw_get(client, "/small")
+    assert "content-encoding" not in response.headers
+    # La réponse dépend quand même de l'en-tête (elle aurait été compressée au-delà du seuil)
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert raw == b'{"ok": true}'
+
+
+def test_not_modified_and_head_are_not_encoded(client):
+    response, raw = raw_get(client, "/not-modified")
+    assert response.status_code == 304
+    assert "content-encoding" not in response.headers
+    assert raw == b""
+
+    response, _ = raw_get(client, "/large", method="HEAD")
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert response.headers["content-length"] == str(len(BODY))
+
+
+def test_same_body_is_compressed_once(client, middleware, monkeypatch):
+    calls = []
+    compress = middleware.compress
+
+    def counting(body, encoding):
+        calls.append(encoding)
+        return compress(body, encoding)
+
+    monkeypatch.setattr(middleware, "compress", counting)
+
+    first = raw_get(client, "/large")[1]
+    second = raw_get(client, "/large")[1]
+
+    assert calls == ["gzip"]
+    assert first == second
+
+
+async def test_stream_chunks_are_flushed_and_decompress(middleware):
+    messages = []
+    requests = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive():
+        if requests:
+            return requests.pop()
+        # Client toujours connecté : attendu jusqu'à la fin du flux
+        await asyncio.Event().wait()
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http", "method": "GET", "path": "/stream", "raw_path": b"/stream", "root_path": "",
+        "scheme": "http", "query_string": b"", "headers": [(b"accept-encoding", b"gzip")],
+        "server": ("test", 80), "client": ("test", 1234), "http_version": "1.1",
+    }
+    await middleware(scope, receive, send)
+
+    headers = dict(messages[0]["headers"])
+    assert headers[b"content-encoding"] == b"gzip"
+    assert b"content-length" not in headers
+
+    # Z_SYNC_FLUSH : chaque morceau se décompresse dès réception
+    decompressor = zlib.decompressobj(31)
+    received = []
+    for message in messages[1:]:
+        if message["body"]:
+            received.append(decompressor.decompress(message["body"]))
+    assert [chunk for chunk in received if chunk] == CHUNKS
+    assert decompressor.eof
@@ -0,0 +1,50 @@
+import pytest
+
+from .conftest import USER_HEADERS, make_post, raw_collection
+
+
+@pytest.fixture
+def posts(db):
+    return [str(raw_collection(db, "posts").insert_one(make_post(i)).inserted_id) for i in range(3)]
+
+
+def test_post_revalidation_returns_304(posts, client):
+    first = client.get("/posts/slug/post-1")
+    etag = first.headers["ETag"]
+    assert first.status_code == 200
+    assert etag.startswith('W/"')
+
+    response = client.get("/posts/slug/post-1", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+    # Comparaison faible : l'ETag sans préfixe W/ désigne la même représentation
+    strong = etag.removeprefix("W/")
+    assert client.get(f"/posts/{posts[1]}", headers={"If-None-Match": strong}).status_code == 304
+
+
+def test_if_modified_since_returns_304(posts, client):
+    last_modified = client.get(f"/posts/{posts[0]}").headers["Last-Modified"]
+
+    response = client.get(f"/posts/{posts[0]}", headers={"If-Modified-Since": last_modified})
+    assert response.status_code == 304
+
+
+def test_update_changes_etag(posts, client):
+    etag = client.get(f"/posts/{posts[2]}").headers["ETag"]
+
+    assert client.put(f"/posts/{posts[2]}", json={"title": "Nouveau titre"}, headers=USER_HEADERS).status_code == 200
+
+    response = client.get(f"/posts/{posts[2]}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["title"] == "Nouveau titre"
+    assert response.headers["ETag"] != etag
+
+
+def test_list_revalidation_returns_304(posts, client):
+    etag = client.get("/posts/", params={"limit": 2}).headers["ETag"]
+
+    assert client.get("/posts/", params={"limit": 2}, headers={"If-None-Match": etag}).status_code == 304
+    # Une autre page n'a pas la même empreinte
+    assert client.get("/posts/", params={"limit": 3}, headers={"If-None-Match": etag}).status_code == 200
@@ -0,0 +1,77 @@
+from app.services.conditional import post_etag
+from app.services.content import DERIVED_VERSION, derive_fields, render_html
+from app.services.post_service import post_service
+
+from .conftest import USER_HEADERS, make_post, raw_collection
+
+PAYLOAD = (
+    '<p>Bonjour <strong>monde</strong></p>'
+    '<script>alert(1)</script>'
+    '<img src="https://example.com/a.png" onerror="alert(2)">'
+    '<a href="javascript:alert(3)">lien</a>'
+    '<p onclick="alert(4)">clic</p>'
+)
+
+
+def assert_safe(html: str) -> None:
+    lowered = html.lower()
+    for marker in ("<script", "onerror=", "onclick=", 'href="javascript:'):
+        assert marker not in lowered
+
+
+def test_editor_html_is_sanitized():
+    html = render_html(PAYLOAD)
+
+    assert_safe(html)
+    assert "<p>Bonjour <strong>monde</strong></p>" in html
+    assert '<img src="https://example.com/a.png">' in html
+
+
+def test_raw_html_in_markdown_is_escaped():
+    html = render_html("# Titre\n\nTexte <script>alert(1)</script> [lien](javascript:alert(1))")
+
+    assert_safe(html)
+    assert "<a" not in html
+    assert "<h1>Titre</h1>" in html
+    assert "&lt;script&gt;" in html
+
+
+def test_derived_fields():
+    fields = derive_fields("Un deux trois **quatre**")
+
+    assert fields["content_html"] == "<p>Un deux trois <strong>quatre</strong></p>\n"
+    assert (fields["word_count"], fields["reading_time"]) == (4, 1)
+    assert fields["auto_excerpt"] == "Un deux trois quatre"
+
+
+def test_created_post_html_is_sanitized(client, db):
+    response = client.post("/posts/", json={
+        "title": "XSS", "content": PAYLOAD, "slug": "xss", "is_published": True
+    }, headers=USER_HEADERS)
+    assert response.status_code in (200, 201)
+
+    html = client.get("/posts/slug/xss").json()["content_html"]
+    assert_safe(html)
+    assert "Bonjour" in html
+
+
+def test_html_stored_by_an_older_renderer_is_not_served(db, client):
+    raw_collection(db, "posts").insert_one(make_post(
+        1, content=PAYLOAD, content_html=PAYLOAD, derived_version=DERIVED_VERSION - 1
+    ))
+
+    html = client.get("/posts/slug/post-1").json()["content_html"]
+    assert_safe(html)
+
+
+async def test_backfill_changes_post_etag(db):
+    posts = raw_collection(db, "posts")
+    post_id = posts.insert_one(make_post(1, content=PAYLOAD, content_html=PAYLOAD, derived_version=1)).inserted_id
+    before = posts.find_one({"_id": post_id})
+
+    assert (await post_service.backfill_derived_fields())["updated"] == 1
+
+    after = posts.find_one({"_id": post_id})
+    assert after["derived_version"] == DERIVED_VERSION
+    assert_safe(after["content_html"])
+    assert post_etag(post_id, after["updated_at"]) != post_etag(post_id, before["updated_at"])
@@ -0,0 +1,77 @@
+import json
+
+import pytest
+
+from app.models.post import PostResponse
+from app.services import export
+from app.services.post_service import post_service
+
+from .conftest import ADMIN_HEADERS, USER_HEADERS, make_post, make_user, raw_collection
+
+
+@pytest.fixture
+def posts(db, monkeypatch):
+    # Petits lots et petits morceaux : l'export traverse plusieurs allers-retours et plusieurs écritures
+    monkeypatch.setattr(export, "EXPORT_BATCH_SIZE", 3)
+    monkeypatch.setattr(export, "EXPORT_CHUNK_BYTES", 256)
+    raw_collection(db, "posts").insert_many([make_post(i, is_published=i % 3 != 0) for i in range(10)])
+    return sorted(str(post["_id"]) for post in raw_collection(db, "posts").find())
+
+
+def export_lines(client, path, **params):
+    response = client.get(path, params=params, headers=ADMIN_HEADERS)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.content.endswith(b"\n")
+    return [json.loads(line) for line in response.content.splitlines()]
+
+
+def test_posts_export_streams_every_post_in_id_order(posts, client):
+    items = export_lines(client, "/posts/export.ndjson")
+
+    assert [item["id"] for item in items] == posts
+    # Brouillons compris, contenu complet
+    assert {item["is_published"] for item in items} == {True, False}
+    assert all(item["content"] for item in items)
+
+
+def test_posts_export_resumes_after_last_received_id(posts, client):
+    items = export_lines(client, "/posts/export.ndjson", after=posts[3])
+    assert [item["id"] for item in items] == posts[4:]
+
+    # Les brouillons sont les posts 0, 3, 6 et 9
+    drafts = export_lines(client, "/posts/export.ndjson", after=posts[3], is_published="false")
+    assert [item["id"] for item in drafts] == [posts[6], posts[9]]
+
+
+async def test_export_body_is_written_in_whole_line_chunks(posts):
+    response = export.ndjson_response(post_service.export_posts(), PostResponse, "posts.ndjson")
+    chunks = [chunk async for chunk in response.body_iterator]
+
+    assert len(chunks) > 1
+    # Une ligne n'est jamais coupée entre deux morceaux
+    assert all(chunk.endswith(b"\n") for chunk in chunks)
+    assert [json.loads(line)["id"] for chunk in chunks for line in chunk.splitlines()] == posts
+
+
+def test_users_export(db, client):
+    raw_collection(db, "users").insert_many([make_user(f"user_{i}") for i in range(5)])
+    expected = sorted(str(user["_id"]) for user in raw_collection(db, "users").find())
+
+    items = export_lines(client, "/users/export.ndjson")
+    assert [item["id"] for item in items] == expected
+
+    items = export_lines(client, "/users/export.ndjson", after=expected[-2])
+    assert [item["id"] for item in items] == expected[-1:]
+
+
+@pytest.mark.parametrize("path", ["/posts/export.ndjson", "/users/export.ndjson"])
+def test_export_rejects_invalid_after(db, client, path):
+    response = client.get(path, params={"after": "pas-un-id"}, headers=ADMIN_HEADERS)
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("path", ["/posts/export.ndjson", "/users/export.ndjson"])
+def test_export_is_admin_only(db, client, path):
+    assert client.get(path, headers=USER_HEADERS).status_code == 403
+    assert client.get(path).status_code in (401, 403)
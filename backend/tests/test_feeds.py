@@ -0,0 +1,52 @@
+import pytest
+
+from .conftest import ADMIN_CLERK_ID, USER_HEADERS, make_post, raw_collection
+
+
+@pytest.fixture
+def posts(db):
+    raw_collection(db, "posts").insert_many([make_post(i) for i in range(3)])
+
+
+def test_feed_etag_is_weak_and_revalidates(posts, client):
+    response = client.get("/feed.xml", headers={"Accept-Encoding": "gzip"})
+    etag = response.headers["ETag"]
+    assert response.status_code == 200
+    assert etag.startswith('W/"')
+    assert b"<title>Post 2</title>" in response.content
+
+    # Variante non compressée : même ETag, revalidation possible
+    assert client.get("/feed.xml", headers={"Accept-Encoding": "identity", "If-None-Match": etag}).status_code == 304
+
+
+def test_feed_changes_after_publication(posts, client):
+    etag = client.get("/atom.xml").headers["ETag"]
+
+    created = client.post("/posts/", json={
+        "title": "Nouvel article", "content": "Texte", "slug": "nouvel-article", "is_published": True
+    }, headers=USER_HEADERS)
+    assert created.status_code in (200, 201)
+
+    response = client.get("/atom.xml", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert b"Nouvel article" in response.content
+
+
+def test_atom_authors_are_display_names(db, client):
+    raw_collection(db, "users").update_one(
+        {"clerk_id": ADMIN_CLERK_ID}, {"$set": {"first_name": "Ada", "last_name": "<Lovelace>"}}
+    )
+    raw_collection(db, "posts").insert_many([
+        make_post(1),
+        make_post(2, author_id=ADMIN_CLERK_ID),
+        make_post(3, author_id="user_supprime"),
+    ])
+
+    body = client.get("/atom.xml").content.decode()
+
+    # Aucun identifiant Clerk dans le flux : prénom nom, username, sinon l'auteur du flux seul
+    assert "user_" not in body
+    assert "<author><name>Ada &lt;Lovelace&gt;</name></author>" in body
+    assert "<author><name>test_123</name></author>" in body
+    assert body.count("<author>") == 3
+    assert body.index("<author><name>Blog</name></author>") < body.index("<entry>")
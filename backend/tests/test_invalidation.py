@@ -0,0 +1,68 @@
+import pytest
+
+from app.services.post_service import post_service
+
+from .conftest import TEST_CLERK_ID, USER_HEADERS, make_post, raw_collection
+
+
+@pytest.fixture
+def invalidated(monkeypatch):
+    """Groupes passés à `invalidate_groups` par PostService"""
+    calls = []
+    original = post_service.cache.invalidate_groups
+
+    async def spy(groups):
+        groups = set(groups)
+        calls.append(groups)
+        return await original(groups)
+
+    monkeypatch.setattr(post_service.cache, "invalidate_groups", spy)
+    return calls
+
+
+@pytest.fixture
+def posts(db):
+    raw_collection(db, "posts").insert_many([
+        make_post(1, tags=["tech"]),
+        make_post(2, tags=["tech"], is_published=False),
+    ])
+    return {post["slug"]: str(post["_id"]) for post in raw_collection(db, "posts").find()}
+
+
+def prime(client):
+    for path in ("/posts/", "/posts/slug/post-1", "/posts/tags/tech", f"/posts/?author_id={TEST_CLERK_ID}"):
+        assert client.get(path).status_code == 200
+    return len(post_service.cache._cache)
+
+
+def test_published_update_evicts_every_entry_of_the_post(posts, client, invalidated):
+    assert prime(client) == 4
+
+    response = client.put(f"/posts/{posts['post-1']}", json={"slug": "nouveau", "tags": ["life"]}, headers=USER_HEADERS)
+    assert response.status_code == 200
+
+    assert invalidated == [{
+        f"post:{posts['post-1']}", "slug:post-1", "slug:nouveau",
+        f"author:{TEST_CLERK_ID}", "tag:tech", "tag:life", "list:first",
+    }]
+    assert len(post_service.cache._cache) == 0
+    assert client.get("/posts/tags/life").json()[0]["slug"] == "nouveau"
+
+
+def test_draft_edit_keeps_public_lists(posts, client, invalidated):
+    cached = prime(client)
+
+    response = client.put(f"/posts/{posts['post-2']}", json={"title": "Toujours brouillon"}, headers=USER_HEADERS)
+    assert response.status_code == 200
+
+    assert invalidated == [{f"post:{posts['post-2']}", "slug:post-2"}]
+    assert len(post_service.cache._cache) == cached
+
+
+def test_publishing_a_draft_flushes_public_lists(posts, client, invalidated):
+    prime(client)
+
+    client.put(f"/posts/{posts['post-2']}", json={"is_published": True}, headers=USER_HEADERS)
+
+    assert {"list:first", "tag:tech", f"author:{TEST_CLERK_ID}"} <= invalidated[0]
+    assert [post["slug"] for post in client.get("/posts/").json()] == ["post-2", "post-1"]
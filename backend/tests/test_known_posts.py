@@ -0,0 +1,57 @@
+import pytest
+
+from app.services.bloom import BloomFilter
+from app.services.cache_backend import ALL_GROUPS, cache_manager
+from app.services.known_posts import known_posts
+
+from .conftest import make_post, raw_collection
+
+
+@pytest.fixture
+def built_filter(db):
+    raw_collection(db, "posts").insert_many([make_post(i) for i in range(3)])
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    for i in range(1000):
+        bloom.add(f"slug:post-{i}")
+
+    assert all(f"slug:post-{i}" in bloom for i in range(1000))
+    false_positives = sum(f"slug:autre-{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+
+
+async def test_filter_not_used_without_broadcast_or_change_streams(built_filter):
+    await known_posts.rebuild()
+
+    assert known_posts.authoritative is False
+    # Un autre worker a pu créer ce post : MongoDB tranche
+    assert known_posts.might_exist(slug="cree-ailleurs") is True
+
+
+async def test_filter_answers_when_other_workers_reach_it(built_filter, monkeypatch):
+    monkeypatch.setattr(cache_manager, "subscribed", True)
+    await known_posts.rebuild()
+
+    assert known_posts.might_exist(slug="post-1") is True
+    assert known_posts.might_exist(slug="absent") is False
+
+    # Création diffusée par un autre worker
+    known_posts.invalidate_local(["slug:cree-ailleurs"])
+    assert known_posts.might_exist(slug="cree-ailleurs") is True
+
+
+async def test_filter_dropped_after_broadcast_interruption(built_filter, monkeypatch):
+    monkeypatch.setattr(cache_manager, "subscribed", True)
+    await known_posts.rebuild()
+
+    known_posts.invalidate_local([ALL_GROUPS])
+
+    assert known_posts.ready is False
+    assert known_posts.might_exist(slug="absent") is True
+
+
+def test_unknown_slug_is_404_from_mongodb(built_filter, client):
+    assert client.get("/posts/slug/post-2").status_code == 200
+    assert client.get("/posts/slug/absent").status_code == 404
@@ -0,0 +1,69 @@
+import base64
+import json
+from datetime import datetime
+
+import pytest
+
+from .conftest import make_post, raw_collection
+
+SAME_TIME = datetime(2025, 3, 1, 12, 0)
+
+
+@pytest.fixture
+def posts(db):
+    # 4 posts partagent la même date : seul `_id` les départage
+    docs = [make_post(i) for i in range(3)] + [make_post(10 + i, created_at=SAME_TIME) for i in range(4)]
+    raw_collection(db, "posts").insert_many(docs)
+    return docs
+
+
+def fetch_all(client, limit):
+    pages, cursor = [], None
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/posts/", params=params)
+        assert response.status_code == 200
+        pages.append([post["slug"] for post in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return pages
+
+
+def test_cursor_round_trip_without_duplicates_or_gaps(posts, client):
+    pages = fetch_all(client, limit=3)
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    slugs = [slug for page in pages for slug in page]
+    expected = sorted(posts, key=lambda post: (post["created_at"], post["_id"]), reverse=True)
+    assert slugs == [post["slug"] for post in expected]
+
+
+def test_last_full_page_is_followed_by_an_empty_page_without_cursor(posts, client):
+    pages = fetch_all(client, limit=7)
+
+    assert [len(page) for page in pages] == [7, 0]
+
+
+def test_tie_break_on_id_within_equal_dates(posts, client):
+    # Page coupée au milieu des posts de même date
+    first = client.get("/posts/", params={"limit": 2})
+    second = client.get("/posts/", params={"limit": 2, "cursor": first.headers["X-Next-Cursor"]})
+
+    tied = sorted((post for post in posts if post["created_at"] == SAME_TIME), key=lambda post: post["_id"], reverse=True)
+    assert [post["slug"] for post in first.json() + second.json()] == [post["slug"] for post in tied]
+
+
+def _encode(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("cursor", [
+    "pas-un-curseur!",
+    "é",
+    _encode({"c": "pas une date", "i": "64f1c2a9e4b0a1b2c3d4e5f6"}),
+    _encode({"c": "2025-01-01T00:00:00", "i": "pas-un-object-id"}),
+    _encode({"c": 12, "i": None}),
+    _encode(["liste"]),
+])
+def test_malformed_cursor_is_400(posts, client, cursor):
+    assert client.get("/posts/", params={"cursor": cursor}).status_code == 400
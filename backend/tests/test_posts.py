@@ -0,0 +1,18 @@
+from app.models.post import PostUpdate
+from app.services.known_posts import known_posts
+from app.services.post_service import post_service
+
+from .conftest import TEST_CLERK_ID, make_post, raw_collection
+
+
+async def test_new_slug_registered_only_after_ownership_check(db):
+    posts = raw_collection(db, "posts")
+    foreign_id = str(posts.insert_one(make_post(1, author_id="user_other")).inserted_id)
+    own_id = str(posts.insert_one(make_post(2)).inserted_id)
+    await known_posts.rebuild()
+
+    assert await post_service.update_post(foreign_id, PostUpdate(slug="slug-vole"), author_id=TEST_CLERK_ID) is None
+    assert "slug:slug-vole" not in known_posts._filter
+
+    assert await post_service.update_post(own_id, PostUpdate(slug="nouveau-slug"), author_id=TEST_CLERK_ID) is not None
+    assert "slug:nouveau-slug" in known_posts._filter
@@ -0,0 +1,62 @@
+from app.services.related_posts import RELATED_POSTS_COLLECTION, related_posts_service
+
+from .conftest import ADMIN_HEADERS, USER_HEADERS, raw_collection
+
+
+def create(client, slug, tags, is_published=True) -> str:
+    response = client.post("/posts/", json={
+        "title": slug, "content": "Texte", "slug": slug, "tags": tags, "is_published": is_published
+    }, headers=USER_HEADERS)
+    assert response.status_code in (200, 201)
+    return response.json()["post_id"]
+
+
+def related_ids(client, post_id, headers=None):
+    # Les listes sont mises à jour par la tâche de fond : on attend qu'elle ait fini
+    client.portal.call(related_posts_service.drain)
+    response = client.get(f"/posts/{post_id}/related", headers=headers)
+    assert response.status_code == 200
+    return [item["id"] for item in response.json()]
+
+
+def test_new_post_is_merged_into_neighbor_lists(client, db):
+    first = create(client, "a", ["python"])
+    second = create(client, "b", ["python", "web"])
+    other = create(client, "c", ["cuisine"])
+
+    assert related_ids(client, first) == [second]
+    assert related_ids(client, second) == [first]
+    assert related_ids(client, other) == []
+
+    # Le post change de tags : il quitte la liste de l'ancien voisin et rejoint le nouveau
+    client.put(f"/posts/{second}", json={"tags": ["cuisine"]}, headers=USER_HEADERS)
+    assert related_ids(client, first) == []
+    assert related_ids(client, other) == [second]
+
+
+def test_deleted_post_is_removed_everywhere(client, db):
+    first = create(client, "a", ["python"])
+    second = create(client, "b", ["python"])
+    assert related_ids(client, first) == [second]
+
+    client.delete(f"/posts/{second}", headers=USER_HEADERS)
+
+    assert related_ids(client, first) == []
+    assert raw_collection(db, RELATED_POSTS_COLLECTION).find_one({"related.id": second}) is None
+    assert client.get(f"/posts/{second}/related").status_code == 404
+
+
+def test_draft_related_is_only_visible_to_its_author(client, db):
+    published = create(client, "a", ["python"])
+    draft = create(client, "brouillon", ["python"], is_published=False)
+    client.portal.call(related_posts_service.drain)
+    raw_collection(db, RELATED_POSTS_COLLECTION).delete_many({})
+
+    assert client.get(f"/posts/{draft}/related").status_code == 404
+    assert client.get(f"/posts/{draft}/related", headers=ADMIN_HEADERS).status_code == 404
+    assert related_ids(client, draft, headers=USER_HEADERS) == [published]
+    # Aucune liste n'est écrite pendant ces lectures de brouillon
+    assert raw_collection(db, RELATED_POSTS_COLLECTION).count_documents({}) == 0
+
+    # Un brouillon n'apparaît pas chez ses voisins publiés
+    assert related_ids(client, published) == []
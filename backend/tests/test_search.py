@@ -0,0 +1,50 @@
+import pytest
+
+from app.services.content import derive_fields
+
+from .conftest import make_post, raw_collection
+
+
+def post(i, content, **fields):
+    return make_post(i, content=content, **derive_fields(content), **fields)
+
+
+@pytest.fixture
+def posts(db):
+    raw_collection(db, "posts").insert_many([
+        post(1, "Rien à voir, sinon un mot sur python en passant."),
+        post(2, "Un article **Python** avec un [lien](https://exemple.com/python-doc).", title="Python <b>& co</b>"),
+        post(3, "Python en brouillon", title="Python caché", is_published=False),
+        post(4, "Du *python* étiqueté", title="Autre", tags=["python"]),
+    ])
+
+
+def test_search_ranks_title_above_tags_and_content(posts, client):
+    response = client.get("/posts/search", params={"q": "python"})
+
+    assert response.status_code == 200
+    results = response.json()
+    # Le brouillon n'est jamais renvoyé
+    assert [result["slug"] for result in results] == ["post-2", "post-4", "post-1"]
+    assert results[0]["score"] > results[1]["score"] > results[2]["score"]
+
+
+def test_search_escapes_and_highlights(posts, client):
+    result = client.get("/posts/search", params={"q": "python"}).json()[0]
+
+    assert result["title_highlight"] == "<mark>Python</mark> &lt;b&gt;&amp; co&lt;/b&gt;"
+    # Extrait tiré du texte affiché, pas de la source Markdown
+    assert result["snippet"].startswith("Un article <mark>Python</mark> avec un lien")
+    for markdown in ("**", "[", "https://"):
+        assert markdown not in result["snippet"]
+
+
+def test_search_returns_summaries_only(posts, client):
+    for result in client.get("/posts/search", params={"q": "python"}).json():
+        assert "content" not in result
+        assert "content_html" not in result
+
+
+def test_search_filters_by_tag_and_ignores_exclusions(posts, client):
+    assert [r["slug"] for r in client.get("/posts/search", params={"q": "python", "tag": "python"}).json()] == ["post-4"]
+    assert client.get("/posts/search", params={"q": "-python"}).json() == []
@@ -0,0 +1,67 @@
+import json
+from datetime import datetime, timezone
+from typing import List
+
+import pytest
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.models.post import PostResponse, PostSummary, RelatedPost
+from app.services.content import derive_fields
+from app.services.post_service import post_service
+from app.services.serialization import ModelJSONResponse
+
+from .conftest import make_post
+
+
+def document(i: int, **fields) -> dict:
+    post = make_post(i, content="Été **gras** — « guillemets »", **fields)
+    post.update(derive_fields(post["content"]))
+    post["_id"] = ObjectId()
+    return post
+
+
+def default_body(content) -> bytes:
+    """Corps produit par FastAPI pour un `response_model` (jsonable_encoder puis json.dumps)"""
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+@pytest.mark.parametrize("created_at, expected", [
+    (datetime(2025, 1, 1, 12, 30), "2025-01-01T12:30:00"),
+    # Précision milliseconde de MongoDB
+    (datetime(2025, 1, 1, 12, 30, 5, 123000), "2025-01-01T12:30:05.123000"),
+    (datetime(2025, 1, 1, 12, 30, tzinfo=timezone.utc), "2025-01-01T12:30:00Z"),
+])
+def test_post_response_matches_default_encoding(created_at, expected):
+    post = post_service._convert_to_response(document(1, created_at=created_at, excerpt="Résumé"))
+
+    body = ModelJSONResponse(post, PostResponse).body
+
+    assert body == default_body(post)
+    assert json.loads(body)["created_at"] == expected
+
+
+def test_summary_list_matches_default_encoding():
+    posts = post_service._convert_list([document(i) for i in range(3)], include_content=False)
+    ids = [post.id for post in posts]
+
+    body = ModelJSONResponse(posts, List[PostSummary]).body
+
+    assert body == default_body(posts)
+    # ObjectId sérialisé en chaîne hexadécimale, sans contenu dans les résumés
+    assert [item["id"] for item in json.loads(body)] == ids
+    assert all(ObjectId.is_valid(post_id) and len(post_id) == 24 for post_id in ids)
+    assert "content" not in json.loads(body)[0]
+
+
+def test_related_posts_match_default_encoding():
+    related = [
+        RelatedPost(**post_service._summary_data(document(i)), score=score)
+        for i, score in ((1, 0.8), (2, 0.333333), (3, 1.0))
+    ]
+
+    body = ModelJSONResponse(related, List[RelatedPost]).body
+
+    assert body == default_body(related)
+    assert [item["score"] for item in json.loads(body)] == [0.8, 0.333333, 1.0]
@@ -0,0 +1,71 @@
+from collections import Counter
+
+from app.services.tag_stats import TAG_STATS_COLLECTION, tag_stats_service
+
+from .conftest import USER_HEADERS, raw_collection
+
+
+def create(client, slug, tags, is_published=True) -> str:
+    response = client.post("/posts/", json={
+        "title": slug, "content": "Texte", "slug": slug, "tags": tags, "is_published": is_published
+    }, headers=USER_HEADERS)
+    assert response.status_code in (200, 201)
+    return response.json()["post_id"]
+
+
+def expected_counts(db) -> dict:
+    """Compteurs recalculés à la main depuis `posts`"""
+    total, published = Counter(), Counter()
+    for post in raw_collection(db, "posts").find():
+        for tag in set(post.get("tags") or []):
+            total[tag] += 1
+            published[tag] += bool(post.get("is_published"))
+    return {tag: (total[tag], published[tag]) for tag in total}
+
+
+def stored_counts(db) -> dict:
+    return {doc["_id"]: (doc["total"], doc["published"]) for doc in raw_collection(db, TAG_STATS_COLLECTION).find()}
+
+
+async def test_counters_follow_every_write_path(client, db):
+    first = create(client, "a", ["python", "web", "python"])
+    second = create(client, "b", ["python", "devops"])
+    draft = create(client, "c", ["web"], is_published=False)
+
+    # Changement de tags puis dépublication
+    assert client.put(f"/posts/{first}", json={"tags": ["python", "api"]}, headers=USER_HEADERS).status_code == 200
+    assert client.put(f"/posts/{second}", json={"is_published": False}, headers=USER_HEADERS).status_code == 200
+
+    bulk = client.post("/posts/bulk", json={"operations": [
+        {"op": "create", "post": {"title": "d", "content": "x", "slug": "d", "tags": ["api", "rare"], "is_published": True}},
+        {"op": "publish", "post_id": draft},
+        {"op": "update", "post_id": second, "changes": {"tags": ["devops", "web"]}},
+    ]}, headers=USER_HEADERS)
+    assert bulk.json()["success"] is True
+
+    assert client.delete(f"/posts/{first}", headers=USER_HEADERS).status_code in (200, 204)
+
+    expected = expected_counts(db)
+    assert stored_counts(db) == expected
+
+    tags = client.get("/posts/tags").json()
+    assert {item["tag"]: item["count"] for item in tags} == {
+        tag: published for tag, (_, published) in expected.items() if published
+    }
+
+    # Rien à corriger : les compteurs incrémentaux valent la reconstruction
+    assert await tag_stats_service.rebuild() == {"tags": len(expected), "corrected": 0, "removed": 0}
+    assert client.get("/posts/tags").json() == tags
+
+
+def test_tag_without_posts_is_removed(client, db):
+    post_id = create(client, "seul", ["unique", "commun"])
+    create(client, "autre", ["commun"])
+    assert "unique" in stored_counts(db)
+
+    client.put(f"/posts/{post_id}", json={"tags": ["commun"]}, headers=USER_HEADERS)
+    assert "unique" not in stored_counts(db)
+
+    client.delete(f"/posts/{post_id}", headers=USER_HEADERS)
+    assert stored_counts(db) == {"commun": (1, 1)}
+    assert client.get("/posts/tags").json() == [{"tag": "commun", "count": 1}]
@@ -0,0 +1,33 @@
+from .conftest import ADMIN_HEADERS, USER_HEADERS, TEST_CLERK_ID, raw_collection
+
+
+def test_me_update_cannot_change_role_or_status(client, db):
+    assert client.get("/users/me", headers=USER_HEADERS).status_code == 200
+
+    response = client.put(
+        "/users/me",
+        json={"username": "nouveau_nom", "role": "admin", "is_active": True},
+        headers=USER_HEADERS,
+    )
+    assert response.status_code == 200
+    assert response.json()["username"] == "nouveau_nom"
+    assert response.json()["role"] == "user"
+
+    stored = raw_collection(db, "users").find_one({"clerk_id": TEST_CLERK_ID})
+    assert stored.get("role", "user") == "user"
+
+
+def test_admin_can_change_role(client, db):
+    user_id = client.get("/users/me", headers=USER_HEADERS).json()["_id"]
+
+    response = client.put(f"/users/{user_id}", json={"role": "author"}, headers=ADMIN_HEADERS)
+    assert response.status_code == 200
+    assert response.json()["role"] == "author"
+
+
+def test_role_change_requires_admin(client, db):
+    user_id = client.get("/users/me", headers=USER_HEADERS).json()["_id"]
+
+    response = client.put(f"/users/{user_id}", json={"role": "admin"}, headers=USER_HEADERS)
+    assert response.status_code == 403
+    assert raw_collection(db, "users").find_one({"clerk_id": TEST_CLERK_ID}).get("role", "user") == "user"
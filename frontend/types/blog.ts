@@ -2,17 +2,44 @@ export interface Post {
     id: string
     title: string
     content: string
+    // Rendu HTML de content, calculé à l'écriture
+    content_html?: string
     slug: string
+    // Extrait de l'auteur, ou extrait automatique
     excerpt?: string
     tags: string[]
     is_published: boolean
     author_id: string
     author_email?: string
     featured_image?: string
+    word_count?: number
+    // Temps de lecture estimé, en minutes
+    reading_time?: number
     created_at?: string
     updated_at?: string
 }
 
+// Élément renvoyé par les listes (GET /posts/, /posts/tags/{tag}) sans ?include=content
+export type PostSummary = Omit<Post, 'content' | 'content_html'>
+
+// Résultat de GET /posts/search : title_highlight et snippet contiennent des <mark>
+export interface PostSearchResult extends PostSummary {
+    score: number
+    title_highlight: string
+    snippet?: string
+}
+
+// Post similaire (GET /posts/{id}/related)
+export interface RelatedPost extends PostSummary {
+    score: number
+}
+
+// Nuage de tags (GET /posts/tags) : nombre de posts publiés par tag
+export interface TagStat {
+    tag: string
+    count: number
+}
+
 export interface PostCreate {
     title: string
     content: string